@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""周围雷数计算性能测试：比较NumPy平移求和与纯Python大整数移位求和两种实现"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import board
+
+SIZES = [100, 1000, 4000]           # 棋盘边长
+DENSITY = 0.15                      # 雷密度
+
+
+def random_mine_plane(size, density=DENSITY, seed=0):
+    rng = random.Random(seed)
+    plane = bytearray(size * size)
+    for pos in rng.sample(range(size * size), int(size * size * density)):
+        plane[pos] = 1
+    return plane
+
+
+def bench_path(function, plane, size):
+    start = time.perf_counter()
+    counts = function(plane, size, size)
+    return time.perf_counter() - start, counts
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    if board.load_numpy() is None:
+        print("未安装NumPy，只测试纯Python实现")
+    print(f"{'棋盘':>12} {'纯Python(秒)':>14} {'NumPy(秒)':>12}")
+    for size in sizes:
+        plane = random_mine_plane(size)
+        python_time, python_counts = bench_path(board._count_adjacent_python, plane, size)
+        numpy_text = "-"
+        if board.np is not None:
+            numpy_time, numpy_counts = bench_path(board._count_adjacent_numpy, plane, size)
+            assert numpy_counts == python_counts, "两种实现结果不一致"
+            numpy_text = f"{numpy_time:.4f}"
+        print(f"{size:>5}x{size:<6} {python_time:>14.4f} {numpy_text:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""插旗性能回归测试：棋盘从9x9增长到1000x1000时，单次插旗耗时应基本不变"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board
+
+SIZES = [9, 30, 100, 300, 1000]     # 棋盘边长
+DENSITY = 0.15                      # 雷密度
+OPERATIONS = 2000                   # 每个尺寸的插旗次数
+
+
+def bench_flag(size, operations=OPERATIONS, seed=0):
+    """返回单次插旗（含取消）的平均耗时，单位微秒"""
+    random.seed(seed)
+    board = Board(size, size, max(1, int(size * size * DENSITY)))
+    board._place_mines(0, 0)
+    board.mines_placed = True
+
+    cells = [(random.randrange(size), random.randrange(size)) for _ in range(operations)]
+    start = time.perf_counter()
+    for x, y in cells:
+        board.flag(x, y)
+    elapsed = time.perf_counter() - start
+    return elapsed / operations * 1e6
+
+
+def main():
+    print(f"{'棋盘':>12} {'单次插旗(µs)':>14}")
+    results = []
+    for size in SIZES:
+        per_op = bench_flag(size)
+        results.append(per_op)
+        print(f"{size:>5}x{size:<6} {per_op:>14.2f}")
+
+    # 最大棋盘与最小棋盘的耗时比值，增量更新时应接近1
+    ratio = results[-1] / results[0]
+    print(f"耗时比 {SIZES[-1]}x{SIZES[-1]} / {SIZES[0]}x{SIZES[0]}: {ratio:.2f}")
+    return ratio
+
+
+if __name__ == "__main__":
+    main()
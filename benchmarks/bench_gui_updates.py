@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""界面刷新开销测试：统计每次点击产生的btn.config（Tcl）调用次数，需要图形界面环境"""
+
+import os
+import random
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minesweeper import MinesweeperGUI
+
+DIFFICULTIES = [(9, 9, 10), (16, 16, 40), (16, 30, 99)]
+CLICKS = 50                         # 每个难度模拟的右键次数
+
+
+def bench_difficulty(root, rows, cols, mines, seed=0):
+    """返回(首次左键的Tcl调用数, 右键平均Tcl调用数, 右键平均耗时毫秒)"""
+    random.seed(seed)
+    app = MinesweeperGUI(root, rows, cols, mines)
+    root.update()                   # 执行启动时推迟的棋盘创建
+    app.on_left_click(rows // 2, cols // 2)
+    first_click_calls = app.last_action_tcl_calls
+
+    rng = random.Random(seed)
+    total_calls = 0
+    start = time.perf_counter()
+    for _ in range(CLICKS):
+        app.on_right_click(rng.randrange(rows), rng.randrange(cols))
+        total_calls += app.last_action_tcl_calls
+    elapsed = time.perf_counter() - start
+    for widget in root.winfo_children():
+        widget.destroy()
+    return first_click_calls, total_calls / CLICKS, elapsed / CLICKS * 1000
+
+
+def main():
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'难度':>12} {'格子数':>8} {'首次左键Tcl':>12} {'右键Tcl':>9} {'右键(ms)':>9}")
+    for rows, cols, mines in DIFFICULTIES:
+        first_calls, flag_calls, flag_ms = bench_difficulty(root, rows, cols, mines)
+        print(f"{rows:>4}x{cols:<3}_{mines:<3} {rows * cols:>8} {first_calls:>12} {flag_calls:>9.1f} {flag_ms:>9.3f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
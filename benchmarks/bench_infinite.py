@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""无限棋盘测试：沿一个方向不断翻开远处的格子，观察内存中区块数、写入磁盘的区块数和内存占用
+
+内存中的区块数不超过max_chunks，内存占用应保持平稳，不随走过的距离增长。
+用法：python benchmarks/bench_infinite.py [翻开次数] [内存中最多区块数]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infinite import ChunkedBoard, CHUNK
+
+REVEALS = 4000
+MAX_CHUNKS = 64
+STEP = CHUNK // 2                       # 每次翻开前平均移动的格数
+REPORTS = 8
+
+
+def main():
+    reveals = int(sys.argv[1]) if len(sys.argv) > 1 else REVEALS
+    max_chunks = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_CHUNKS
+    rng = random.Random(0)
+    board = ChunkedBoard(seed=0, max_chunks=max_chunks)
+    tracemalloc.start()
+    print(f"{'翻开次数':>8} {'距离(格)':>10} {'翻开格子数':>10} {'每次(毫秒)':>10} "
+          f"{'内存区块':>8} {'磁盘区块':>8} {'当前内存(MB)':>12}")
+    x = y = 0
+    board.reveal(x, y)
+    done = 0
+    start = time.perf_counter()
+    for report in range(1, REPORTS + 1):
+        while done < reveals * report // REPORTS:
+            x += rng.randint(0, STEP)
+            y += rng.randint(-STEP // 2, STEP // 2)
+            if board.cell(x, y)[0]:
+                continue                # 测试只翻开不是雷的格子，保证游戏一直继续
+            board.reveal(x, y)
+            done += 1
+        current, _ = tracemalloc.get_traced_memory()
+        ms = (time.perf_counter() - start) * 1000 / done
+        print(f"{done:>8} {x:>10} {board.revealed_count:>10} {ms:>10.2f} "
+              f"{len(board.loaded):>8} {board.store.count():>8} {current / 2 ** 20:>12.1f}")
+    tracemalloc.stop()
+    board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""内存映射棋盘测试：创建棋盘、第一次点击（放雷、计算周围雷数、展开）、保存和重新打开的耗时，以及峰值内存
+
+每种棋盘在单独的子进程中测量，峰值内存(RSS)互不影响；Windows上没有resource模块，不显示内存。
+CompactBoard在格子数超过COMPACT_LIMIT时跳过（计算周围雷数需要数GB临时内存）。
+用法：python benchmarks/bench_mapped.py [格子数 ...]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [10 ** 6, 10 ** 7, 10 ** 8]
+DENSITY = 0.15
+COMPACT_LIMIT = 10 ** 7
+
+# 子进程：打印各阶段耗时（秒）和峰值内存（MB）
+CHILD = r"""
+import math, os, sys, time
+sys.path.insert(0, os.getcwd())
+from board import CompactBoard
+from mapped import MappedBoard
+kind, size, density = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+rows = int(math.isqrt(size))
+cols = size // rows
+mines = int(rows * cols * density)
+start = time.perf_counter()
+board = MappedBoard(rows, cols, mines, seed=0) if kind == "mapped" else CompactBoard(rows, cols, mines, seed=0)
+create = time.perf_counter() - start
+start = time.perf_counter()
+board.reveal(rows // 2, cols // 2)
+click = time.perf_counter() - start
+save = reopen = float("nan")
+if kind == "mapped":
+    start = time.perf_counter()
+    board.flush()
+    save = time.perf_counter() - start
+    board.temporary = False                 # 保留文件，测重新打开
+    board.close()
+    start = time.perf_counter()
+    board = MappedBoard.open(board.path)
+    board.reveal(0, 0)
+    reopen = time.perf_counter() - start
+    board.temporary = True
+    board.close()
+try:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+except ImportError:
+    peak = float("nan")
+print(create, click, save, reopen, peak)
+"""
+
+
+def measure(kind, size):
+    result = subprocess.run([sys.executable, "-c", CHILD, kind, str(size), str(DENSITY)],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return [float(value) for value in result.stdout.split()]
+
+
+def main():
+    sizes = [int(float(arg)) for arg in sys.argv[1:]] or SIZES
+    print(f"{'棋盘':<14} {'格子数':>10} {'创建(秒)':>9} {'第一次点击(秒)':>14} {'保存(秒)':>9} "
+          f"{'重新打开(秒)':>12} {'峰值内存(MB)':>13}")
+    for size in sizes:
+        for kind, name in (("compact", "CompactBoard"), ("mapped", "MappedBoard")):
+            if kind == "compact" and size > COMPACT_LIMIT:
+                print(f"{name:<14} {size:>10} {'跳过':>9}")
+                continue
+            create, click, save, reopen, peak = measure(kind, size)
+            print(f"{name:<14} {size:>10} {create:>9.3f} {click:>14.3f} {save:>9.3f} {reopen:>12.3f} {peak:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
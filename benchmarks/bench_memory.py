@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""棋盘内存占用测试：比较Cell对象网格与紧凑平面存储的每格内存"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board, CompactBoard
+
+SIZES = [100, 300, 1000]            # 棋盘边长
+
+
+def bench_memory(board_class, size):
+    """返回(每格字节数, 构造耗时秒数)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    board = board_class(size, size, size * size // 6)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del board
+    return current / (size * size), elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'存储方式':<14} {'棋盘':>12} {'每格字节':>10} {'构造(秒)':>10}")
+    for size in sizes:
+        for board_class in (Board, CompactBoard):
+            per_cell, elapsed = bench_memory(board_class, size)
+            print(f"{board_class.__name__:<14} {size:>5}x{size:<6} {per_cell:>10.1f} {elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
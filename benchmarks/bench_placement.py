@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""放雷性能测试：比较旧的"全部位置列表 + random.sample"和Floyd抽样的耗时与峰值内存
+
+用法：python benchmarks/bench_placement.py [格子数 ...]
+旧方法在格子数超过OLD_METHOD_LIMIT时跳过（需要数GB内存）。
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from placement import sample_mines
+
+SIZES = [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8]
+DENSITY = 0.15                      # 雷的密度，与困难难度相近
+OLD_METHOD_LIMIT = 10 ** 7
+
+
+def place_old(size, count, rng):
+    # 修改前Board._place_mines的做法
+    available = list(set(range(size)) - {0})
+    return rng.sample(available, count)
+
+
+def place_floyd(size, count, rng):
+    return sample_mines(size, count, {0}, rng)
+
+
+def measure(method, size, count):
+    """返回(耗时秒数, 峰值内存MB)；两者分开测量，避免tracemalloc影响计时"""
+    start = time.perf_counter()
+    method(size, count, random.Random(0))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    method(size, count, random.Random(0))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    sizes = [int(float(arg)) for arg in sys.argv[1:]] or SIZES
+    print(f"{'方法':<8} {'格子数':>12} {'雷数':>12} {'耗时(秒)':>10} {'峰值内存(MB)':>14}")
+    for size in sizes:
+        count = int(size * DENSITY)
+        for name, method in (("旧方法", place_old), ("Floyd", place_floyd)):
+            if method is place_old and size > OLD_METHOD_LIMIT:
+                print(f"{name:<8} {size:>12} {count:>12} {'跳过':>10} {'':>14}")
+                continue
+            elapsed, peak = measure(method, size, count)
+            print(f"{name:<8} {size:>12} {count:>12} {elapsed:>10.3f} {peak:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
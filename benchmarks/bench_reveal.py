@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""大面积展开性能测试：低密度棋盘上单击一次展开几乎整个棋盘，分别测量Board和CompactBoard"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board, CompactBoard
+
+SIZES = [100, 500, 1000, 2000]      # 棋盘边长
+DENSITY = 0.001                     # 雷密度，越低展开的区域越大
+
+
+def bench_reveal(size, density=DENSITY, seed=0, board_class=Board):
+    """返回(翻开的格子数, 单击展开耗时秒数)"""
+    random.seed(seed)
+    board = board_class(size, size, max(1, int(size * size * density)))
+    board._place_mines(0, 0)
+    board.mines_placed = True
+
+    start = time.perf_counter()
+    opened = board.reveal(0, 0)
+    elapsed = time.perf_counter() - start
+    return len(opened), elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'棋盘':>12} {'类型':<14} {'翻开格子数':>12} {'耗时(秒)':>10} {'每格(µs)':>10}")
+    for size in sizes:
+        for board_class in (Board, CompactBoard):
+            opened, elapsed = bench_reveal(size, board_class=board_class)
+            print(f"{size:>5}x{size:<6} {board_class.__name__:<14} {opened:>12} {elapsed:>10.3f} "
+                  f"{elapsed / max(opened, 1) * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
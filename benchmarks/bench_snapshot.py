@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""存档性能测试：大棋盘上的存档编码、解码耗时和文件大小"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board, CompactBoard
+from snapshot import encode_game, decode_game
+
+SIZES = [100, 300, 1000]            # 棋盘边长
+
+
+def make_game(board_class, size):
+    # 放好雷，翻开中间一片、随机插一些旗，模拟下到一半的对局
+    random.seed(size)
+    board = board_class(size, size, size * size // 6)
+    board.reveal(size // 2, size // 2)
+    for _ in range(size * 10):
+        board.flag(random.randrange(size), random.randrange(size))
+    return board
+
+
+def bench_snapshot(board_class, size):
+    """返回(编码秒数, 解码秒数, 存档字节数)"""
+    board = make_game(board_class, size)
+    start = time.perf_counter()
+    data = encode_game(board, 123.4, f"{size}x{size}_{board.mines}")
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    decode_game(data, board_class)
+    decode_time = time.perf_counter() - start
+    return encode_time, decode_time, len(data)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'存储方式':<14} {'棋盘':>12} {'编码(毫秒)':>10} {'解码(毫秒)':>10} {'大小(KB)':>10}")
+    for size in sizes:
+        for board_class in (Board, CompactBoard):
+            encode_time, decode_time, size_bytes = bench_snapshot(board_class, size)
+            print(f"{board_class.__name__:<14} {size:>5}x{size:<6} {encode_time * 1000:>10.1f} "
+                  f"{decode_time * 1000:>10.1f} {size_bytes / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""启动速度测试：从启动进程到窗口显示、棋盘第一次绘制完成的时间
+
+每次测量都启动一个新的Python进程（包含解释器启动和模块导入），需要图形界面环境。
+用法：python benchmarks/bench_startup.py [次数]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+RENDERERS = ["button", "canvas"]
+
+# 子进程：打印导入完成、窗口显示、棋盘绘制完成的时刻（相对进程启动，毫秒）
+CHILD = r"""
+import sys, time
+start = float(sys.argv[1])
+def stamp(name):
+    print(name, (time.time() - start) * 1000, flush=True)
+import tkinter as tk
+from minesweeper import MinesweeperGUI
+stamp("import")
+root = tk.Tk()
+root.bind("<Map>", lambda e: e.widget is root and stamp("window"))
+app = MinesweeperGUI(root, renderer=sys.argv[2])
+def wait_board():
+    if app.renderer is None:
+        root.after(1, wait_board)
+        return
+    root.update_idletasks()
+    stamp("board")
+    root.destroy()
+root.after_idle(wait_board)
+root.mainloop()
+"""
+
+
+def measure(renderer):
+    """返回 {阶段: 毫秒}"""
+    result = subprocess.run([sys.executable, "-c", CHILD, repr(time.time()), renderer],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    stamps = {}
+    for line in result.stdout.splitlines():
+        name, ms = line.split()
+        stamps.setdefault(name, float(ms))
+    return stamps
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    print(f"{'渲染方式':<10} {'导入(毫秒)':>10} {'窗口显示(毫秒)':>14} {'棋盘绘制(毫秒)':>14}")
+    for renderer in RENDERERS:
+        samples = [measure(renderer) for _ in range(runs)]
+        # 取中位数，减少偶然的系统抖动
+        median = {name: sorted(sample.get(name, float("nan")) for sample in samples)[runs // 2]
+                  for name in ("import", "window", "board")}
+        print(f"{renderer:<10} {median['import']:>10.1f} {median['window']:>14.1f} {median['board']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""基准测试套件：用固定种子，按棋盘尺寸和雷密度的组合测量棋盘引擎和界面各个操作的耗时
+
+结果可以保存为JSON基准文件；和基准比较时，某一项比基准慢了超过阈值就以状态1退出，
+每次性能相关的修改都可以用它检查效果、发现退步。基准与机器有关，应在同一台机器上生成和比较。
+
+用法：
+    python benchmarks/bench_suite.py                          运行并打印结果
+    python benchmarks/bench_suite.py --save baseline.json     运行并保存为基准
+    python benchmarks/bench_suite.py --compare baseline.json  运行并与基准比较（--threshold 0.25）
+    --quick 只测小棋盘，--no-gui 不测界面，--filter 文字 只测名字中包含这段文字的项目
+    --rounds 3 把整个矩阵跑3轮，每项取各轮中最快的；机器负载不稳定时减少误报
+
+界面测试需要图形界面；Linux上没有DISPLAY时自动启动Xvfb虚拟显示，没有安装Xvfb时跳过界面测试。
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board, CompactBoard, load_numpy
+
+SEED = 20250731
+SIZES = [(9, 9), (16, 30), (100, 100), (300, 300)]
+QUICK_SIZES = [(9, 9), (16, 30)]
+DENSITIES = [0.02, 0.12, 0.2]           # 0.02时第一次点击能展开棋盘的大部分
+BOARD_CLASSES = [Board, CompactBoard]
+GUI_SIZES = [(9, 9), (16, 30), (40, 40)]
+GUI_RENDERERS = ["button", "canvas"]
+REPEATS = 5                             # 每项至少重复的次数，取最快的一次
+MIN_TOTAL = 0.2                         # 很快的操作继续重复，直到计时总和达到这么多秒
+MAX_SAMPLES = 200                       # 每项最多重复的次数
+MAX_ITEM_SECONDS = 1.0                  # 额外的重复连同准备时间不超过这么多秒
+FLAG_CALLS = 200                        # flag每次测量插旗的格子数，结果为单次耗时
+IS_WIN_CALLS = 1000                     # is_win每次测量调用的次数，结果为单次耗时
+THRESHOLD = 0.25                        # 比基准慢25%以上算退步
+NOISE_FLOOR = 20e-6                     # 比基准慢不到20微秒的不算退步，避免计时抖动误报
+
+
+def measure(setup, operation, repeats, calls=1):
+    """每次先用setup()准备（不计时），再对operation(准备的结果)计时，返回最短耗时除以calls（秒）
+
+    代码和种子固定时，慢于最短耗时的部分都来自系统干扰，所以与timeit一样取最小值；
+    计时期间关闭垃圾回收，很快的操作多测几次。
+    """
+    samples = []
+    began = time.perf_counter()
+    while len(samples) < repeats or (sum(samples) < MIN_TOTAL and len(samples) < MAX_SAMPLES
+                                     and time.perf_counter() - began < MAX_ITEM_SECONDS):
+        state = setup()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            operation(state)
+            samples.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(samples) / calls
+
+
+def engine_cases(board_class, rows, cols, density):
+    """产生 (操作名, setup, operation, calls)；第一次点击在中心，3x3安全区保证能展开一片"""
+    mines = max(1, int(rows * cols * density))
+    center = (rows // 2, cols // 2)
+
+    def new():
+        return board_class(rows, cols, mines, safe_zone="3x3", seed=SEED)
+
+    def placed():
+        board = new()
+        board.place_mines_for(*center)
+        return board
+
+    def opened():
+        board = placed()
+        board.reveal(*center)
+        return board
+
+    def flag_targets():
+        board = opened()
+        hidden = [(r, c) for r in range(rows) for c in range(cols) if not board.grid[r][c].revealed]
+        return board, random.Random(SEED).sample(hidden, min(FLAG_CALLS, len(hidden)))
+
+    def flag_all(state):
+        board, targets = state
+        for x, y in targets:
+            board.flag(x, y)
+
+    def is_win(board):
+        for _ in range(IS_WIN_CALLS):
+            board.is_win()
+
+    yield "init", lambda: None, lambda _: new(), 1
+    yield "place_mines", new, lambda board: board._place_mines(*center), 1
+    yield "calculate_adjacent", placed, lambda board: board._calculate_adjacent(), 1
+    yield "reveal", placed, lambda board: board.reveal(*center), 1
+    yield "flag", flag_targets, flag_all, FLAG_CALLS
+    yield "is_win", opened, is_win, IS_WIN_CALLS
+
+
+def run_engine(sizes, repeats, selected):
+    metrics = {}
+    for board_class in BOARD_CLASSES:
+        for rows, cols in sizes:
+            for density in DENSITIES:
+                for op, setup, operation, calls in engine_cases(board_class, rows, cols, density):
+                    name = f"{board_class.__name__}.{op}[{rows}x{cols},{density}]"
+                    if selected(name):
+                        metrics[name] = measure(setup, operation, repeats, calls)
+                        report(name, metrics[name])
+    return metrics
+
+
+def start_virtual_display():
+    """Linux上没有DISPLAY时启动Xvfb，返回进程；不需要或无法启动时返回None"""
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None
+    display = f":{100 + os.getpid() % 900}"
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1920x1200x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(0.5)                     # 等Xvfb开始接受连接
+    return process
+
+
+def run_gui(sizes, repeats, selected):
+    import tkinter as tk
+    from minesweeper import MinesweeperGUI
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"没有可用的图形界面，跳过界面测试: {e}")
+        return {}
+    root.withdraw()
+    metrics = {}
+    for renderer in GUI_RENDERERS:
+        for rows, cols in sizes:
+            for density in DENSITIES:
+                mines = max(1, int(rows * cols * density))
+                center = (rows // 2, cols // 2)
+                app = MinesweeperGUI(root, rows, cols, mines, board_class=CompactBoard, renderer=renderer)
+                root.update()                   # 执行启动时推迟的棋盘创建
+
+                def restart():
+                    app.change_difficulty(rows, cols, mines)
+                    root.update_idletasks()
+
+                def unpainted_opening():
+                    # 新棋盘先显示出来，再绕过界面直接翻开，之后整体刷新时要重画翻开的格子
+                    board = CompactBoard(rows, cols, mines, safe_zone="3x3", seed=SEED)
+                    app.change_difficulty(rows, cols, mines, board=board)
+                    root.update_idletasks()
+                    board.reveal(*center)
+
+                def refresh(_):
+                    app.update_buttons()
+                    root.update_idletasks()
+
+                for op, setup, operation in (("change_difficulty", lambda: None, lambda _: restart()),
+                                             ("update_buttons", unpainted_opening, refresh)):
+                    name = f"MinesweeperGUI.{op}[{renderer},{rows}x{cols},{density}]"
+                    if selected(name):
+                        metrics[name] = measure(setup, operation, repeats)
+                        report(name, metrics[name])
+                app.stop_timer()
+                for widget in root.winfo_children():
+                    widget.destroy()
+    root.destroy()
+    return metrics
+
+
+def report(name, seconds):
+    print(f"{name:<60} {seconds * 1000:>12.4f} ms", flush=True)
+
+
+def compare(metrics, baseline, threshold):
+    """打印与基准的对比，返回退步的项目名列表"""
+    regressions = []
+    print(f"\n{'项目':<60} {'基准(ms)':>12} {'本次(ms)':>12} {'变化':>8}")
+    for name, seconds in sorted(metrics.items()):
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<60} {'-':>12} {seconds * 1000:>12.4f} {'新增':>8}")
+            continue
+        change = seconds / base - 1 if base else 0.0
+        mark = ""
+        if seconds > base * (1 + threshold) and seconds - base > NOISE_FLOOR:
+            regressions.append(name)
+            mark = "  退步"
+        print(f"{name:<60} {base * 1000:>12.4f} {seconds * 1000:>12.4f} {change:>+8.1%}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="扫雷棋盘引擎和界面的基准测试")
+    parser.add_argument("--save", metavar="文件", help="把结果保存为JSON基准")
+    parser.add_argument("--compare", metavar="文件", help="与JSON基准比较，有退步时以状态1退出")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="退步阈值（比例），默认0.25")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="每项至少重复的次数，默认5")
+    parser.add_argument("--rounds", type=int, default=1, help="整个矩阵跑几轮，每项取最快的一轮，默认1")
+    parser.add_argument("--quick", action="store_true", help="只测小棋盘")
+    parser.add_argument("--no-gui", action="store_true", help="不测界面")
+    parser.add_argument("--filter", default="", help="只测名字中包含这段文字的项目")
+    args = parser.parse_args()
+
+    selected = lambda name: args.filter in name
+    display = None if args.no_gui else start_virtual_display()
+    metrics = {}
+    try:
+        for round_index in range(args.rounds):
+            if args.rounds > 1:
+                print(f"--- 第{round_index + 1}轮 ---")
+            results = run_engine(QUICK_SIZES if args.quick else SIZES, args.repeats, selected)
+            if not args.no_gui:
+                results.update(run_gui(QUICK_SIZES if args.quick else GUI_SIZES, args.repeats, selected))
+            for name, seconds in results.items():
+                metrics[name] = min(seconds, metrics.get(name, seconds))
+    finally:
+        if display is not None:
+            display.terminate()
+
+    if args.save:
+        meta = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": load_numpy() is not None,
+            "seed": SEED,
+            "repeats": args.repeats,
+            "rounds": args.rounds,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({"meta": meta, "metrics": metrics}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        print(f"\n基准已保存到 {args.save}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)["metrics"]
+        regressions = compare(metrics, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)}项比基准慢了{args.threshold:.0%}以上")
+            sys.exit(1)
+        print("\n没有退步")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,71 @@
+import gc
 import random
+import re
+import time
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+
+from placement import SAFE_ZONES, safe_cells, sample_mines, mine_positions
+
+np = None                   # NumPy在第一次计算周围雷数时才导入，不拖慢程序启动
+_numpy_loaded = False
+
+def load_numpy():
+    """导入NumPy并返回，没有安装时返回None（使用纯Python实现）"""
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        _numpy_loaded = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np = numpy
+    return np
+
+def _count_adjacent_numpy(plane, rows, cols):
+    # 把平面四周补一圈0，再把9个平移后的切片相加
+    padded = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = np.frombuffer(plane, dtype=np.uint8).reshape(rows, cols)
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for dr in range(3):
+        for dc in range(3):
+            counts += padded[dr:dr + rows, dc:dc + cols]
+    return bytearray(counts.tobytes())
+
+def _count_adjacent_python(plane, rows, cols):
+    # 把整个平面当成一个大整数，每个格子占8位，整体移位相加；和最大为9，不会进位到相邻格子
+    width = cols + 2                                    # 每行左右各补一个0，移位时不会串到相邻行
+    empty_row = bytes(width)
+    padded = bytearray(empty_row)
+    for r in range(rows):
+        padded += b"\x00" + plane[r * cols:(r + 1) * cols] + b"\x00"
+    padded += empty_row
+    value = int.from_bytes(padded, "little")
+    value = value + (value << 8) + (value >> 8)                             # 左右相邻
+    value = value + (value << (8 * width)) + (value >> (8 * width))         # 上下相邻
+    data = value.to_bytes(len(padded) + width + 1, "little")
+    counts = bytearray()
+    for r in range(1, rows + 1):
+        start = r * width + 1
+        counts += data[start:start + cols]
+    return counts
+
+def count_adjacent(plane, rows, cols, exclude=None):
+    """计算每个格子3x3范围内plane中为1的格子数，exclude中为1的格子记为0"""
+    if load_numpy() is not None:
+        counts = _count_adjacent_numpy(plane, rows, cols)
+    else:
+        counts = _count_adjacent_python(plane, rows, cols)
+    if exclude is not None:
+        # 被排除的格子清零：exclude每格为0或1，乘以255得到按字节的掩码
+        mask = int.from_bytes(exclude, "little") * 0xFF
+        value = int.from_bytes(counts, "little")
+        counts = bytearray((value - (value & mask)).to_bytes(len(counts), "little"))
+    return counts
+
+def count_both(a, b):
+    """两个0/1平面中同一位置都为1的格子数"""
+    return bin(int.from_bytes(a, "little") & int.from_bytes(b, "little")).count("1")
 
 class Cell:
     def __init__(self):
@@ -8,108 +75,620 @@ class Cell:
         self.adjacent_mines = 0             # 临近格子中的雷数
         self.flagged_adjacent_mines = 0     # 相邻格子中被标记的雷数
 
+def make_board_id(rows, cols, mines, seed, x, y, safe_zone="cell"):
+    """局号：难度、种子（十六进制）、第一次点击的位置和安全区，例如 16x30_99-5f3a2b1c-8.15-cell"""
+    return f"{rows}x{cols}_{mines}-{seed:x}-{x}.{y}-{safe_zone}"
+
+def parse_board_id(board_id):
+    """解析局号，返回 (rows, cols, mines, seed, x, y, safe_zone)，格式不对时抛出ValueError"""
+    try:
+        difficulty, seed, click, safe_zone = board_id.strip().split("-")
+        size, mines = difficulty.split("_")
+        rows, cols = size.split("x")
+        x, y = click.split(".")
+        result = (int(rows), int(cols), int(mines), int(seed, 16), int(x), int(y), safe_zone)
+    except ValueError:
+        raise ValueError(f"无效的局号: {board_id}") from None
+    rows, cols, mines, seed, x, y, safe_zone = result
+    # 种子最多64位（内存映射棋盘文件用8字节保存种子），程序生成的种子都是32位
+    if (safe_zone not in SAFE_ZONES or rows <= 0 or cols <= 0 or seed >= 1 << 64
+            or not 0 <= mines < rows * cols or not (0 <= x < rows and 0 <= y < cols)):
+        raise ValueError(f"无效的局号: {board_id}")
+    return result
+
 class Board:
-    def __init__(self, rows, cols, mines):
+    def __init__(self, rows, cols, mines, safe_zone="cell", seed=None):
         self.rows = rows                                                    # 棋盘行数
         self.cols = cols                                                    # 棋盘列数
         self.mines = mines                                                  # 雷数
+        self.safe_zone = safe_zone                                          # 第一次点击的安全区，"cell"或"3x3"
+        self.seed = random.getrandbits(32) if seed is None else seed        # 放雷用的种子，与局号对应
+        self.rng = random.Random(self.seed)                                 # 本棋盘自己的随机数生成器
         self.game_over = False                                              # 游戏是否结束
-        self.grid = [[Cell() for _ in range(cols)] for _ in range(rows)]    # 棋盘格子
+        self.grid = self._create_grid()                                     # 棋盘格子
         self.mines_placed = False                                           # 雷是否已放置
         self.first_click_x = None                                           # 第一次点击的x坐标
         self.first_click_y = None                                           # 第一次点击的y坐标
-        self._calculate_adjacent()                                          # 计算每个格子周围的雷数
-        self._calculate_flagged_adjacent()                                  # 计算每个格子周围被标记的雷数
+        self.safe_cells_left = rows * cols - mines                          # 还未翻开的安全格子数
+        self.flag_count = 0                                                 # 已插旗的格子数
+        self.flagged_mines = 0                                              # 插对旗的雷数
+        self.moves = []                                                     # 操作记录 (时间, 动作, x, y)，用于录像
+        self.moves_complete = True                                          # 操作记录是否从第一步开始，旧版存档恢复的没有之前的操作
+        # 放雷之前所有格子的雷数和旗子数都是0，等第一次点击放雷后再计算
+
+    def _record(self, action, x, y):
+        # 记录一次改变了棋盘的操作，时间使用单调时钟
+        self.moves.append((time.monotonic(), action, x, y))
+
+    def _create_grid(self):
+        return [[Cell() for _ in range(self.cols)] for _ in range(self.rows)]
+
+    def _sample_mines(self, first_x, first_y, plane=None):
+        # 确保第一次点击的安全区内没有雷；雷太多放不下3x3安全区时只保证点击的格子
+        size = self.rows * self.cols
+        excluded = safe_cells(self.rows, self.cols, first_x, first_y, self.safe_zone)
+        if len(excluded) > size - self.mines:
+            excluded = safe_cells(self.rows, self.cols, first_x, first_y)
+        self.first_click_x, self.first_click_y = first_x, first_y
+        return sample_mines(size, self.mines, excluded, self.rng, plane)
 
     def _place_mines(self, first_x, first_y):
-        # 确保第一次点击的位置没有雷
-        safe_positions = set()
-        if 0 <= first_x < self.rows and 0 <= first_y <self.cols:
-            safe_positions.add(first_x * self.cols + first_y)
+        self.place_mines_at(mine_positions(self._sample_mines(first_x, first_y)))
 
-        # 生成所有可能的位置，排除安全位置
-        all_positions = set(range(self.rows * self.cols))
-        available_positions = list(all_positions - safe_positions)
+    def place_mines_for(self, x, y):
+        """按第一次点击的位置用本棋盘的种子放雷，不翻开格子；用于按局号重现棋盘"""
+        if not self.mines_placed:
+            self._place_mines(x, y)
+            self.mines_placed = True
 
-        # 随机选择雷的位置
-        positions = random.sample(available_positions, self.mines)
+    @classmethod
+    def from_id(cls, board_id):
+        """按局号重现棋盘：雷已放好，第一次点击的位置为first_click_x/first_click_y"""
+        rows, cols, mines, seed, x, y, safe_zone = parse_board_id(board_id)
+        board = cls(rows, cols, mines, safe_zone, seed)
+        board.place_mines_for(x, y)
+        return board
+
+    @property
+    def board_id(self):
+        """局号；雷由种子生成之后才有，载入的固定布局没有局号"""
+        if self.first_click_x is None:
+            return None
+        return make_board_id(self.rows, self.cols, self.mines, self.seed,
+                             self.first_click_x, self.first_click_y, self.safe_zone)
+
+    def place_mines_at(self, positions):
+        """在给定的一维编号处放雷，用于随机放雷和载入预先生成好的棋盘"""
         for pos in positions:
             r, c = divmod(pos, self.cols)               # 把一维编号转换为二维坐标
             self.grid[r][c].has_mine = True             # 设置雷
 
-        # 计算每个格子周围的雷数
+        # 计算每个格子周围的雷数（放雷前不允许插旗，无需重算旗子数）
         self._calculate_adjacent()
-        self._calculate_flagged_adjacent()
+        self.mines_placed = True
 
     def _calculate_adjacent(self):
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.grid[r][c].has_mine:            # 如果格子有雷，跳过
-                    continue
-                count = 0                               # 周围雷数
-                for dr in [-1, 0, 1]:                   # 遍历周围8个格子
-                    for dc in [-1, 0, 1]:
-                        nr, nc = r + dr, c + dc                 # 计算周围格子的坐标
-                        if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                            if self.grid[nr][nc].has_mine:      # 如果周围格子有雷，雷数加1
-                                count += 1
-                self.grid[r][c].adjacent_mines = count
+        # 把雷的分布整理成平面后整体计算，再写回每个格子（有雷的格子记为0）
+        mine_plane = bytes(cell.has_mine for row in self.grid for cell in row)
+        counts = count_adjacent(mine_plane, self.rows, self.cols, exclude=mine_plane)
+        for r, row in enumerate(self.grid):
+            offset = r * self.cols
+            for c, cell in enumerate(row):
+                cell.adjacent_mines = counts[offset + c]
 
     def _calculate_flagged_adjacent(self):
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.grid[r][c].has_mine:            # 如果格子有雷，跳过
-                    continue
-                count = 0                               # 周围雷数
-                for dr in [-1, 0, 1]:                   # 遍历周围8个格子
-                    for dc in [-1, 0, 1]:
-                        nr, nc = r + dr, c + dc                 # 计算周围格子的坐标
-                        if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                            if self.grid[nr][nc].flagged:      # 如果周围格子有插旗，旗子数加1
-                                count += 1
-                self.grid[r][c].flagged_adjacent_mines = count
+        # 全盘重算每个格子周围3x3范围内的旗子数（有雷的格子记为0）
+        mine_plane = bytes(cell.has_mine for row in self.grid for cell in row)
+        flagged_plane = bytes(cell.flagged for row in self.grid for cell in row)
+        counts = count_adjacent(flagged_plane, self.rows, self.cols, exclude=mine_plane)
+        for r, row in enumerate(self.grid):
+            offset = r * self.cols
+            for c, cell in enumerate(row):
+                cell.flagged_adjacent_mines = counts[offset + c]
+
+    def _update_flagged_adjacent(self, x, y, delta):
+        # 插旗/取消插旗时只更新周围3x3范围内格子的旗子数，delta为+1或-1
+        for dr in [-1, 0, 1]:
+            for dc in [-1, 0, 1]:
+                nr, nc = x + dr, y + dc
+                if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                    neighbor = self.grid[nr][nc]
+                    if not neighbor.has_mine:           # 与全盘重算保持一致，有雷的格子不计数
+                        neighbor.flagged_adjacent_mines += delta
 
     def reveal(self, x, y):
+        """翻开格子，返回本次新翻开的格子坐标列表"""
         cell = self.grid[x][y]
         if cell.revealed or cell.flagged:   # 如果格子已翻开或已标记，跳过
-            return
+            return []
 
         # 如果是第一次点击，先放置雷
         if not self.mines_placed:
             self._place_mines(x, y)
             self.mines_placed = True
 
-        cell.revealed = True
+        self._record("reveal", x, y)
+        return self._open(x, y)
+
+    def _open(self, x, y):
+        # 翻开一个未翻开、未插旗的格子，返回新翻开的格子坐标列表
+        cell = self.grid[x][y]
         if cell.has_mine:                   # 如果格子有雷，游戏结束
+            cell.revealed = True
             self.game_over = True
-        elif cell.adjacent_mines == 0:      # 如果周围没有雷，递归打开周围8个格子中未被打开的格子
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    nr, nc = x + dr, y + dc
-                    if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                        if not self.grid[nr][nc].revealed:
-                            self.reveal(nr, nc)
-        self._calculate_flagged_adjacent()  # 重新计算所有格子周围被标记的雷数
+            return [(x, y)]
+        if cell.adjacent_mines > 0:         # 数字格子只翻开自己
+            cell.revealed = True
+            opened = [(x, y)]
+        else:                               # 周围没有雷，展开整片空白区域
+            opened = self._flood_fill(x, y)
+        self.safe_cells_left -= len(opened)
+        return opened
+
+    def chord(self, x, y):
+        """一键展开：已翻开的数字格周围旗子数等于雷数时，翻开其余所有未插旗的邻居
+
+        所有邻居及其展开的空白区域合并为一个变化列表，返回 (变化的格子坐标列表, outcome())。
+        不满足条件时不做任何操作，变化列表为空。
+        """
+        cell = self.grid[x][y]
+        if self.game_over or not cell.revealed or cell.adjacent_mines != cell.flagged_adjacent_mines:
+            return [], self.outcome()
+        targets = [(r, c)
+                   for r in range(max(x - 1, 0), min(x + 2, self.rows))
+                   for c in range(max(y - 1, 0), min(y + 2, self.cols))
+                   if not self.grid[r][c].revealed and not self.grid[r][c].flagged]
+        changed = []
+        if targets:
+            self._record("chord", x, y)
+            for r, c in targets:
+                if not self.grid[r][c].revealed:    # 可能已被前一个邻居的空白区域展开
+                    changed.extend(self._open(r, c))
+        return changed, self.outcome()
+
+    def _flood_fill(self, x, y):
+        # 扫描线填充：以一行中连续的空白格为单位展开，用显式栈代替递归，每个格子只翻开一次
+        grid = self.grid
+        rows, cols = self.rows, self.cols
+        opened = []
+        stack = [(x, y)]                    # 栈中存放待展开的空白格区段起点
+        while stack:
+            r, c = stack.pop()
+            row = grid[r]
+            if row[c].revealed:             # 已被其他区段展开过
+                continue
+
+            # 向左右延伸出连续的未翻开空白格
+            left = c
+            while left > 0:
+                neighbor = row[left - 1]
+                if neighbor.revealed or neighbor.flagged or neighbor.adjacent_mines:
+                    break
+                left -= 1
+            right = c
+            while right < cols - 1:
+                neighbor = row[right + 1]
+                if neighbor.revealed or neighbor.flagged or neighbor.adjacent_mines:
+                    break
+                right += 1
+            for cell in row[left:right + 1]:
+                cell.revealed = True
+            opened.extend(zip(repeat(r), range(left, right + 1)))
+
+            # 区段两端的数字格子
+            for nc in (left - 1, right + 1):
+                if 0 <= nc < cols:
+                    neighbor = row[nc]
+                    if not neighbor.revealed and not neighbor.flagged:
+                        neighbor.revealed = True
+                        opened.append((r, nc))
+
+            # 扫描上下两行：数字格子直接翻开，每段连续的空白格只压入一个起点
+            start = max(left - 1, 0)
+            end = min(right + 2, cols)
+            for nr in (r - 1, r + 1):
+                if not 0 <= nr < rows:
+                    continue
+                adjacent_row = grid[nr]
+                in_run = False
+                for nc in range(start, end):
+                    neighbor = adjacent_row[nc]
+                    if neighbor.revealed or neighbor.flagged:
+                        in_run = False
+                    elif neighbor.adjacent_mines:
+                        neighbor.revealed = True
+                        opened.append((nr, nc))
+                        in_run = False
+                    elif not in_run:
+                        stack.append((nr, nc))
+                        in_run = True
+        return opened
 
     def flag(self, x, y):
+        """切换格子的旗子，返回状态发生变化的格子坐标列表"""
         cell = self.grid[x][y]
         # 如果雷还没放置，不允许插旗
         if not self.mines_placed:
-            return
+            return []
         if not cell.revealed:                   # 如果格子未被翻开，标记格子
             cell.flagged = not cell.flagged     # 如果格子已标记，取消标记；如果格子未标记，标记
-            self._calculate_flagged_adjacent()  # 重新计算所有格子周围被标记的雷数
+            delta = 1 if cell.flagged else -1
+            self.flag_count += delta
+            if cell.has_mine:
+                self.flagged_mines += delta
+            self._update_flagged_adjacent(x, y, delta)  # 只更新周围格子的旗子数
+            self._record("flag", x, y)
+            return [(x, y)]
+        return []
+
+    def planes(self):
+        """返回(雷, 已翻开, 已插旗)三个平面的副本，每格一个字节，按一维编号排列"""
+        cells = [cell for row in self.grid for cell in row]
+        return (bytes(cell.has_mine for cell in cells),
+                bytes(cell.revealed for cell in cells),
+                bytes(cell.flagged for cell in cells))
+
+    def load_planes(self, mine, revealed, flagged, mines_placed=True):
+        """从三个平面恢复棋盘，周围雷数、旗子数和各计数器都重新计算"""
+        for r, row in enumerate(self.grid):
+            offset = r * self.cols
+            for c, cell in enumerate(row):
+                cell.has_mine = bool(mine[offset + c])
+                cell.revealed = bool(revealed[offset + c])
+                cell.flagged = bool(flagged[offset + c])
+        self._calculate_adjacent()
+        self._calculate_flagged_adjacent()
+        self._recount(mine, revealed, flagged, mines_placed)
+
+    def _recount(self, mine, revealed, flagged, mines_placed):
+        # 根据平面重新计算游戏结束状态和胜负计数器
+        self.mines_placed = mines_placed
+        self.game_over = count_both(mine, revealed) > 0
+        revealed_safe = revealed.count(1) - count_both(mine, revealed)
+        self.safe_cells_left = self.rows * self.cols - self.mines - revealed_safe
+        self.flag_count = flagged.count(1)
+        self.flagged_mines = count_both(mine, flagged)
 
     def is_win(self):
+        """所有安全格子都已翻开，或者旗子恰好插在所有雷上时获胜，只比较计数器"""
         # 如果雷还没放置，不可能获胜
         if not self.mines_placed:
             return False
-        count = 0
-        for r in range(self.rows):
-            for c in range(self.cols):
-                cell = self.grid[r][c]
-                if cell.has_mine and not cell.flagged:
-                    count += 1
-        if count > 1:                # 如果格子有雷且未被插旗的数量大于一个，返回False
-            return False
-        return True                     # 如果所有格子都已翻开，返回True
\ No newline at end of file
+        if self.safe_cells_left == 0:
+            return True
+        return self.flagged_mines == self.mines and self.flag_count == self.mines
+
+    def outcome(self):
+        """当前对局结果："lose"（踩雷）、"win"（获胜）或"playing"（进行中）"""
+        if self.game_over:
+            return "lose"
+        if self.is_win():
+            return "win"
+        return "playing"
+
+def _plane_property(plane_name, as_bool):
+    # 生成把格子属性映射到某个状态平面的property
+    def getter(self):
+        value = getattr(self._board, plane_name)[self._index]
+        return bool(value) if as_bool else value
+
+    def setter(self, value):
+        getattr(self._board, plane_name)[self._index] = int(value)
+
+    return property(getter, setter)
+
+class CellView:
+    """紧凑棋盘中单个格子的访问视图，属性与Cell一致"""
+    __slots__ = ("_board", "_index")
+
+    def __init__(self, board, index):
+        self._board = board
+        self._index = index
+
+    has_mine = _plane_property("mine_plane", True)
+    revealed = _plane_property("revealed_plane", True)
+    flagged = _plane_property("flagged_plane", True)
+    adjacent_mines = _plane_property("adjacent_plane", False)
+    flagged_adjacent_mines = _plane_property("flagged_adjacent_plane", False)
+
+class RowView:
+    """紧凑棋盘中一行的访问视图，支持row[c]"""
+    __slots__ = ("_board", "_offset")
+
+    def __init__(self, board, r):
+        self._board = board
+        self._offset = r * board.cols
+
+    def __len__(self):
+        return self._board.cols
+
+    def __getitem__(self, c):
+        if not 0 <= c < self._board.cols:
+            raise IndexError("列号超出棋盘范围")
+        return CellView(self._board, self._offset + c)
+
+    def __iter__(self):
+        for c in range(self._board.cols):
+            yield CellView(self._board, self._offset + c)
+
+class GridView:
+    """紧凑棋盘的grid[r][c]访问视图，让界面代码无需改动"""
+    __slots__ = ("_board",)
+
+    def __init__(self, board):
+        self._board = board
+
+    def __len__(self):
+        return self._board.rows
+
+    def __getitem__(self, r):
+        if not 0 <= r < self._board.rows:
+            raise IndexError("行号超出棋盘范围")
+        return RowView(self._board, r)
+
+    def __iter__(self):
+        for r in range(self._board.rows):
+            yield RowView(self._board, r)
+
+NONZERO = bytes([0] + [1] * 255)    # translate表：周围雷数不为0的格子变为1
+BLANK_RUN = re.compile(rb"\x00+")   # 一段连续的可展开空白格
+OPENABLE_RUN = re.compile(rb"\x01+")
+SCANLINE_CELLS = 512               # 展开的格子数超过这个值后改用整行的字节操作
+
+class CompactBoard(Board):
+    """紧凑存储的棋盘
+
+    每种格子状态单独存成一个bytearray平面（每格1字节），按一维编号 r * cols + c 访问，
+    代替每个格子一个Cell对象。grid属性是兼容的访问视图，界面代码可以照常使用grid[r][c]。
+    """
+
+    def _create_grid(self):
+        size = self.rows * self.cols
+        self.mine_plane = bytearray(size)               # 是否有雷
+        self.revealed_plane = bytearray(size)           # 是否已翻开
+        self.flagged_plane = bytearray(size)            # 是否已标记
+        self.adjacent_plane = bytearray(size)           # 临近格子中的雷数
+        self.flagged_adjacent_plane = bytearray(size)   # 相邻格子中被标记的雷数
+        return GridView(self)
+
+    def planes(self):
+        return bytes(self.mine_plane), bytes(self.revealed_plane), bytes(self.flagged_plane)
+
+    def load_planes(self, mine, revealed, flagged, mines_placed=True):
+        self.mine_plane[:] = mine
+        self.revealed_plane[:] = revealed
+        self.flagged_plane[:] = flagged
+        self._calculate_adjacent()
+        self._calculate_flagged_adjacent()
+        self._recount(mine, revealed, flagged, mines_placed)
+
+    def _place_mines(self, first_x, first_y):
+        # 直接在雷平面上抽样，不经过位置列表
+        self._sample_mines(first_x, first_y, self.mine_plane)
+        self._calculate_adjacent()
+        self.mines_placed = True
+
+    def place_mines_at(self, positions):
+        for pos in positions:
+            self.mine_plane[pos] = 1
+        self._calculate_adjacent()
+        self.mines_placed = True
+
+    def _calculate_adjacent(self):
+        self.adjacent_plane[:] = count_adjacent(self.mine_plane, self.rows, self.cols,
+                                                exclude=self.mine_plane)
+
+    def _calculate_flagged_adjacent(self):
+        self.flagged_adjacent_plane[:] = count_adjacent(self.flagged_plane, self.rows, self.cols,
+                                                        exclude=self.mine_plane)
+
+    def _update_flagged_adjacent(self, x, y, delta):
+        # 只更新周围3x3范围内格子的旗子数
+        cols = self.cols
+        mine, counts = self.mine_plane, self.flagged_adjacent_plane
+        for nr in range(max(x - 1, 0), min(x + 2, self.rows)):
+            base = nr * cols
+            for nc in range(max(y - 1, 0), min(y + 2, cols)):
+                if not mine[base + nc]:
+                    counts[base + nc] += delta
+
+    def reveal(self, x, y):
+        """翻开格子，返回本次新翻开的格子坐标列表"""
+        i = x * self.cols + y
+        if self.revealed_plane[i] or self.flagged_plane[i]:
+            return []
+
+        if not self.mines_placed:
+            self._place_mines(x, y)
+            self.mines_placed = True
+
+        self._record("reveal", x, y)
+        return self._open(x, y)
+
+    def _open(self, x, y):
+        i = x * self.cols + y
+        if self.mine_plane[i]:
+            self.revealed_plane[i] = 1
+            self.game_over = True
+            return [(x, y)]
+        if self.adjacent_plane[i]:
+            self.revealed_plane[i] = 1
+            opened = [(x, y)]
+        else:
+            opened = self._flood_fill(x, y)
+        self.safe_cells_left -= len(opened)
+        return opened
+
+    def chord(self, x, y):
+        """一键展开，返回 (变化的格子坐标列表, outcome())"""
+        cols = self.cols
+        i = x * cols + y
+        if (self.game_over or not self.revealed_plane[i]
+                or self.adjacent_plane[i] != self.flagged_adjacent_plane[i]):
+            return [], self.outcome()
+        revealed, flagged = self.revealed_plane, self.flagged_plane
+        targets = [(r, c)
+                   for r in range(max(x - 1, 0), min(x + 2, self.rows))
+                   for c in range(max(y - 1, 0), min(y + 2, cols))
+                   if not revealed[r * cols + c] and not flagged[r * cols + c]]
+        changed = []
+        if targets:
+            self._record("chord", x, y)
+            for r, c in targets:
+                if not revealed[r * cols + c]:
+                    changed.extend(self._open(r, c))
+        return changed, self.outcome()
+
+    def _flood_fill(self, x, y):
+        # 与Board相同的扫描线填充，区段整体翻开时直接写入切片；
+        # 翻开的格子超过SCANLINE_CELLS个时，剩下的部分交给_fill_runs按整行的字节操作展开
+        rows, cols = self.rows, self.cols
+        revealed, flagged, adjacent = self.revealed_plane, self.flagged_plane, self.adjacent_plane
+        opened = []
+        stack = [x * cols + y]
+        while stack and len(opened) < SCANLINE_CELLS:
+            i = stack.pop()
+            if revealed[i]:
+                continue
+            r, c = divmod(i, cols)
+            row_start = i - c
+            row_end = row_start + cols
+
+            left = i
+            while left > row_start and not (revealed[left - 1] or flagged[left - 1] or adjacent[left - 1]):
+                left -= 1
+            right = i
+            while right < row_end - 1 and not (revealed[right + 1] or flagged[right + 1] or adjacent[right + 1]):
+                right += 1
+            revealed[left:right + 1] = b"\x01" * (right - left + 1)
+            opened.extend(zip(repeat(r), range(left - row_start, right - row_start + 1)))
+
+            for j in (left - 1, right + 1):
+                if row_start <= j < row_end and not revealed[j] and not flagged[j]:
+                    revealed[j] = 1
+                    opened.append((r, j - row_start))
+
+            start = max(left - row_start - 1, 0)
+            end = min(right - row_start + 2, cols)
+            for nr in (r - 1, r + 1):
+                if not 0 <= nr < rows:
+                    continue
+                base = nr * cols
+                in_run = False
+                for j in range(base + start, base + end):
+                    if revealed[j] or flagged[j]:
+                        in_run = False
+                    elif adjacent[j]:
+                        revealed[j] = 1
+                        opened.append((nr, j - base))
+                        in_run = False
+                    elif not in_run:
+                        stack.append(j)
+                        in_run = True
+        if stack:
+            opened.extend(self._fill_runs(stack))
+        return opened
+
+    def _fill_runs(self, seeds):
+        # 大片展开：先找出与seeds相连的所有空白格区段（空白格按8个方向相连），
+        # 再把每个区段连同周围一圈一起翻开。查找区段、翻开和收集坐标都是整段的字节操作，不逐格循环
+        rows, cols = self.rows, self.cols
+        runs = {}                           # 行号 -> 这一行的空白格区段 (起点列表, 终点列表)
+        seen = set()
+        stack = []
+        for i in seeds:
+            if self.revealed_plane[i]:      # 已被扫描线阶段展开
+                continue
+            r, c = divmod(i, cols)
+            if r not in runs:
+                runs[r] = self._blank_runs(r)
+            k = bisect_right(runs[r][0], c) - 1
+            if (r, k) not in seen:
+                seen.add((r, k))
+                stack.append((r, k))
+        windows = {}                        # 行号 -> 要翻开的列范围 [(起点, 终点), ...]
+        while stack:
+            r, k = stack.pop()
+            a, b = runs[r][0][k], runs[r][1][k]
+            span = (max(a - 1, 0), min(b + 1, cols))
+            for nr in range(max(r - 1, 0), min(r + 2, rows)):
+                windows.setdefault(nr, []).append(span)
+                if nr == r:
+                    continue
+                if nr not in runs:
+                    runs[nr] = self._blank_runs(nr)
+                starts, ends = runs[nr]
+                # 上下两行中与 [a-1, b] 有重叠的区段是相连的
+                j = bisect_left(ends, a)
+                while j < len(starts) and starts[j] <= b:
+                    if (nr, j) not in seen:
+                        seen.add((nr, j))
+                        stack.append((nr, j))
+                    j += 1
+
+        # 大片展开会创建几百万个坐标元组，只含整数、不会形成循环引用，期间暂停垃圾回收，避免反复扫描
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self._open_windows(windows)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _open_windows(self, windows):
+        # 翻开 {行号: [(起点, 终点), ...]} 中的格子，返回新翻开的格子坐标列表
+        cols = self.cols
+        revealed, flagged = self.revealed_plane, self.flagged_plane
+        opened = []
+        for r, spans in windows.items():
+            base = r * cols
+            spans.sort()
+            merged = [list(spans[0])]
+            for lo, hi in spans[1:]:
+                if lo <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], hi)
+                else:
+                    merged.append([lo, hi])
+            for lo, hi in merged:
+                # 范围内已翻开或插旗的格子保持不变，其余（空白格和边上的数字格，不会有雷）全部翻开
+                closed = (int.from_bytes(revealed[base + lo:base + hi], "little")
+                          | int.from_bytes(flagged[base + lo:base + hi], "little"))
+                if closed:
+                    closed ^= int.from_bytes(b"\x01" * (hi - lo), "little")
+                    pieces = [(lo + m.start(), lo + m.end())
+                              for m in OPENABLE_RUN.finditer(closed.to_bytes(hi - lo, "little"))]
+                else:
+                    pieces = [(lo, hi)]
+                for start, end in pieces:
+                    revealed[base + start:base + end] = b"\x01" * (end - start)
+                    opened.extend(zip(repeat(r), range(start, end)))
+        return opened
+
+    def _blank_runs(self, r):
+        # 第r行中连续的可展开空白格（未翻开、未插旗、周围没有雷），返回 (起点列表, 终点列表)，终点不含
+        cols = self.cols
+        base = r * cols
+        blocked = (int.from_bytes(self.revealed_plane[base:base + cols], "little")
+                   | int.from_bytes(self.flagged_plane[base:base + cols], "little")
+                   | int.from_bytes(self.adjacent_plane[base:base + cols].translate(NONZERO), "little"))
+        starts, ends = [], []
+        for m in BLANK_RUN.finditer(blocked.to_bytes(cols, "little")):
+            starts.append(m.start())
+            ends.append(m.end())
+        return starts, ends
+
+    def flag(self, x, y):
+        """切换格子的旗子，返回状态发生变化的格子坐标列表"""
+        if not self.mines_placed:
+            return []
+        i = x * self.cols + y
+        if not self.revealed_plane[i]:
+            self.flagged_plane[i] ^= 1
+            delta = 1 if self.flagged_plane[i] else -1
+            self.flag_count += delta
+            if self.mine_plane[i]:
+                self.flagged_mines += delta
+            self._update_flagged_adjacent(x, y, delta)
+            self._record("flag", x, y)
+            return [(x, y)]
+        return []
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""无猜棋盘生成：生成从起始格子出发只靠推理就能解完的棋盘
+
+generate_no_guess在限定时间内反复生成候选棋盘并用solver.Solver验证；
+NoGuessPool在后台线程中为每个难度预先生成几个棋盘，开新局时直接取用；
+BoardWorker在后台线程中创建大棋盘、放雷，界面通过轮询取回结果。
+单独运行本文件可以查看生成尝试次数和每个棋盘的平均耗时：
+    python generator.py --difficulty 16x30_99 --boards 10
+"""
+
+import argparse
+import queue
+import random
+import threading
+import time
+
+from board import CompactBoard
+from solver import Solver
+
+POOL_SIZE = 3                       # 每个难度预先准备的棋盘数
+TIME_LIMIT = 5.0                    # 单次生成的时间上限（秒）
+RETRY_DELAY = 10.0                  # 某个难度生成超时后隔多久再试（秒），每多超时一次间隔加倍
+MAX_TIMEOUTS = 3                    # 连续超时这么多次后放弃这个难度，take直接返回None
+
+def solves_from(board, start):
+    """在已放好雷的棋盘上从start开始推理，能翻完所有安全格子则返回True"""
+    board.reveal(*start)
+    solver = Solver(board)
+    while board.safe_cells_left:
+        safe, _ = solver.solve()
+        if not safe:
+            return False
+        for cell in list(safe):
+            solver.update(board.reveal(*cell))
+    return True
+
+def generate_no_guess(rows, cols, mines, start=None, rng=None, time_limit=TIME_LIMIT):
+    """在time_limit秒内生成一个无猜棋盘
+
+    每次尝试用一个新种子、以start为第一次点击、3x3安全区生成棋盘（起始格子周围没有雷，
+    第一下能展开一片），因此棋盘可以由种子和起始格子重现，也有对应的局号。
+    返回 (种子, 起始格子, 尝试次数)；超时时种子为None。
+    """
+    rng = rng or random.Random()
+    start = start or (rows // 2, cols // 2)
+    deadline = time.perf_counter() + time_limit
+    attempts = 0
+    while time.perf_counter() < deadline:
+        attempts += 1
+        seed = rng.getrandbits(32)
+        board = CompactBoard(rows, cols, mines, safe_zone="3x3", seed=seed)
+        board.place_mines_for(*start)
+        if solves_from(board, start):
+            return seed, start, attempts
+    return None, start, attempts
+
+class NoGuessPool:
+    """在后台线程中为各难度预先生成无猜棋盘，并记录生成指标"""
+
+    def __init__(self, pool_size=POOL_SIZE, seed=None):
+        self.pool_size = pool_size
+        self.rng = random.Random(seed)
+        self.pools = {}                     # (rows, cols, mines) -> 已生成棋盘 (种子, 起始格子) 的队列
+        self.metrics = {}                   # (rows, cols, mines) -> 生成指标
+        self.timeouts = {}                  # (rows, cols, mines) -> 连续超时次数
+        self.retry_at = {}                  # (rows, cols, mines) -> 超时后下一次可以再试的时间
+        self.failed = set()                 # 已经放弃的难度（例如雷太密，几乎生成不出无猜棋盘）
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def request(self, rows, cols, mines):
+        """登记需要这个难度的棋盘，后台线程会把它的池子补满"""
+        key = (rows, cols, mines)
+        with self.lock:
+            if key not in self.pools:
+                self.pools[key] = queue.Queue(maxsize=self.pool_size)
+                self.metrics[key] = {"attempts": 0, "accepted": 0, "timeouts": 0, "seconds": 0.0}
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.wakeup.set()
+
+    def take(self, rows, cols, mines, timeout=TIME_LIMIT):
+        """取一个无猜棋盘 (种子, 起始格子)；池子为空时等待，超时或这个难度已经放弃时返回None"""
+        key = (rows, cols, mines)
+        self.request(rows, cols, mines)
+        with self.lock:
+            failed = key in self.failed
+        try:
+            if failed:
+                layout = self.pools[key].get_nowait()      # 放弃前生成好的还可以用，但不再等待
+            else:
+                layout = self.pools[key].get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.wakeup.set()                   # 取走一个后让后台线程补上
+        return layout
+
+    def run(self):
+        # 后台线程：依次补满每个难度的池子，都满了就等待下一次request/take；
+        # 刚超时的难度要等到retry_at才再试，不会一直占着CPU（和GIL）反复生成
+        delay = None
+        while True:
+            self.wakeup.wait(delay)
+            self.wakeup.clear()
+            while True:
+                now = time.monotonic()
+                with self.lock:
+                    unfilled = [key for key, pool in self.pools.items()
+                                if not pool.full() and key not in self.failed]
+                    pending = [key for key in unfilled if self.retry_at.get(key, 0) <= now]
+                    waiting = [self.retry_at[key] for key in unfilled if key not in pending]
+                if not pending:
+                    break
+                for key in pending:
+                    self.fill_one(key)
+            delay = max(min(waiting) - time.monotonic(), 0) if waiting else None
+
+    def fill_one(self, key):
+        rows, cols, mines = key
+        started = time.perf_counter()
+        seed, start, attempts = generate_no_guess(rows, cols, mines, rng=self.rng)
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            metrics = self.metrics[key]
+            metrics["attempts"] += attempts
+            metrics["seconds"] += elapsed
+            if seed is None:
+                metrics["timeouts"] += 1
+                count = self.timeouts[key] = self.timeouts.get(key, 0) + 1
+                if count >= MAX_TIMEOUTS:
+                    self.failed.add(key)
+                else:
+                    self.retry_at[key] = time.monotonic() + RETRY_DELAY * 2 ** (count - 1)
+            else:
+                metrics["accepted"] += 1
+                self.timeouts[key] = 0
+        if seed is not None:
+            self.pools[key].put((seed, start))
+
+    def stats(self, rows, cols, mines):
+        """返回生成指标：总尝试次数、成功数、超时数、是否已放弃、每个棋盘的平均尝试次数和耗时"""
+        with self.lock:
+            metrics = dict(self.metrics.get((rows, cols, mines),
+                                            {"attempts": 0, "accepted": 0, "timeouts": 0, "seconds": 0.0}))
+            metrics["gave_up"] = (rows, cols, mines) in self.failed
+        accepted = max(metrics["accepted"], 1)
+        metrics["attempts_per_board"] = metrics["attempts"] / accepted
+        metrics["seconds_per_board"] = metrics["seconds"] / accepted
+        return metrics
+
+class BoardWorker:
+    """在后台线程中执行生成棋盘、放雷等耗时任务
+
+    每个任务带一个编号，结果 (编号, 返回值, 异常) 放进结果队列；界面用after定时调用poll取回，
+    不在Tk回调中等待。编号由调用方管理，已经过时的结果由调用方丢弃。
+    """
+
+    def __init__(self):
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.thread = None
+
+    def submit(self, token, func, *args):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.tasks.put((token, func, args))
+
+    def run(self):
+        while True:
+            token, func, args = self.tasks.get()
+            try:
+                self.results.put((token, func(*args), None))
+            except Exception as e:          # 异常交给界面线程显示
+                self.results.put((token, None, e))
+
+    def poll(self):
+        """取出所有已完成的结果，不等待"""
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+def main():
+    difficulties = {"9x9_10": (9, 9, 10), "16x16_40": (16, 16, 40), "16x30_99": (16, 30, 99)}
+    parser = argparse.ArgumentParser(description="无猜棋盘生成指标")
+    parser.add_argument("--difficulty", choices=sorted(difficulties) + ["all"], default="all")
+    parser.add_argument("--boards", type=int, default=10, help="每个难度生成的棋盘数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    names = list(difficulties) if args.difficulty == "all" else [args.difficulty]
+    rng = random.Random(args.seed)
+    print(f"{'难度':<10} {'棋盘数':>6} {'超时':>4} {'平均尝试':>8} {'平均耗时(秒)':>12}")
+    for name in names:
+        rows, cols, mines = difficulties[name]
+        attempts = accepted = timeouts = 0
+        started = time.perf_counter()
+        for _ in range(args.boards):
+            seed, _, tries = generate_no_guess(rows, cols, mines, rng=rng)
+            attempts += tries
+            if seed is None:
+                timeouts += 1
+            else:
+                accepted += 1
+        elapsed = time.perf_counter() - started
+        accepted_or_one = max(accepted, 1)
+        print(f"{name:<10} {accepted:>6} {timeouts:>4} {attempts / accepted_or_one:>8.1f} "
+              f"{elapsed / accepted_or_one:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""无限棋盘：按64x64的区块按需生成，坐标可以是任意整数（包括负数）
+
+每个区块的雷由 (种子, 区块坐标) 决定，随时可以重新生成，所以只有翻开、插旗的状态需要保存。
+内存中最多保留max_chunks个区块，超出时按最近最少使用淘汰：有操作过的区块压缩后写入磁盘上的
+SQLite文件，以后用到时再读回来；从没操作过的区块直接丢弃。
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import zlib
+from collections import OrderedDict
+
+from board import count_adjacent
+from placement import sample_mines
+from snapshot import pack_bits, unpack_bits
+
+CHUNK = 64                              # 区块边长
+CHUNK_CELLS = CHUNK * CHUNK
+MAX_CHUNKS = 256                        # 内存中最多保留的区块数
+MAX_LAYOUTS = 1024                      # 缓存的雷布局数（每个4KB），载入区块时周围的布局不必重新生成
+# 雷太少时空白区域会连成无限大的一片，展开永远停不下来。空白格（周围9格都没有雷）的比例约为(1-密度)^9，
+# 按8个方向相连时比例超过约0.41就会连成无限大的一片，对应密度约0.1；0.15时空白格只占约23%，远离这个临界值
+MIN_DENSITY = 0.15
+NEIGHBOR_OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+class Chunk:
+    __slots__ = ("mine", "adjacent", "revealed", "flagged", "dirty")
+
+    def __init__(self, mine, adjacent, revealed, flagged):
+        self.mine = mine                    # 以下都是每格一个字节的平面，按 行 * CHUNK + 列 排列
+        self.adjacent = adjacent
+        self.revealed = revealed
+        self.flagged = flagged
+        self.dirty = False                  # 载入后是否有改动，淘汰时只写回有改动的区块
+
+class ChunkStore:
+    """被淘汰区块的磁盘存储：每个区块一行，保存压缩后的已翻开、已插旗位集"""
+
+    def __init__(self, path=None):
+        self.temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".chunks")
+            os.close(fd)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS chunks ("
+                              "cx INTEGER, cy INTEGER, data BLOB, PRIMARY KEY (cx, cy)) WITHOUT ROWID")
+
+    def save(self, cx, cy, chunk):
+        data = zlib.compress(pack_bits(chunk.revealed) + pack_bits(chunk.flagged))
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO chunks (cx, cy, data) VALUES (?, ?, ?)", (cx, cy, data))
+
+    def load(self, cx, cy):
+        """返回 (已翻开, 已插旗)，没有保存过时返回None"""
+        row = self.conn.execute("SELECT data FROM chunks WHERE cx = ? AND cy = ?", (cx, cy)).fetchone()
+        if row is None:
+            return None
+        data = zlib.decompress(row[0])
+        size = (CHUNK_CELLS + 7) // 8
+        return unpack_bits(data[:size], CHUNK_CELLS), unpack_bits(data[size:], CHUNK_CELLS)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+        if self.temporary:
+            os.remove(self.path)
+
+class ChunkedBoard:
+    """无限棋盘，reveal/flag/chord/outcome与Board相同，返回的坐标是全局坐标
+
+    没有固定的雷数，每个区块按density放固定数量的雷；第一次点击的3x3范围内没有雷。
+    踩雷后游戏结束，没有获胜条件。
+    """
+
+    def __init__(self, density=0.15, seed=None, store_path=None, max_chunks=MAX_CHUNKS):
+        if not MIN_DENSITY <= density < 1:
+            raise ValueError(f"雷的密度必须在{MIN_DENSITY}到1之间")
+        self.density = density
+        self.chunk_mines = round(density * CHUNK_CELLS)     # 每个区块的雷数
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.max_chunks = max_chunks
+        self.store = ChunkStore(store_path)
+        self.loaded = OrderedDict()                         # (cx, cy) -> Chunk，按最近使用排序
+        self.layouts = OrderedDict()                        # (cx, cy) -> 雷的平面，不需要保存
+        self.start = None                                   # 第一次点击的位置，决定安全区
+        self.mines_placed = False
+        self.game_over = False
+        self.revealed_count = 0
+        self.flag_count = 0
+        self.stats = {"generated": 0, "restored": 0, "evicted": 0, "written": 0}
+
+    def _layout(self, cx, cy):
+        # 区块的雷只由种子、区块坐标和第一次点击决定
+        layout = self.layouts.get((cx, cy))
+        if layout is not None:
+            self.layouts.move_to_end((cx, cy))
+            return layout
+        x, y = self.start
+        excluded = {(r - cx * CHUNK) * CHUNK + c - cy * CHUNK
+                    for r in range(x - 1, x + 2) for c in range(y - 1, y + 2)
+                    if r // CHUNK == cx and c // CHUNK == cy}
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        layout = self.layouts[(cx, cy)] = sample_mines(CHUNK_CELLS, self.chunk_mines, excluded, rng)
+        if len(self.layouts) > MAX_LAYOUTS:
+            self.layouts.popitem(last=False)
+        return layout
+
+    def _build(self, cx, cy):
+        # 生成区块：雷的布局加上周围8个区块靠边的一圈，算出周围雷数
+        width = CHUNK + 2
+        padded = bytearray(width * width)
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                layout = self._layout(cx + dr, cy + dc)
+                rows = range(CHUNK) if dr == 0 else [CHUNK - 1] if dr < 0 else [0]
+                cols = (0, CHUNK) if dc == 0 else (CHUNK - 1, CHUNK) if dc < 0 else (0, 1)
+                for r in rows:
+                    target = (r + 1 + dr * CHUNK) * width + cols[0] + 1 + dc * CHUNK
+                    padded[target:target + cols[1] - cols[0]] = layout[r * CHUNK + cols[0]:r * CHUNK + cols[1]]
+        counts = count_adjacent(padded, width, width, exclude=padded)
+        mine = bytearray()
+        adjacent = bytearray()
+        for r in range(1, CHUNK + 1):
+            mine += padded[r * width + 1:r * width + 1 + CHUNK]
+            adjacent += counts[r * width + 1:r * width + 1 + CHUNK]
+        state = self.store.load(cx, cy)
+        if state is None:
+            self.stats["generated"] += 1
+            return Chunk(mine, adjacent, bytearray(CHUNK_CELLS), bytearray(CHUNK_CELLS))
+        self.stats["restored"] += 1
+        return Chunk(mine, adjacent, *state)
+
+    def _chunk(self, cx, cy):
+        chunk = self.loaded.get((cx, cy))
+        if chunk is None:
+            chunk = self._build(cx, cy)
+            self.loaded[(cx, cy)] = chunk
+        else:
+            self.loaded.move_to_end((cx, cy))
+        return chunk
+
+    def trim(self):
+        """把内存中的区块数降到max_chunks以内；淘汰的是最久没用到的区块，调用方不能再使用之前取到的区块"""
+        while len(self.loaded) > self.max_chunks:
+            (cx, cy), chunk = self.loaded.popitem(last=False)
+            self.stats["evicted"] += 1
+            if chunk.dirty:
+                self.store.save(cx, cy, chunk)
+                self.stats["written"] += 1
+
+    def _locate(self, x, y):
+        return self._chunk(x // CHUNK, y // CHUNK), (x % CHUNK) * CHUNK + y % CHUNK
+
+    def cell(self, x, y):
+        """返回格子状态 (是否有雷, 是否已翻开, 是否已插旗, 周围雷数)，用于显示"""
+        if not self.mines_placed:
+            return (False, False, False, 0)
+        chunk, i = self._locate(x, y)
+        state = (bool(chunk.mine[i]), bool(chunk.revealed[i]), bool(chunk.flagged[i]), chunk.adjacent[i])
+        self.trim()
+        return state
+
+    def reveal(self, x, y):
+        """翻开格子，返回本次新翻开的格子坐标列表"""
+        if self.game_over:
+            return []
+        if not self.mines_placed:
+            self.start = (x, y)
+            self.mines_placed = True
+        chunk, i = self._locate(x, y)
+        if chunk.revealed[i] or chunk.flagged[i]:
+            return []
+        opened = self._open(x, y)
+        self.trim()
+        return opened
+
+    def _open(self, x, y):
+        chunk, i = self._locate(x, y)
+        if chunk.mine[i]:
+            chunk.revealed[i] = 1
+            chunk.dirty = True
+            self.game_over = True
+            return [(x, y)]
+        # 展开可以跨过区块边界，按需载入途经的区块
+        opened = []
+        stack = [(x, y)]
+        while stack:
+            if len(self.loaded) > self.max_chunks:      # 大片展开途中也限制内存，每次循环都重新取区块
+                self.trim()
+            r, c = stack.pop()
+            chunk, i = self._locate(r, c)
+            if chunk.revealed[i] or chunk.flagged[i]:
+                continue
+            chunk.revealed[i] = 1
+            chunk.dirty = True
+            opened.append((r, c))
+            if not chunk.adjacent[i]:
+                stack.extend((r + dr, c + dc) for dr, dc in NEIGHBOR_OFFSETS)
+        self.revealed_count += len(opened)
+        return opened
+
+    def flag(self, x, y):
+        """切换格子的旗子，返回状态发生变化的格子坐标列表"""
+        if not self.mines_placed or self.game_over:
+            return []
+        chunk, i = self._locate(x, y)
+        if chunk.revealed[i]:
+            return []
+        chunk.flagged[i] ^= 1
+        chunk.dirty = True
+        self.flag_count += 1 if chunk.flagged[i] else -1
+        self.trim()
+        return [(x, y)]
+
+    def chord(self, x, y):
+        """一键展开，返回 (变化的格子坐标列表, outcome())"""
+        if not self.mines_placed or self.game_over:
+            return [], self.outcome()
+        chunk, i = self._locate(x, y)
+        if not chunk.revealed[i]:
+            return [], self.outcome()
+        targets = []
+        flags = 0
+        for dr, dc in NEIGHBOR_OFFSETS:
+            neighbor, j = self._locate(x + dr, y + dc)
+            if neighbor.flagged[j]:
+                flags += 1
+            elif not neighbor.revealed[j]:
+                targets.append((x + dr, y + dc))
+        changed = []
+        if flags == chunk.adjacent[i]:
+            for r, c in targets:
+                neighbor, j = self._locate(r, c)
+                if not neighbor.revealed[j]:
+                    changed.extend(self._open(r, c))
+        self.trim()
+        return changed, self.outcome()
+
+    def outcome(self):
+        return "lose" if self.game_over else "playing"
+
+    def close(self):
+        """把所有有改动的区块写回磁盘并关闭存储（临时存储会被删除）"""
+        for (cx, cy), chunk in self.loaded.items():
+            if chunk.dirty:
+                self.store.save(cx, cy, chunk)
+        self.loaded.clear()
+        self.layouts.clear()
+        self.store.close()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""性能记录：统计界面操作从点击到刷新的耗时
+
+默认关闭，不影响正常运行。设置环境变量后启用：
+    MINESWEEPER_TRACE=1         记录点击、翻开、插旗、刷新等操作的耗时、涉及格子数和控件更新数，
+                                保存在环形缓冲区中（值为数字时作为缓冲区大小），可以在"调试"菜单中
+                                查看，或导出为JSON/CSV
+    MINESWEEPER_PROFILE=路径    用cProfile记录整个会话，退出时把统计数据写入这个文件，
+                                可以用 python -m pstats 路径 查看
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_ENV = "MINESWEEPER_TRACE"
+PROFILE_ENV = "MINESWEEPER_PROFILE"
+RING_SIZE = 2000                        # 环形缓冲区默认保存的操作数
+FIELDS = ("time", "action", "ms", "cells", "widget_updates", "depth")
+
+def _changed_cells(obj, args, kwargs, result):
+    return len(result)
+
+def _chord_cells(obj, args, kwargs, result):
+    return len(result[0])
+
+def _painted_cells(obj, args, kwargs, result):
+    changed = args[0] if args else kwargs.get("changed")
+    return obj.board.rows * obj.board.cols if changed is None else len(changed)
+
+# 被记录的方法 -> 计算涉及格子数的函数；为None时取其中各个棋盘操作的格子数之和
+TRACED_METHODS = {
+    "on_left_click": None,
+    "on_right_click": None,
+    "change_difficulty": None,
+    "update_buttons": _painted_cells,
+    "reveal": _changed_cells,
+    "flag": _changed_cells,
+    "chord": _chord_cells,
+}
+# 棋盘操作：格子数累加到外层操作上。刷新显示的格子与翻开的格子大多相同，只单独记录，不再重复累加
+BOARD_METHODS = {"reveal", "flag", "chord"}
+
+tracer = None                           # 启用后为Tracer实例
+
+class Tracer:
+    """把每次操作记录为 (开始时间, 动作, 毫秒, 涉及格子数, 控件更新数, 嵌套深度) 放入环形缓冲区
+
+    控件更新数取自渲染器的tcl_calls计数，只有界面对象上的操作才有。只记录主线程中的操作。
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.events = deque(maxlen=size)
+        self.stack = []                     # 正在执行的操作，棋盘操作的格子数累加到父操作上
+        self.origin = time.perf_counter()
+
+    def wrap(self, func, name, cells_of, board_method=False):
+        @functools.wraps(func)
+        def traced(obj, *args, **kwargs):
+            if threading.current_thread() is not threading.main_thread():
+                return func(obj, *args, **kwargs)       # 后台生成棋盘等操作不记录
+            renderer = getattr(obj, "renderer", None)
+            calls_before = renderer.tcl_calls if renderer is not None else 0
+            frame = [0]
+            self.stack.append(frame)
+            start = time.perf_counter()
+            try:
+                result = func(obj, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.stack.pop()
+            cells = cells_of(obj, args, kwargs, result) if cells_of else frame[0]
+            if self.stack and board_method:
+                self.stack[-1][0] += cells
+            renderer = getattr(obj, "renderer", None)
+            calls = renderer.tcl_calls - calls_before if renderer is not None else 0
+            self.events.append((start - self.origin, name, elapsed * 1000, cells,
+                                max(calls, 0), len(self.stack)))
+            return result
+        traced.traced = True
+        return traced
+
+    def install(self, *classes):
+        """给各个类中定义的被记录方法换上计时包装，重复调用不会重复包装"""
+        for cls in classes:
+            for name, cells_of in TRACED_METHODS.items():
+                func = cls.__dict__.get(name)
+                if func is not None and not getattr(func, "traced", False):
+                    setattr(cls, name, self.wrap(func, f"{cls.__name__}.{name}", cells_of,
+                                                 name in BOARD_METHODS))
+
+    def clear(self):
+        self.events.clear()
+
+    def summary(self):
+        """按动作汇总：{动作: {"count", "mean_ms", "p95_ms", "max_ms", "cells", "widget_updates"}}"""
+        groups = {}
+        for _, action, ms, cells, calls, _ in self.events:
+            groups.setdefault(action, []).append((ms, cells, calls))
+        result = {}
+        for action, rows in groups.items():
+            times = sorted(ms for ms, _, _ in rows)
+            result[action] = {
+                "count": len(rows),
+                "mean_ms": sum(times) / len(times),
+                "p95_ms": times[min(int(len(times) * 0.95), len(times) - 1)],
+                "max_ms": times[-1],
+                "cells": sum(cells for _, cells, _ in rows),
+                "widget_updates": sum(calls for _, _, calls in rows),
+            }
+        return result
+
+    def export_json(self, path):
+        import json
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"events": [dict(zip(FIELDS, event)) for event in self.events],
+                       "summary": self.summary()}, f, ensure_ascii=False, indent=1)
+
+    def export_csv(self, path):
+        import csv
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            writer.writerows(self.events)
+
+def install_from_env(*classes):
+    """环境变量MINESWEEPER_TRACE不为空时启用记录，返回Tracer，未启用时返回None"""
+    global tracer
+    value = os.environ.get(TRACE_ENV)
+    if not value or value == "0":
+        return None
+    if tracer is None:
+        tracer = Tracer(int(value) if value.isdigit() and int(value) > 1 else RING_SIZE)
+    tracer.install(*classes)
+    return tracer
+
+def run_profiled(func):
+    """运行func（一般是mainloop）；设置了MINESWEEPER_PROFILE时用cProfile记录并写入文件"""
+    path = os.environ.get(PROFILE_ENV)
+    if not path:
+        return func()
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(path)
+        print(f"性能分析数据已写入 {path}")
+
+def show_trace_window(master):
+    """显示性能记录窗口：每种操作的汇总和最近的操作，可以导出JSON/CSV"""
+    import tkinter as tk
+    from tkinter import filedialog
+
+    dialog = tk.Toplevel(master)
+    dialog.title("性能记录")
+    dialog.geometry("720x480")
+    text = tk.Text(dialog, font=("Consolas", 10), wrap="none")
+    scrollbar = tk.Scrollbar(dialog, orient="vertical", command=text.yview)
+    text.configure(yscrollcommand=scrollbar.set)
+
+    def refresh():
+        text.delete("1.0", "end")
+        text.insert("end", f"{'动作':<32}{'次数':>6}{'平均ms':>9}{'p95 ms':>9}{'最大ms':>9}{'格子':>9}{'控件更新':>9}\n")
+        for action, stats in sorted(tracer.summary().items()):
+            text.insert("end", f"{action:<32}{stats['count']:>6}{stats['mean_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+                               f"{stats['max_ms']:>9.2f}{stats['cells']:>9}{stats['widget_updates']:>9}\n")
+        text.insert("end", "\n最近的操作:\n")
+        for start, action, ms, cells, calls, depth in list(tracer.events)[-200:]:
+            text.insert("end", f"{start:>10.3f}s {'  ' * depth}{action:<32}{ms:>9.2f}ms {cells:>7}格 {calls:>6}次更新\n")
+
+    def export(kind):
+        path = filedialog.asksaveasfilename(parent=dialog, defaultextension=f".{kind}",
+                                            filetypes=[(kind.upper(), f"*.{kind}")])
+        if not path:
+            return
+        if kind == "json":
+            tracer.export_json(path)
+        else:
+            tracer.export_csv(path)
+
+    button_frame = tk.Frame(dialog)
+    button_frame.pack(side="bottom", pady=5)
+    for label, command in (("刷新", refresh), ("导出JSON", lambda: export("json")),
+                           ("导出CSV", lambda: export("csv")), ("清空", lambda: [tracer.clear(), refresh()])):
+        tk.Button(button_frame, text=label, command=command).pack(side="left", padx=5)
+    scrollbar.pack(side="right", fill="y")
+    text.pack(side="left", fill="both", expand=True)
+    refresh()
@@ -0,0 +1,110 @@
+import json
+import os
+import sqlite3
+
+TOP_N = 10                          # 排行榜每个难度显示的名次数
+
+class LeaderboardStore:
+    """排行榜存储，基于SQLite
+
+    每条成绩单独插入一行，按(难度, 用时)建索引，查询前N名不需要读出全部数据；
+    每次写入都在事务中完成，程序中途崩溃也不会损坏已有数据。
+    查询结果缓存在内存中，写入新成绩时清空对应难度的缓存。
+    第一次打开时会自动导入旧版的leaderboard.json；旧版数据库缺少局号列时自动补上。
+    导入时跳过的文件或成绩记在warnings中，由界面用take_warnings取出后提示给玩家。
+    """
+
+    def __init__(self, path="leaderboard.db", legacy_json="leaderboard.json"):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.conn = None                    # 第一次使用时才打开数据库
+        self.cache = {}                     # 难度 -> (名次数, 前N名列表)
+        self.difficulties_cache = None      # 有成绩的难度列表
+        self.warnings = []                  # 导入旧排行榜时遇到的问题，还没有提示给玩家
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            with self.conn:
+                self.conn.execute("CREATE TABLE IF NOT EXISTS scores ("
+                                  "id INTEGER PRIMARY KEY, difficulty TEXT NOT NULL, "
+                                  "name TEXT NOT NULL, time NUMERIC NOT NULL, board_id TEXT)")
+                self.conn.execute("CREATE INDEX IF NOT EXISTS scores_rank ON scores (difficulty, time, id)")
+                self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.migrate_columns()
+            self.migrate_json()
+        return self.conn
+
+    def migrate_columns(self):
+        # 旧版数据库的scores表没有局号列，补上后旧成绩的局号为NULL
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(scores)")]
+        if "board_id" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE scores ADD COLUMN board_id TEXT")
+
+    def migrate_json(self):
+        # 把旧版JSON排行榜导入数据库，导入过一次后不再重复导入
+        done = self.conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done or not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        try:
+            with open(self.legacy_json, 'r', encoding='utf-8') as f:
+                leaderboard = json.load(f)
+        except (OSError, ValueError) as e:
+            self.warnings.append(f"旧排行榜文件读取失败，跳过导入: {e}")
+            return
+        if not isinstance(leaderboard, dict):
+            self.warnings.append("旧排行榜文件格式不对，跳过导入")
+            return
+        rows = []
+        for difficulty, scores in leaderboard.items():
+            for score in scores if isinstance(scores, list) else []:
+                # 手工改过或写坏的成绩逐条跳过，不影响其余成绩的导入
+                try:
+                    rows.append((difficulty, str(score["name"]), float(score["time"])))
+                except (KeyError, TypeError, ValueError):
+                    self.warnings.append(f"旧排行榜中的成绩格式不对，跳过: {score!r}")
+        with self.conn:
+            self.conn.executemany("INSERT INTO scores (difficulty, name, time) VALUES (?, ?, ?)", rows)
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (self.legacy_json,))
+
+    def add_score(self, difficulty, player_name, time_seconds, board_id=None):
+        """添加一条成绩，board_id为这局的局号；写入失败时抛出sqlite3.Error，由调用方提示"""
+        with self.connect():
+            self.conn.execute("INSERT INTO scores (difficulty, name, time, board_id) VALUES (?, ?, ?, ?)",
+                              (difficulty, player_name, time_seconds, board_id))
+        self.cache.pop(difficulty, None)
+        self.difficulties_cache = None
+
+    def take_warnings(self):
+        """取出并清空还没有提示过的导入问题"""
+        warnings, self.warnings = self.warnings, []
+        return warnings
+
+    def top(self, difficulty, limit=TOP_N):
+        """某个难度用时最短的前limit名，返回[{"name": ..., "time": ..., "board_id": ...}, ...]"""
+        if difficulty not in self.cache or self.cache[difficulty][0] != limit:
+            rows = self.connect().execute(
+                "SELECT name, time, board_id FROM scores WHERE difficulty = ? ORDER BY time, id LIMIT ?",
+                (difficulty, limit)).fetchall()
+            self.cache[difficulty] = (limit, [{"name": name, "time": time, "board_id": board_id}
+                                              for name, time, board_id in rows])
+        return self.cache[difficulty][1]
+
+    def difficulties(self):
+        """有成绩的难度，按第一次出现的先后排序"""
+        if self.difficulties_cache is None:
+            rows = self.connect().execute(
+                "SELECT difficulty FROM scores GROUP BY difficulty ORDER BY MIN(id)").fetchall()
+            self.difficulties_cache = [difficulty for difficulty, in rows]
+        return self.difficulties_cache
+
+    def all_top(self, limit=TOP_N):
+        """所有难度的前limit名，格式与旧版leaderboard.json相同，每条成绩多一个局号"""
+        return {difficulty: self.top(difficulty, limit) for difficulty in self.difficulties()}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,73 @@
+import tkinter as tk
+from bisect import bisect_right
+
+class VirtualList(tk.Frame):
+    """只绘制可见行的文字列表
+
+    每行为 (文字, 字体, 颜色, 行高)。画布上只保留能显示在窗口中的文字项，滚动时改变这些项的
+    位置和内容，不为每一行创建控件，行数再多打开和滚动也一样快。
+    """
+
+    def __init__(self, master, bg='white', wheel_step=40):
+        super().__init__(master, bg=bg)
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.wheel_step = wheel_step            # 滚轮每格滚动的像素
+        self.rows = []
+        self.offsets = [0]                      # 每行顶部的位置，最后一项为总高度
+        self.items = []                         # 复用的画布文字项
+        self.top = 0                            # 窗口顶部对应的位置（像素）
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll_by(-self.wheel_step if e.delta > 0 else self.wheel_step))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll_by(-self.wheel_step))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll_by(self.wheel_step))
+
+    def set_rows(self, rows):
+        """替换全部行并滚动到顶部"""
+        self.rows = rows
+        self.offsets = [0]
+        for row in rows:
+            self.offsets.append(self.offsets[-1] + row[3])
+        self.top = 0
+        self.redraw()
+
+    def scroll_by(self, pixels):
+        height = self.canvas.winfo_height()
+        self.top = max(0, min(self.top + pixels, self.offsets[-1] - height))
+        self.redraw()
+
+    def on_scroll(self, command, value, unit=None):
+        # 滚动条回调："moveto 比例" 或 "scroll 数量 units/pages"
+        height = self.canvas.winfo_height()
+        if command == "moveto":
+            self.scroll_by(int(float(value) * self.offsets[-1]) - self.top)
+        elif unit == "pages":
+            self.scroll_by(int(value) * height)
+        else:
+            self.scroll_by(int(value) * self.wheel_step)
+
+    def redraw(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        first = max(bisect_right(self.offsets, self.top) - 1, 0)
+        last = first
+        while last < len(self.rows) and self.offsets[last] < self.top + height:
+            last += 1
+        while len(self.items) < last - first:
+            self.items.append(self.canvas.create_text(0, 0, anchor="center"))
+        for k, item in enumerate(self.items):
+            i = first + k
+            if i < last:
+                text, font, color, row_height = self.rows[i]
+                y = self.offsets[i] - self.top + row_height // 2
+                self.canvas.coords(item, width // 2, y)
+                self.canvas.itemconfigure(item, text=text, font=font, fill=color, state="normal")
+            else:
+                self.canvas.itemconfigure(item, state="hidden")
+        total = self.offsets[-1]
+        if total > height:
+            self.scrollbar.set(self.top / total, (self.top + height) / total)
+        else:
+            self.scrollbar.set(0, 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""内存映射棋盘：平面存放在文件中，由操作系统按需换入换出，用于上亿格子的压力测试
+
+文件格式：头部（尺寸、雷数、种子、第一次点击、各种计数）占HEADER_SIZE字节，之后依次是
+雷、已翻开、已插旗、周围雷数、周围旗子数五个平面，每格1字节，每个平面按HEADER_SIZE对齐。
+文件本身就是棋盘：保存只需要写回头部并刷新映射，继续游戏时直接映射文件，不需要读入或解码。
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+
+from board import Board, CompactBoard, GridView, count_adjacent
+from placement import SAFE_ZONES
+
+MAGIC = b"MSMM"
+VERSION = 2                             # 2：种子改为8字节，局号可以带任意64位以内的种子
+# 文件标识、版本、行数、列数、雷数、种子、第一次点击x/y（-1表示没有）、安全区、是否已放雷、
+# 是否结束、还未翻开的安全格子数、已插旗数、插对旗的雷数
+HEADER = struct.Struct("<4sBIIIQiiBBBQQQ")
+HEADER_SIZE = 65536                     # 头部和平面的对齐单位，是各平台mmap偏移量要求的倍数
+PLANES = ("mine_plane", "revealed_plane", "flagged_plane", "adjacent_plane", "flagged_adjacent_plane")
+STRIP_CELLS = 1 << 22                   # 分条计算周围雷数时每条的格子数，限制临时内存
+
+class MappedBoard(CompactBoard):
+    """平面为内存映射文件的CompactBoard，reveal/flag/chord等接口完全相同
+
+    path为None时使用临时文件，close时删除。用MappedBoard.open(path)继续文件中保存的游戏。
+    """
+
+    def __init__(self, rows, cols, mines, safe_zone="cell", seed=None, path=None):
+        self.path = path
+        self.existing = False
+        super().__init__(rows, cols, mines, safe_zone, seed)
+        self.flush()
+
+    @classmethod
+    def open(cls, path):
+        """映射已保存的棋盘文件，不读入平面"""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise ValueError("不是有效的棋盘文件")
+        (_, version, rows, cols, mines, seed, first_x, first_y, zone,
+         mines_placed, game_over, safe_cells_left, flag_count, flagged_mines) = HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"不支持的棋盘文件版本: {version}")
+        board = cls.__new__(cls)
+        board.path = path
+        board.existing = True
+        Board.__init__(board, rows, cols, mines, SAFE_ZONES[zone], seed)
+        if first_x >= 0:
+            board.first_click_x, board.first_click_y = first_x, first_y
+        board.mines_placed = bool(mines_placed)
+        board.game_over = bool(game_over)
+        board.safe_cells_left = safe_cells_left
+        board.flag_count = flag_count
+        board.flagged_mines = flagged_mines
+        return board
+
+    def _create_grid(self):
+        size = self.rows * self.cols
+        stride = -(-size // HEADER_SIZE) * HEADER_SIZE
+        self.temporary = self.path is None
+        if self.temporary:
+            fd, self.path = tempfile.mkstemp(suffix=".msmm")
+            os.close(fd)
+        self.file = open(self.path, "r+b" if self.existing else "w+b")
+        if not self.existing:
+            self.file.truncate(HEADER_SIZE + len(PLANES) * stride)     # 稀疏文件，未写入的部分都是0
+        for k, name in enumerate(PLANES):
+            setattr(self, name, mmap.mmap(self.file.fileno(), size, offset=HEADER_SIZE + k * stride))
+        return GridView(self)
+
+    def _count_strips(self, source, target):
+        # 整个平面一次计算需要几倍于平面大小的临时内存，这里按行分条计算，每条上下多带一行
+        rows, cols = self.rows, self.cols
+        step = max(STRIP_CELLS // cols, 1)
+        for top in range(0, rows, step):
+            bottom = min(top + step, rows)
+            lo, hi = max(top - 1, 0), min(bottom + 1, rows)
+            counts = count_adjacent(source[lo * cols:hi * cols], hi - lo, cols,
+                                    exclude=self.mine_plane[lo * cols:hi * cols])
+            target[top * cols:bottom * cols] = counts[(top - lo) * cols:(bottom - lo) * cols]
+
+    def _calculate_adjacent(self):
+        self._count_strips(self.mine_plane, self.adjacent_plane)
+
+    def _calculate_flagged_adjacent(self):
+        self._count_strips(self.flagged_plane, self.flagged_adjacent_plane)
+
+    def flush(self):
+        """保存：写回头部并把映射中的改动刷新到文件"""
+        first_x = -1 if self.first_click_x is None else self.first_click_x
+        first_y = -1 if self.first_click_y is None else self.first_click_y
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.mines, self.seed,
+                                    first_x, first_y, SAFE_ZONES.index(self.safe_zone),
+                                    self.mines_placed, self.game_over, self.safe_cells_left,
+                                    self.flag_count, self.flagged_mines))
+        self.file.flush()
+        for name in PLANES:
+            getattr(self, name).flush()
+
+    def close(self):
+        """保存并关闭文件；临时文件直接删除"""
+        if not self.temporary:
+            self.flush()
+        for name in PLANES:
+            getattr(self, name).close()
+        self.file.close()
+        if self.temporary:
+            os.remove(self.path)
@@ -1,101 +1,191 @@
 import tkinter as tk
 from tkinter import messagebox
-from typing import Optional
-import time
-import json
 import os
-from board import Board
+import threading
+import time
+import instrument
+from board import Board, CompactBoard, parse_board_id
+from renderer import RENDERERS
+from replay import Replay, apply_move
+from snapshot import AUTOSAVE_FILE, save_game, load_game
+
+# 数字颜色配置，可以在这里修改颜色
+NUMBER_COLORS = {
+    1: 'blue',
+    2: 'green',
+    3: 'red',
+    4: 'purple',
+    5: 'maroon',
+    6: 'turquoise',
+    7: 'black',
+    8: 'gray'
+}
+
+ASYNC_CELLS = 40000                     # 格子数不少于这个值时在后台线程中创建棋盘和放雷
+GENERATION_POLL_MS = 20                 # 轮询后台生成结果的间隔
+TIMER_INTERVAL_MS = 1000                # 普通计时的刷新间隔
+PRECISE_TIMER_INTERVAL_MS = 50          # 精确计时（显示到0.01秒）的刷新间隔
+PROBABILITY_POLL_MS = 50                # 等待进程池算出雷概率时的轮询间隔
+INFINITE_DENSITIES = [("基础 (15%雷)", 0.15), ("普通 (18%雷)", 0.18), ("困难 (21%雷)", 0.21)]
+
+def probability_style(p):
+    """雷概率的显示样式：百分比数字，背景从绿色（安全）渐变到红色（必定是雷）"""
+    if 0 < p < 0.01:
+        text = '<1'
+    elif 0.99 < p < 1:
+        text = '>99'
+    else:
+        text = f"{p * 100:.0f}"
+    return {'text': text, 'bg': f"#{int(120 + 135 * p):02x}{int(255 - 135 * p):02x}78", 'fg': 'black'}
 
 class MinesweeperGUI:
-    def __init__(self, master, rows=9, cols=9, mines=10):
+    def __init__(self, master, rows=9, cols=9, mines=10, board_class=None, renderer="button"):
         self.master = master
-        self.board = Board(rows, cols, mines)
-        self.buttons: list[list[Optional[tk.Button]]] = [[None for _ in range(cols)] for _ in range(rows)]
+        self.board_class = board_class                      # 棋盘存储方式，Board或CompactBoard，None时按大小选择
+        self.renderer_name = renderer                       # 棋盘渲染方式，"button"或"canvas"
+        self.no_guess = False                               # 是否使用无猜棋盘
+        self.no_guess_pool = None                           # 无猜棋盘的后台生成池，第一次使用时创建
+        self.board, self.start_cell = self.new_board(rows, cols, mines)    # start_cell为无猜棋盘的起始格子
+        self.worker = None                                  # 后台生成棋盘的线程，第一次需要时创建
+        self.save_lock = threading.Lock()                   # 自动存档依次写入，删除存档也要等写完
+        self.save_version = 0                               # 最近一次保存或删除存档的编号，旧编号的存档不再写入
+        self.generation = 0                                 # 当前后台任务的编号，旧编号的结果会被丢弃
+        self.generating = False                             # 是否正在后台生成
+        self.on_generated = None                            # 后台任务完成后在主线程中调用
+        self.pending_clicks = []                            # 放雷期间排队的点击
+        self.renderer = None                                # 棋盘渲染器，在create_widgets中创建
+        self.last_action_tcl_calls = 0                      # 上一次点击操作产生的Tcl调用次数
+        self.solver = None                                  # 提示用的推理器，第一次请求提示时创建
+        self.hint = None                                    # 当前高亮的提示 (动作, x, y)
+        self.probability_map = None                         # 雷概率计算，第一次打开概率显示时创建
+        self.show_probability = False                       # 是否在未翻开的格子上显示雷概率
+        self.probabilities = None                           # 当前局面的 ({格子: 概率}, 其余未翻开格子的概率)
+        self.probability_job = None                         # 等待进程池结果的after任务
+        self.replaying = False                              # 是否正在播放录像，播放时不响应点击
+        self.replay_job = None                              # 录像播放的after任务
         self.game_started = False
         self.start_time = 0
-        self.timer_running = False
+        self.timer_job = None                               # 计时器的after任务，只在对局进行中存在
+        self.precise_timer = False                          # 是否显示到0.01秒
         self.is_paused = False
         self.pause_time = 0                                 # 暂停的累计时间
         self.current_difficulty = f"{rows}x{cols}_{mines}"  # 当前难度标识
-        self.leaderboard_file = "leaderboard.json"
+        self.leaderboard_file = "leaderboard.json"                # 旧版排行榜，第一次打开数据库时自动导入
+        self._leaderboard = None                            # 排行榜存储，第一次用到时才打开
+        self.dialogs = {}                                   # 复用的对话框：名字 -> Toplevel
+        self.infinite_game = None                           # 打开着的无限棋盘窗口
+        # 启动时只创建菜单和顶部栏，窗口先显示出来，棋盘等第一次空闲时再创建
         self.create_menu()
-        self.create_widgets(rows, cols)
         self.create_timer()
-        self.update_buttons()
-
-    def load_leaderboard(self):
-        """加载排行榜数据"""
-        if os.path.exists(self.leaderboard_file):
-            try:
-                with open(self.leaderboard_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def save_leaderboard(self, leaderboard):
-        """保存排行榜数据"""
-        with open(self.leaderboard_file, 'w', encoding='utf-8') as f:
-            json.dump(leaderboard, f, ensure_ascii=False, indent=2)
-
-    def add_score(self, difficulty, player_name, time_seconds):
-        """添加新成绩到排行榜"""
-        leaderboard = self.load_leaderboard()
-
-        if difficulty not in leaderboard:
-            leaderboard[difficulty] = []
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.master.after_idle(self.build_board)
 
-        # 添加新成绩
-        leaderboard[difficulty].append({
-            "name": player_name,
-            "time": time_seconds
-        })
-
-        # 按时间排序（时间越短越好）
-        leaderboard[difficulty].sort(key=lambda x: x["time"])
+    def build_board(self):
+        """创建棋盘显示；已经创建过（例如启动后马上改了难度）时不再重复"""
+        if self.renderer is not None:
+            return
+        self.create_widgets(self.board.rows, self.board.cols)
+        self.top_frame.grid_configure(columnspan=self.renderer.grid_columns)
+        self.update_buttons()
 
-        # 只保留前10名
-        leaderboard[difficulty] = leaderboard[difficulty][:10]
+    @property
+    def leaderboard(self):
+        if self._leaderboard is None:
+            from leaderboard import LeaderboardStore
+            self._leaderboard = LeaderboardStore("leaderboard.db", legacy_json=self.leaderboard_file)
+        return self._leaderboard
 
-        self.save_leaderboard(leaderboard)
+    def load_leaderboard(self):
+        """加载排行榜数据，每个难度只取前10名；数据库读取失败时提示并返回空排行榜"""
+        import sqlite3
+        try:
+            return self.leaderboard.all_top()
+        except sqlite3.Error as e:
+            messagebox.showerror("排行榜", f"读取排行榜失败: {e}")
+            return {}
+        finally:
+            self.show_leaderboard_warnings()
+
+    def add_score(self, difficulty, player_name, time_seconds, board_id=None):
+        """添加新成绩到排行榜，同时记录这局的局号；保存失败时提示并返回False"""
+        import sqlite3
+        try:
+            self.leaderboard.add_score(difficulty, player_name, time_seconds, board_id)
+        except sqlite3.Error as e:
+            messagebox.showerror("排行榜", f"保存成绩失败: {e}")
+            return False
+        finally:
+            self.show_leaderboard_warnings()
         return True
 
-    def show_leaderboard(self):
-        """显示排行榜"""
-        leaderboard = self.load_leaderboard()
-
-        dialog = tk.Toplevel(self.master)
-        dialog.title("排行榜")
-        dialog.geometry("500x600")
-        dialog.resizable(False, False)
-        dialog.configure(bg='lightyellow')
-
+    def show_leaderboard_warnings(self):
+        # 打开数据库时导入旧排行榜遇到的问题，窗口程序没有控制台，用对话框提示
+        warnings = self.leaderboard.take_warnings()
+        if warnings:
+            messagebox.showwarning("排行榜", "\n".join(warnings[:10]) +
+                                   (f"\n……共{len(warnings)}条" if len(warnings) > 10 else ""))
+
+    def pooled_dialog(self, name, title, width, height, bg):
+        """取出缓存的对话框，第一次调用时创建；返回 (对话框, 是否刚创建)
+
+        对话框关闭时只是隐藏，下次显示时更新内容即可，不再重新创建控件。
+        尺寸固定，居中时直接用屏幕尺寸计算，不需要update_idletasks。
+        """
+        dialog = self.dialogs.get(name)
+        created = dialog is None
+        if created:
+            dialog = tk.Toplevel(self.master)
+            dialog.withdraw()
+            dialog.title(title)
+            dialog.resizable(False, False)
+            dialog.configure(bg=bg)
+            dialog.transient(self.master)
+            dialog.protocol("WM_DELETE_WINDOW", lambda: self.hide_dialog(dialog))
+            self.dialogs[name] = dialog
         # 居中显示
-        dialog.transient(self.master)
+        x = (dialog.winfo_screenwidth() // 2) - (width // 2)
+        y = (dialog.winfo_screenheight() // 2) - (height // 2)
+        dialog.geometry(f"{width}x{height}+{x}+{y}")
+        return dialog, created
+
+    def present_dialog(self, dialog):
+        dialog.deiconify()
+        dialog.lift()
         dialog.grab_set()
-        dialog.update_idletasks()
-        x = (dialog.winfo_screenwidth() // 2) - (500 // 2)
-        y = (dialog.winfo_screenheight() // 2) - (600 // 2)
-        dialog.geometry(f"500x600+{x}+{y}")
-
-        # 标题
-        tk.Label(dialog, text="🏆 排行榜 🏆",
-                font=("楷体", 24, "bold"),
-                bg='lightyellow', fg='darkorange').pack(pady=10)
-
-        # 创建滚动框架
-        canvas = tk.Canvas(dialog, bg='lightyellow')
-        scrollbar = tk.Scrollbar(dialog, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg='lightyellow')
 
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+    def hide_dialog(self, dialog):
+        dialog.grab_release()
+        dialog.withdraw()
 
+    def show_leaderboard(self):
+        """显示排行榜"""
+        dialog, created = self.pooled_dialog("leaderboard", "排行榜", 500, 600, 'lightyellow')
+        if created:
+            # 标题
+            tk.Label(dialog, text="🏆 排行榜 🏆",
+                    font=("楷体", 24, "bold"),
+                    bg='lightyellow', fg='darkorange').pack(pady=10)
+
+            # 按钮框架
+            button_frame = tk.Frame(dialog, bg='lightyellow')
+            button_frame.pack(side="bottom", pady=10)
+
+            # 关闭按钮
+            tk.Button(button_frame, text="关闭",
+                    font=("楷体", 12, "bold"),
+                    bg='lightcoral', fg='darkred',
+                    command=lambda: self.hide_dialog(dialog)).pack(padx=10)
+
+            # 只绘制可见行的列表，成绩再多也不会为每一条创建控件
+            from listview import VirtualList
+            dialog.score_list = VirtualList(dialog, bg='lightyellow')
+            dialog.score_list.pack(fill="both", expand=True, padx=20, pady=20)
+
+        dialog.score_list.set_rows(self.leaderboard_rows(self.load_leaderboard()))
+        self.present_dialog(dialog)
+
+    def leaderboard_rows(self, leaderboard):
+        """把排行榜整理成列表的行 (文字, 字体, 颜色, 行高)"""
         # 难度名称映射
         difficulty_names = {
             "9x9_10": "基础难度",
@@ -103,139 +193,127 @@ class MinesweeperGUI:
             "16x30_99": "困难难度"
         }
 
-        # 显示每个难度的排行榜
+        rows = []
         for difficulty, scores in leaderboard.items():
             if not scores:  # 跳过空排行榜
                 continue
 
             # 难度标题
             diff_name = difficulty_names.get(difficulty, f"自定义难度 ({difficulty})")
-            tk.Label(scrollable_frame, text=f"📊 {diff_name}",
-                    font=("楷体", 16, "bold"),
-                    bg='lightyellow', fg='darkblue').pack(pady=(20, 10))
+            rows.append((f"📊 {diff_name}", ("楷体", 16, "bold"), 'darkblue', 50))
 
             # 成绩列表
             for i, score in enumerate(scores, 1):
                 rank_emoji = ["🥇", "🥈", "🥉"][i-1] if i <= 3 else f"#{i}"
                 score_text = f"{rank_emoji} {score['name']} - {score['time']}秒"
-                tk.Label(scrollable_frame, text=score_text,
-                        font=("楷体", 12),
-                        bg='lightyellow', fg='black').pack(pady=2)
-
-            tk.Label(scrollable_frame, text="─" * 30,
-                    font=("楷体", 12),
-                    bg='lightyellow', fg='gray').pack(pady=10)
-
-        canvas.pack(side="left", fill="both", expand=True, padx=20, pady=20)
-        scrollbar.pack(side="right", fill="y")
+                rows.append((score_text, ("楷体", 12), 'black', 26))
+                if score.get("board_id"):
+                    rows.append((f"局号: {score['board_id']}", ("楷体", 9), 'gray', 16))
 
-        # 按钮框架
-        button_frame = tk.Frame(dialog, bg='lightyellow')
-        button_frame.pack(pady=10)
-
-        # 关闭按钮
-        tk.Button(button_frame, text="关闭",
-                font=("楷体", 12, "bold"),
-                bg='lightcoral', fg='darkred',
-                command=dialog.destroy).pack(padx=10)
+            rows.append(("─" * 30, ("楷体", 12), 'gray', 40))
+        return rows
 
     def show_name_input(self, time_seconds):
         """显示用户名输入对话框"""
-        dialog = tk.Toplevel(self.master)
-        dialog.title("记录成绩")
-        dialog.geometry("400x350")
-        dialog.resizable(False, False)
-        dialog.configure(bg='lightgreen')
-
-        # 居中显示
-        dialog.transient(self.master)
-        dialog.grab_set()
-        dialog.update_idletasks()
-        x = (dialog.winfo_screenwidth() // 2) - (400 // 2)
-        y = (dialog.winfo_screenheight() // 2) - (350 // 2)
-        dialog.geometry(f"400x350+{x}+{y}")
-
-        # 标题
-        tk.Label(dialog, text="🎉 恭喜获胜！",
-                font=("楷体", 20, "bold"),
-                bg='lightgreen', fg='darkgreen').pack(pady=20)
-
-        tk.Label(dialog, text=f"用时: {time_seconds} 秒",
-                font=("楷体", 16, "bold"),
-                bg='lightgreen', fg='darkgreen').pack(pady=10)
-
-        tk.Label(dialog, text="请输入你的名字:",
-                font=("楷体", 14),
-                bg='lightgreen', fg='darkgreen').pack(pady=10)
-
-        # 输入框
-        name_var = tk.StringVar()
-        name_entry = tk.Entry(dialog, textvariable=name_var,
-                            font=("楷体", 14), width=20)
-        name_entry.pack(pady=10)
-        name_entry.focus()
-
-        # 状态标签
-        status_label = tk.Label(dialog, text="",
-                            font=("楷体", 10),
-                            bg='lightgreen', fg='gray')
-        status_label.pack(pady=5)
-
-        def save_score():
-            player_name = name_var.get().strip()
-            if not player_name:
-                messagebox.showerror("错误", "请输入名字")
-                return
-
-            # 禁用按钮防止重复提交
-            save_btn.config(state='disabled')
-            status_label.config(text="正在保存成绩...", fg='blue')
-            dialog.update()
-
-            # 添加成绩到排行榜
-            success = self.add_score(self.current_difficulty, player_name, time_seconds)
-
-            if success:
-                status_label.config(text="✅ 成绩保存成功！", fg='green')
-                dialog.after(1500, dialog.destroy)  # 1.5秒后自动关闭
-                messagebox.showinfo("成功", f"成绩已保存！\n{player_name} - {time_seconds}秒")
-            else:
-                status_label.config(text="❌ 保存失败", fg='red')
-                save_btn.config(state='normal')  # 重新启用按钮
-
-        # 按钮框架
-        button_frame = tk.Frame(dialog, bg='lightgreen')
-        button_frame.pack(pady=20)
+        dialog, created = self.pooled_dialog("name_input", "记录成绩", 400, 350, 'lightgreen')
+        if created:
+            # 标题
+            tk.Label(dialog, text="🎉 恭喜获胜！",
+                    font=("楷体", 20, "bold"),
+                    bg='lightgreen', fg='darkgreen').pack(pady=20)
+
+            dialog.time_label = tk.Label(dialog, font=("楷体", 16, "bold"),
+                    bg='lightgreen', fg='darkgreen')
+            dialog.time_label.pack(pady=10)
+
+            tk.Label(dialog, text="请输入你的名字:",
+                    font=("楷体", 14),
+                    bg='lightgreen', fg='darkgreen').pack(pady=10)
+
+            # 输入框
+            dialog.name_var = tk.StringVar()
+            dialog.name_entry = tk.Entry(dialog, textvariable=dialog.name_var,
+                                font=("楷体", 14), width=20)
+            dialog.name_entry.pack(pady=10)
+
+            # 状态标签
+            dialog.status_label = tk.Label(dialog, text="",
+                                font=("楷体", 10),
+                                bg='lightgreen', fg='gray')
+            dialog.status_label.pack(pady=5)
+
+            # 按钮框架
+            button_frame = tk.Frame(dialog, bg='lightgreen')
+            button_frame.pack(pady=20)
+
+            dialog.save_btn = tk.Button(button_frame, text="保存成绩",
+                    font=("楷体", 14, "bold"),
+                    bg='lightblue', fg='darkblue',
+                    command=lambda: self.save_score(dialog))
+            dialog.save_btn.pack(side=tk.LEFT, padx=10)
+
+            tk.Button(button_frame, text="跳过",
+                    font=("楷体", 14, "bold"),
+                    bg='lightcoral', fg='darkred',
+                    command=lambda: self.hide_dialog(dialog)).pack(side=tk.LEFT, padx=10)
+
+            # 回车键绑定
+            dialog.name_entry.bind('<Return>', lambda e: self.save_score(dialog))
+            dialog.hide_job = None
+
+        # 重置上一次的内容
+        if dialog.hide_job is not None:
+            dialog.after_cancel(dialog.hide_job)
+            dialog.hide_job = None
+        dialog.time_seconds = time_seconds
+        dialog.board_id = self.board.board_id
+        dialog.time_label.config(text=f"用时: {time_seconds} 秒")
+        dialog.status_label.config(text="", fg='gray')
+        dialog.save_btn.config(state='normal')
+        self.present_dialog(dialog)
+        dialog.name_entry.focus()
+
+    def save_score(self, dialog):
+        player_name = dialog.name_var.get().strip()
+        if not player_name:
+            messagebox.showerror("错误", "请输入名字")
+            return
 
-        save_btn = tk.Button(button_frame, text="保存成绩",
-                font=("楷体", 14, "bold"),
-                bg='lightblue', fg='darkblue',
-                command=save_score)
-        save_btn.pack(side=tk.LEFT, padx=10)
+        # 禁用按钮防止重复提交
+        dialog.save_btn.config(state='disabled')
+        dialog.status_label.config(text="正在保存成绩...", fg='blue')
+        dialog.update()
 
-        tk.Button(button_frame, text="跳过",
-                font=("楷体", 14, "bold"),
-                bg='lightcoral', fg='darkred',
-                command=dialog.destroy).pack(side=tk.LEFT, padx=10)
+        # 添加成绩到排行榜
+        success = self.add_score(self.current_difficulty, player_name, dialog.time_seconds, dialog.board_id)
 
-        # 回车键绑定
-        name_entry.bind('<Return>', lambda e: save_score())
+        if success:
+            dialog.status_label.config(text="✅ 成绩保存成功！", fg='green')
+            dialog.hide_job = dialog.after(1500, lambda: self.hide_dialog(dialog))  # 1.5秒后自动关闭
+            messagebox.showinfo("成功", f"成绩已保存！\n{player_name} - {dialog.time_seconds}秒")
+        else:
+            dialog.status_label.config(text="❌ 保存失败", fg='red')
+            dialog.save_btn.config(state='normal')  # 重新启用按钮
 
     def create_timer(self):
         # 创建顶部框架，包含时间和暂停按钮
         self.top_frame = tk.Frame(self.master, bg='lightgray')
-        self.top_frame.grid(row=0, column=0, columnspan=self.board.cols, sticky='ew', pady=5)
+        columns = self.renderer.grid_columns if self.renderer is not None else 1
+        self.top_frame.grid(row=0, column=0, columnspan=columns, sticky='ew', pady=5)
 
         # 配置列权重让时间标签居中
         self.top_frame.grid_columnconfigure(0, weight=1)
         self.top_frame.grid_columnconfigure(1, weight=0)
         self.top_frame.grid_columnconfigure(2, weight=1)
 
-        # 左侧占位
-        tk.Label(self.top_frame, text="", bg='lightgray').grid(row=0, column=0)
+        # 左侧局号，第一次点击放雷后显示
+        self.board_id_label = tk.Label(self.top_frame, text="",
+                                font=("楷体", 9),
+                                bg='lightgray', fg='dimgray')
+        self.board_id_label.grid(row=0, column=0, sticky='w', padx=10)
 
         # 中间时间标签
-        self.timer_label = tk.Label(self.top_frame, text="时间: 0秒",
+        self.timer_label = tk.Label(self.top_frame, text=self.format_time(0),
                                 font=("楷体", 16, "bold"),
                                 bg='lightgray', fg='darkblue')
         self.timer_label.grid(row=0, column=1, padx=10)
@@ -247,14 +325,44 @@ class MinesweeperGUI:
                                     command=self.toggle_pause)
         self.pause_button.grid(row=0, column=2, sticky='e', padx=10)
 
-        # 启动计时器更新
+    def format_time(self, seconds):
+        if self.precise_timer:
+            return f"时间: {seconds:.2f} 秒"
+        return f"时间: {int(seconds)} 秒"
+
+    def final_time(self):
+        """对局结束时的成绩，精确计时下保留两位小数"""
+        elapsed = self.elapsed_time()
+        return round(elapsed, 2) if self.precise_timer else int(elapsed)
+
+    def start_timer(self):
+        """开始定时刷新时间显示；只在对局开始、继续时调用"""
+        self.stop_timer()
         self.update_timer()
 
+    def stop_timer(self):
+        """停止刷新时间显示，暂停、对局结束和重新开始时调用"""
+        if self.timer_job is not None:
+            self.master.after_cancel(self.timer_job)
+            self.timer_job = None
+
     def update_timer(self):
-        if self.game_started and not self.board.game_over and not self.board.is_win() and not self.is_paused:
-            elapsed_time = int(time.time() - self.start_time - self.pause_time)
-            self.timer_label.config(text=f"时间: {elapsed_time} 秒")
-        self.master.after(1000, self.update_timer)  # 每秒更新一次
+        elapsed = self.elapsed_time()
+        self.timer_label.config(text=self.format_time(elapsed))
+        if self.precise_timer:
+            delay = PRECISE_TIMER_INTERVAL_MS
+        else:
+            # 对齐到下一个整秒，避免after的误差累积导致显示跳秒
+            delay = TIMER_INTERVAL_MS - int(elapsed * 1000) % TIMER_INTERVAL_MS
+        self.timer_job = self.master.after(delay, self.update_timer)
+
+    def toggle_precise_timer(self):
+        """切换精确计时，正在计时时立即按新精度刷新"""
+        self.precise_timer = self.precise_timer_var.get()
+        if self.timer_job is not None:
+            self.start_timer()
+        elif self.game_started and not self.replaying:
+            self.timer_label.config(text=self.format_time(self.elapsed_time()))
 
     def toggle_pause(self):
         """切换暂停状态"""
@@ -264,42 +372,194 @@ class MinesweeperGUI:
         if self.is_paused:
             # 恢复游戏
             self.is_paused = False
-            self.pause_time += time.time() - self.pause_start_time
+            self.pause_time += time.monotonic() - self.pause_start_time
             self.pause_button.config(text="⏸️暂停", bg='lightyellow')
+            self.start_timer()
         else:
-            # 暂停游戏
+            # 暂停游戏，同时在后台自动存档
             self.is_paused = True
-            self.pause_start_time = time.time()
+            self.pause_start_time = time.monotonic()
             self.pause_button.config(text="▶️继续", bg='lightcoral')
+            self.stop_timer()
+            self.timer_label.config(text=self.format_time(self.elapsed_time()))
+            self.autosave()
 
     def resume_from_pause(self):
         """从暂停状态恢复（点击方格时调用）"""
         if self.is_paused:
             self.is_paused = False
-            self.pause_time += time.time() - self.pause_start_time
+            self.pause_time += time.monotonic() - self.pause_start_time
             self.pause_button.config(text="⏸️暂停", bg='lightyellow')
+            self.start_timer()
+
+    def elapsed_time(self):
+        """本局已用时间（秒），不含暂停的时间"""
+        if not self.game_started:
+            return 0
+        now = self.pause_start_time if self.is_paused else time.monotonic()
+        return now - self.start_time - self.pause_time
+
+    def game_in_progress(self):
+        return self.game_started and not self.board.game_over and not self.board.is_win()
+
+    def autosave(self, background=True):
+        """保存当前对局；平面副本在主线程中取出，编码和写文件可以放到后台线程"""
+        if not self.game_in_progress() or self.replaying:
+            return
+        args = (AUTOSAVE_FILE, self.board, self.elapsed_time(), self.current_difficulty,
+                self.board.planes(), list(self.board.moves))
+        self.save_version += 1
+        if background:
+            threading.Thread(target=self.write_autosave, args=(self.save_version, args), daemon=True).start()
+        else:
+            self.write_autosave(self.save_version, args)
+
+    def write_autosave(self, version, args):
+        # 可能在后台线程中调用；已经有更新的存档或存档已被删除时，过时的存档不再写入
+        with self.save_lock:
+            if version == self.save_version:
+                save_game(*args)
+
+    def clear_autosave(self):
+        """对局结束后删除自动存档，正在写入的存档写完后再删除，之后不会再被过时的存档写回"""
+        with self.save_lock:
+            self.save_version += 1
+            if os.path.exists(AUTOSAVE_FILE):
+                os.remove(AUTOSAVE_FILE)
+
+    def save_game(self):
+        """手动保存进度"""
+        if not self.game_in_progress():
+            messagebox.showinfo("保存进度", "当前没有进行中的对局")
+            return
+        try:
+            self.autosave(background=False)
+        except OSError as e:
+            messagebox.showerror("保存进度", f"保存失败: {e}")
+
+    def resume_game(self):
+        """载入自动存档，恢复后处于暂停状态"""
+        if not os.path.exists(AUTOSAVE_FILE):
+            messagebox.showinfo("继续上次进度", "没有找到存档")
+            return
+        try:
+            board, elapsed, difficulty = load_game(AUTOSAVE_FILE, self.create_board)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("继续上次进度", f"读取存档失败: {e}")
+            return
+        error = self.check_loaded_size(board.rows, board.cols, board.mines)
+        if error:
+            messagebox.showerror("继续上次进度", error)
+            return
+        self.change_difficulty(board.rows, board.cols, board.mines, board=board)
+        self.current_difficulty = difficulty
+        if board.mines_placed:
+            self.game_started = True
+            self.start_time = time.monotonic() - elapsed
+            self.is_paused = True
+            self.pause_start_time = time.monotonic()
+            self.pause_button.config(text="▶️继续", bg='lightcoral')
+            self.timer_label.config(text=self.format_time(elapsed))
+
+    def on_close(self):
+        # 关闭窗口前保存进行中的对局，写完再退出
+        try:
+            self.autosave(background=False)
+        except OSError as e:
+            print(f"自动存档失败: {e}")
+        self.stop_timer()
+        if self.probability_map is not None:
+            self.probability_map.close()
+        if self.infinite_game is not None:
+            self.infinite_game.close()
+        self.master.destroy()
+
+    def update_board_id(self):
+        board_id = self.board.board_id
+        self.board_id_label.config(text=f"局号: {board_id}" if board_id else "")
+
+    def copy_board_id(self):
+        """把当前局号复制到剪贴板"""
+        board_id = self.board.board_id
+        if not board_id:
+            messagebox.showinfo("复制局号", "第一次点击之后才有局号")
+            return
+        self.master.clipboard_clear()
+        self.master.clipboard_append(board_id)
+
+    def enter_board_id(self):
+        """输入局号重现一局棋盘，起始格子用★标出"""
+        from tkinter import simpledialog
+        board_id = simpledialog.askstring("输入局号", "局号:", parent=self.master)
+        if not board_id:
+            return
+        try:
+            rows, cols, mines = parse_board_id(board_id)[:3]
+        except ValueError as e:
+            messagebox.showerror("输入局号", str(e))
+            return
+        # 与自定义难度一样检查大小，局号里的棋盘不能超过当前渲染方式能显示的范围
+        error = self.check_size(rows, cols, mines)
+        if error:
+            messagebox.showerror("输入局号", error)
+            return
+        if rows * cols >= ASYNC_CELLS:                      # 大棋盘在后台线程中重现，界面不会卡住
+            self.stop_replay()
+            self.cancel_generation()
+            self.reset_timer()
+            self.start_generation(self.board_class_for(rows, cols).from_id, (board_id,),
+                                  self.show_board_from_id)
+        else:
+            self.show_board_from_id(self.board_class_for(rows, cols).from_id(board_id))
+
+    def show_board_from_id(self, board):
+        # 切换到按局号重现的棋盘，起始格子用★标出
+        self.change_difficulty(board.rows, board.cols, board.mines, board=board)
+        self.start_cell = (board.first_click_x, board.first_click_y)
+        self.update_buttons([self.start_cell])
 
     def start_game_timer(self):
         if not self.game_started:
             self.game_started = True
-            self.start_time = time.time()
+            self.start_time = time.monotonic()
             self.pause_time = 0
             self.is_paused = False
+            self.start_timer()
 
     def create_widgets(self, rows, cols):
-        for r in range(rows):
-            for c in range(cols):
-                btn = tk.Button(self.master, width=4, height=2,     # 改成正方形，调大一点
-                                command=lambda x=r, y=c: self.on_left_click(x, y))
-                btn.bind('<Button-3>', lambda e, x=r, y=c: self.on_right_click(x, y))
-                btn.grid(row=r+1, column=c)                         # 从第1行开始，第0行是计时器
-                self.buttons[r][c] = btn
+        # 创建棋盘渲染器；已有渲染器时直接复用，由渲染器决定哪些控件可以保留
+        if self.renderer is None:
+            renderer_class = RENDERERS[self.renderer_name]
+            self.renderer = renderer_class(self.master, self.cell_style,
+                                           self.on_left_click, self.on_right_click)
+        self.renderer.build(rows, cols)
+
+    def set_renderer(self, name):
+        """切换棋盘渲染方式，保留当前对局"""
+        if name == self.renderer_name:
+            return
+        # 按钮渲染每格一个控件，超出按钮渲染范围的棋盘不能切换过去
+        error = self.check_size(self.board.rows, self.board.cols, self.board.mines, renderer=name)
+        if error:
+            messagebox.showerror("切换渲染方式", f"当前棋盘太大，不能使用按钮渲染: {error}")
+            self.canvas_mode_var.set(self.renderer_name == "canvas")
+            return
+        self.renderer.destroy()
+        self.renderer = None
+        self.renderer_name = name
+        self.create_widgets(self.board.rows, self.board.cols)
+        self.top_frame.grid_configure(columnspan=self.renderer.grid_columns)
 
     def create_menu(self):
         menubar = tk.Menu(self.master)
         # 游戏菜单
         game_menu = tk.Menu(menubar, tearoff=0, font=("楷体", 11))
         game_menu.add_command(label="新游戏", command=self.restart_game)
+        game_menu.add_command(label="提示", command=self.show_hint)
+        game_menu.add_command(label="保存进度", command=self.save_game)
+        game_menu.add_command(label="继续上次进度", command=self.resume_game)
+        game_menu.add_command(label="输入局号...", command=self.enter_board_id)
+        game_menu.add_command(label="复制局号", command=self.copy_board_id)
         game_menu.add_separator()
 
         # 难度子菜单
@@ -311,39 +571,201 @@ class MinesweeperGUI:
         difficulty_menu.add_command(label="自定义难度", command=self.show_custom_difficulty)
         game_menu.add_cascade(label="难度", menu=difficulty_menu)
 
+        # 画布渲染适合大棋盘，可以滚动和缩放
+        self.canvas_mode_var = tk.BooleanVar(value=self.renderer_name == "canvas")
+        game_menu.add_checkbutton(label="画布渲染（大棋盘）", variable=self.canvas_mode_var,
+                                  command=lambda: self.set_renderer("canvas" if self.canvas_mode_var.get() else "button"))
+        # 无猜模式：从标出的起始格子开始，只靠推理就能解完
+        self.no_guess_var = tk.BooleanVar(value=self.no_guess)
+        game_menu.add_checkbutton(label="无猜模式", variable=self.no_guess_var, command=self.toggle_no_guess)
+        # 精确计时：时间显示到0.01秒，成绩也按0.01秒记录
+        self.precise_timer_var = tk.BooleanVar(value=self.precise_timer)
+        game_menu.add_checkbutton(label="精确计时（0.01秒）", variable=self.precise_timer_var,
+                                  command=self.toggle_precise_timer)
+        # 雷概率：根据可见的数字和总雷数，在未翻开的格子上显示它是雷的概率（百分比）
+        self.probability_var = tk.BooleanVar(value=self.show_probability)
+        game_menu.add_checkbutton(label="显示雷概率", variable=self.probability_var,
+                                  command=self.toggle_probability)
+
+        # 无限棋盘：按需生成的无边界棋盘，在单独的窗口中用画布渲染，可以一直滚动下去
+        infinite_menu = tk.Menu(game_menu, tearoff=0, font=("楷体", 11))
+        for label, density in INFINITE_DENSITIES:
+            infinite_menu.add_command(label=label, command=lambda d=density: self.open_infinite(d))
+        game_menu.add_cascade(label="无限棋盘", menu=infinite_menu)
+
         game_menu.add_separator()
         game_menu.add_command(label="排行榜", command=self.show_leaderboard)
-        game_menu.add_command(label="退出", command=self.master.quit)
+        game_menu.add_command(label="退出", command=self.on_close)
         menubar.add_cascade(label="游戏", menu=game_menu)
+        # 录像菜单
+        replay_menu = tk.Menu(menubar, tearoff=0, font=("楷体", 11))
+        replay_menu.add_command(label="保存本局录像", command=self.save_replay)
+        replay_menu.add_separator()
+        replay_menu.add_command(label="播放录像 (1×)", command=lambda: self.play_replay(1))
+        replay_menu.add_command(label="播放录像 (10×)", command=lambda: self.play_replay(10))
+        replay_menu.add_command(label="播放录像 (瞬间)", command=lambda: self.play_replay(None))
+        replay_menu.add_command(label="停止播放", command=self.stop_replay)
+        menubar.add_cascade(label="录像", menu=replay_menu)
+        # 调试菜单，只在设置了MINESWEEPER_TRACE时出现
+        if instrument.tracer is not None:
+            debug_menu = tk.Menu(menubar, tearoff=0, font=("楷体", 11))
+            debug_menu.add_command(label="性能记录", command=lambda: instrument.show_trace_window(self.master))
+            menubar.add_cascade(label="调试", menu=debug_menu)
         # 帮助菜单
         help_menu = tk.Menu(menubar, tearoff=0, font=("楷体", 11))
         help_menu.add_command(label="关于游戏", command=self.show_about)
         menubar.add_cascade(label="帮助", menu=help_menu)
         self.master.config(menu=menubar)
 
-    def change_difficulty(self, rows, cols, mines):
-        """改变游戏难度"""
-        self.board = Board(rows, cols, mines)
+    def change_difficulty(self, rows, cols, mines, board=None, start_cell=None):
+        """改变游戏难度，board不为None时直接使用这个棋盘（例如回放录像）
+
+        大棋盘和无猜棋盘在后台线程中创建，期间显示"正在生成"，完成后再切换过去。
+        """
+        self.stop_replay()
+        self.cancel_generation()
+        if board is None:
+            if rows * cols >= ASYNC_CELLS or self.no_guess:
+                self.reset_timer()                          # 旧对局的计时不能在生成期间继续走
+                self.start_generation(self.new_board, (rows, cols, mines),
+                                      lambda result: self.change_difficulty(rows, cols, mines, *result))
+                return
+            board, start_cell = self.new_board(rows, cols, mines)
+        self.board = board
+        self.start_cell = start_cell
+        self.reset_timer()
+        self.current_difficulty = f"{rows}x{cols}_{mines}"
+        self.solver = None
+        self.hint = None
+        self.cancel_probabilities()
+        self.update_board_id()
+
+        # 重新准备棋盘显示，渲染器会尽量复用已有控件
+        self.create_widgets(rows, cols)
+
+        # 重新配置顶部框架的列数
+        self.top_frame.grid_configure(columnspan=self.renderer.grid_columns)
+        if self.show_probability and board.mines_placed:    # 继续存档等已经放好雷的棋盘
+            self.refresh_probabilities()
+
+    def reset_timer(self):
+        """停止计时，计时和暂停状态恢复为新对局的初始值"""
+        self.stop_timer()
         self.game_started = False
         self.start_time = 0
         self.pause_time = 0
         self.is_paused = False
-        self.timer_label.config(text="时间: 0")
+        self.timer_label.config(text=self.format_time(0))
         self.pause_button.config(text="⏸️暂停", bg='lightyellow')
-        self.current_difficulty = f"{rows}x{cols}_{mines}"
-
-        # 重新创建按钮网格
-        for widget in self.master.winfo_children():
-            if isinstance(widget, tk.Button):
-                widget.destroy()
-
-        self.buttons = [[None for _ in range(cols)] for _ in range(rows)]
-
-        # 重新配置顶部框架的列数
-        self.top_frame.grid_configure(columnspan=cols)
 
-        self.create_widgets(rows, cols)
-        self.update_buttons()
+    def new_board(self, rows, cols, mines):
+        """创建新棋盘，返回 (棋盘, 起始格子)；无猜模式下载入预先生成好的布局，否则起始格子为None
+
+        可能在后台线程中调用，不能访问界面控件。
+        """
+        if self.no_guess and mines <= rows * cols - 9:      # 起始格子周围3x3不能有雷
+            if self.no_guess_pool is None:
+                from generator import NoGuessPool
+                self.no_guess_pool = NoGuessPool()
+            layout = self.no_guess_pool.take(rows, cols, mines)
+            if layout is not None:                          # 超时拿不到时退回普通棋盘
+                seed, start_cell = layout
+                board = self.create_board(rows, cols, mines, safe_zone="3x3", seed=seed)
+                board.place_mines_for(*start_cell)          # 与生成时的布局相同，也有局号
+                return board, start_cell
+        return self.create_board(rows, cols, mines), None
+
+    def board_class_for(self, rows, cols):
+        """棋盘存储方式：指定了board_class时使用指定的；否则画布渲染和大棋盘用CompactBoard（翻开大片区域
+        更快、每格内存少得多），按钮渲染的小棋盘用Board"""
+        if self.board_class is not None:
+            return self.board_class
+        if self.renderer_name == "canvas" or rows * cols >= ASYNC_CELLS:
+            return CompactBoard
+        return Board
+
+    def create_board(self, rows, cols, mines, **kwargs):
+        """按board_class_for选择的存储方式创建棋盘；也传给载入存档、录像的函数代替棋盘类"""
+        return self.board_class_for(rows, cols)(rows, cols, mines, **kwargs)
+
+    def start_generation(self, func, args, on_done):
+        """在后台线程中执行func(*args)，完成后在主线程中调用on_done(结果)"""
+        if self.worker is None:
+            from generator import BoardWorker
+            self.worker = BoardWorker()
+        self.generation += 1
+        self.generating = True
+        self.on_generated = on_done
+        self.worker.submit(self.generation, func, *args)
+        self.timer_label.config(text="正在生成棋盘…")
+        self.master.config(cursor="watch")
+        self.master.after(GENERATION_POLL_MS, self.poll_generation)
+
+    def poll_generation(self):
+        if not self.generating:
+            return
+        for token, result, error in self.worker.poll():
+            if token != self.generation:                    # 已被取消或被新任务取代
+                continue
+            on_done = self.on_generated
+            self.end_generation()
+            if error is not None:
+                self.pending_clicks = []
+                self.timer_label.config(text=self.format_time(0))
+                messagebox.showerror("错误", f"生成棋盘失败: {error}")
+            else:
+                on_done(result)
+            return
+        self.master.after(GENERATION_POLL_MS, self.poll_generation)
+
+    def end_generation(self):
+        self.generating = False
+        self.on_generated = None
+        self.master.config(cursor="")
+
+    def cancel_generation(self):
+        """放弃正在进行的后台任务和排队的点击（任务本身会执行完，但结果被丢弃）"""
+        if self.generating:
+            self.generation += 1
+            self.end_generation()
+        self.pending_clicks = []
+
+    def finish_first_click(self, _):
+        # 后台放雷完成，依次执行第一次点击和期间排队的点击
+        clicks = self.pending_clicks
+        self.pending_clicks = []
+        for handler, x, y in clicks:
+            handler(x, y)
+
+    def toggle_no_guess(self):
+        """切换无猜模式并开始新游戏"""
+        self.no_guess = self.no_guess_var.get()
+        self.restart_game()
+
+    def check_size(self, rows, cols, mines, renderer=None):
+        """检查自定义难度、局号、存档或录像的棋盘大小，超出范围时返回错误信息，否则返回None
+
+        renderer为None时按当前渲染方式检查，画布渲染可以支持更大的棋盘；
+        起始格子周围3x3不能有雷，所以雷数最多为格子数减9。
+        """
+        renderer = renderer or self.renderer_name
+        max_rows, max_cols = (1000, 1000) if renderer == "canvas" else (16, 30)
+        if rows < 5 or rows > max_rows:
+            return f"行数必须在5-{max_rows}之间"
+        if cols < 5 or cols > max_cols:
+            return f"列数必须在5-{max_cols}之间"
+        if mines < 1 or mines > rows * cols - 9:
+            return f"雷数必须在1-{rows * cols - 9}之间"
+        return None
+
+    def check_loaded_size(self, rows, cols, mines):
+        # 存档和录像中的棋盘也要检查大小；只是按钮渲染放不下时提示切换到画布渲染
+        error = self.check_size(rows, cols, mines)
+        if error and self.renderer_name != "canvas" and not self.check_size(rows, cols, mines, "canvas"):
+            return f"棋盘为{rows}x{cols}，请先在游戏菜单中打开\"画布渲染（大棋盘）\""
+        if error:
+            return f"棋盘大小不对: {error}"
+        return None
 
     def show_custom_difficulty(self):
         """显示自定义难度对话框"""
@@ -399,14 +821,9 @@ class MinesweeperGUI:
                 mines = int(mines_var.get())
 
                 # 验证输入
-                if rows < 5 or rows > 16:
-                    messagebox.showerror("错误", "行数必须在5-16之间")
-                    return
-                if cols < 5 or cols > 30:
-                    messagebox.showerror("错误", "列数必须在5-30之间")
-                    return
-                if mines < 1 or mines > rows * cols - 9:
-                    messagebox.showerror("错误", f"雷数必须在1-{rows * cols - 9}之间")
+                error = self.check_size(rows, cols, mines)
+                if error:
+                    messagebox.showerror("错误", error)
                     return
 
                 dialog.destroy()
@@ -432,36 +849,64 @@ class MinesweeperGUI:
         current_mines = self.board.mines
         self.change_difficulty(current_rows, current_cols, current_mines)
 
+    def open_infinite(self, density):
+        """打开无限棋盘窗口，已经打开时换成新密度的新棋盘"""
+        if self.infinite_game is None:
+            self.infinite_game = InfiniteGame(self.master, density, on_close=self.close_infinite)
+        else:
+            self.infinite_game.new_game(density)
+            self.infinite_game.window.lift()
+
+    def close_infinite(self):
+        self.infinite_game = None
+
     def show_about(self):
         messagebox.showinfo("关于游戏", "扫雷游戏\n作者：咸鱼\n时间：2025.7.31\npython库：使用tkinter实现\n作者自述：坐高铁，闲的慌，ai写一半，我写一半")
 
     def on_left_click(self, x, y):
+        if self.replaying:
+            return
+        if self.generating:
+            if self.pending_clicks:             # 正在为第一次点击放雷，放完后再依次执行
+                self.pending_clicks.append((self.on_left_click, x, y))
+            return
+        if self.renderer is None:               # 启动后棋盘还没创建（例如程序直接调用），先创建
+            self.build_board()
+        if self.board.outcome() != "playing":   # 对局已经结束（例如插旗获胜），不再翻开格子、重复记录成绩
+            return
         # 如果游戏暂停，自动恢复
         self.resume_from_pause()
 
+        # 大棋盘的第一次点击：在后台放雷、计算周围雷数，完成后再执行这次点击，计时从那时开始
+        if not self.board.mines_placed and self.board.rows * self.board.cols >= ASYNC_CELLS:
+            self.start_generation(self.board.place_mines_for, (x, y), self.finish_first_click)
+            self.pending_clicks = [(self.on_left_click, x, y)]
+            return
+
         # 第一次点击时启动计时器
+        first_click = not self.game_started
         self.start_game_timer()
+        calls_before = self.renderer.tcl_calls
 
         if self.board.grid[x][y].revealed:
-            # 添加功能一键展开
-            if self.board.grid[x][y].adjacent_mines == self.board.grid[x][y].flagged_adjacent_mines:
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        nr, nc = x + dr, y + dc
-                        if 0 <= nr < self.board.rows and 0 <= nc < self.board.cols:
-                            if not self.board.grid[nr][nc].revealed and not self.board.grid[nr][nc].flagged:
-                                self.board.reveal(nr, nc)
-                self.update_buttons()   # 更新界面显示
-                # 检查一键展开后是否游戏结束
-                if self.board.game_over:
+            # 一键展开：棋盘一次翻开所有符合条件的邻居，界面只刷新一次、检查一次结果
+            changed, outcome = self.board.chord(x, y)
+            if changed:
+                self.update_buttons(changed)    # 只刷新本次翻开的格子
+                self.update_solver(changed)
+                self.last_action_tcl_calls = self.renderer.tcl_calls - calls_before
+                if outcome == "lose":
                     self.show_game_over()
-                # 检查是否获胜
-                elif self.board.is_win():
+                elif outcome == "win":
                     self.show_win()
             return
         else:
-            self.board.reveal(x, y)
-            self.update_buttons()
+            changed = self.board.reveal(x, y)
+            if first_click:
+                self.update_board_id()          # 第一次点击放雷后才有局号
+            self.update_buttons(changed)
+            self.update_solver(changed)
+            self.last_action_tcl_calls = self.renderer.tcl_calls - calls_before
             # 检查是否游戏结束
             if self.board.game_over:
                 self.show_game_over()
@@ -471,197 +916,421 @@ class MinesweeperGUI:
             return
 
     def on_right_click(self, x, y):
+        if self.replaying:
+            return
+        if self.generating:
+            if self.pending_clicks:
+                self.pending_clicks.append((self.on_right_click, x, y))
+            return
+        if self.board.outcome() != "playing":       # 对局已经结束，不再改动旗子
+            return
+        if self.renderer is None:
+            self.build_board()
         # 如果游戏暂停，自动恢复
         self.resume_from_pause()
-
-        self.board.flag(x, y)
+        calls_before = self.renderer.tcl_calls
+
+        changed = self.board.flag(x, y)
+        self.update_buttons(changed)
+        self.update_solver(changed)
+        self.last_action_tcl_calls = self.renderer.tcl_calls - calls_before
+        # 所有雷都插对旗也算获胜，与左键一样停止计时并显示获胜对话框
+        if changed and self.board.outcome() == "win":
+            self.show_win()
+
+    def update_solver(self, changed):
+        # 推理器已创建时把本次变化的格子交给它增量更新
+        if self.solver is not None:
+            self.solver.update(changed)
+        if self.show_probability:
+            self.refresh_probabilities()
+
+    def toggle_probability(self):
+        self.show_probability = self.probability_var.get()
+        if self.show_probability and self.probability_map is None:
+            from probability import ProbabilityMap
+            self.probability_map = ProbabilityMap()
+        self.refresh_probabilities()
+
+    def cancel_probabilities(self):
+        if self.probability_job is not None:
+            self.master.after_cancel(self.probability_job)
+            self.probability_job = None
+        self.probabilities = None
+
+    def refresh_probabilities(self):
+        """按当前局面重新计算雷概率并刷新棋盘；大分量还在进程池中穷举时稍后再试
+
+        没有变化的分量直接使用缓存的穷举结果，一般每次操作只需要重新穷举一两个分量。
+        """
+        self.cancel_probabilities()
+        board = self.board
+        if (self.show_probability and board.mines_placed and not board.game_over
+                and not board.is_win() and not self.replaying):
+            if self.solver is None:
+                from solver import Solver
+                self.solver = Solver(board)
+            try:
+                self.probabilities = self.probability_map.compute(board, self.solver)
+            except ValueError as e:
+                self.show_probability = False
+                self.probability_var.set(False)
+                messagebox.showinfo("雷概率", f"{e}，已关闭概率显示")
+            else:
+                if self.probabilities is None:
+                    self.probability_job = self.master.after(PROBABILITY_POLL_MS, self.refresh_probabilities)
         self.update_buttons()
 
-    def update_buttons(self):
-        # 数字颜色配置，可以在这里修改颜色
-        number_colors = {
-            1: 'blue',
-            2: 'green',
-            3: 'red',
-            4: 'purple',
-            5: 'maroon',
-            6: 'turquoise',
-            7: 'black',
-            8: 'gray'
-        }
+    def show_hint(self):
+        """提示一步能确定的操作，并把对应格子高亮一会儿"""
+        if self.board.game_over or self.board.is_win():
+            return
+        if not self.board.mines_placed:
+            messagebox.showinfo("提示", "先翻开一个格子吧")
+            return
+        if self.solver is None:
+            from solver import Solver
+            self.solver = Solver(self.board)
+        hint = self.solver.hint()
+        if hint is None:
+            messagebox.showinfo("提示", "当前局面没有能确定的格子，只能猜了")
+            return
+        self.clear_hint()
+        self.hint = hint
+        self.update_buttons([hint[1:]])
+        self.master.after(1500, self.clear_hint)
+
+    def clear_hint(self):
+        if self.hint is not None:
+            cell = self.hint[1:]
+            self.hint = None
+            self.update_buttons([cell])
+
+    def save_replay(self):
+        """把本局的操作保存为录像文件"""
+        if not self.board.moves_complete:
+            messagebox.showinfo("录像", "本局从旧版存档继续，缺少之前的操作，无法保存录像")
+            return
+        if not self.board.moves:
+            messagebox.showinfo("录像", "本局还没有任何操作")
+            return
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(title="保存录像", defaultextension=".msr",
+                                            filetypes=[("扫雷录像", "*.msr")])
+        if not path:
+            return
+        try:
+            Replay.from_board(self.board).save(path)
+        except OSError as e:
+            messagebox.showerror("错误", f"保存录像失败: {e}")
+
+    def play_replay(self, speed):
+        """播放录像，speed为倍速，None表示瞬间播放到结尾"""
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(title="播放录像", filetypes=[("扫雷录像", "*.msr")])
+        if not path:
+            return
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"读取录像失败: {e}")
+            return
+        error = self.check_loaded_size(replay.rows, replay.cols, replay.mines)
+        if error:
+            messagebox.showerror("错误", error)
+            return
 
-        for r in range(self.board.rows):
-            for c in range(self.board.cols):
-                cell = self.board.grid[r][c]
-                btn = self.buttons[r][c]
-                if btn is None:
-                    continue
-                if cell.revealed:
-                    if cell.has_mine:
-                        btn.config(text='💣', bg='red', fg='white')
-                    else:
-                        if cell.adjacent_mines > 0:
-                            # 显示数字，使用配置的颜色
-                            color = number_colors.get(cell.adjacent_mines, 'black')
-                            btn.config(text=str(cell.adjacent_mines), bg='lightgrey', fg=color)
-                        else:
-                            # 空白格子
-                            btn.config(text='', bg='lightgrey')
-                elif cell.flagged:
-                    # 用红色三角形代替旗子
-                    btn.config(text='▲', bg='yellow', fg='red')
-                else:
-                    # 未翻开的格子
-                    btn.config(text='', bg='SystemButtonFace')
+        self.change_difficulty(replay.rows, replay.cols, replay.mines,
+                               board=replay.new_board(self.create_board))
+        self.replaying = True
+        self.replay_moves = replay.moves
+        self.replay_index = 0
+        self.replay_speed = speed
+        self.replay_start = time.monotonic()
+        if speed is None:
+            # 瞬间播放：一次执行所有操作，最后整体刷新一次
+            for _, action, x, y in self.replay_moves:
+                apply_move(self.board, action, x, y)
+            self.replay_index = len(self.replay_moves)
+            self.update_buttons()
+            self.finish_replay()
+        else:
+            self.replay_tick()
+
+    def replay_tick(self):
+        # 执行所有已经到时间的操作，合并变化的格子后只刷新一次
+        elapsed_ms = (time.monotonic() - self.replay_start) * 1000 * self.replay_speed
+        changed = []
+        while self.replay_index < len(self.replay_moves) and self.replay_moves[self.replay_index][0] <= elapsed_ms:
+            _, action, x, y = self.replay_moves[self.replay_index]
+            changed.extend(apply_move(self.board, action, x, y))
+            self.replay_index += 1
+        if changed:
+            self.update_buttons(changed)
+        self.timer_label.config(text=f"录像: {elapsed_ms / 1000:.1f} 秒")
+        if self.replay_index < len(self.replay_moves):
+            self.replay_job = self.master.after(30, self.replay_tick)
+        else:
+            self.replay_job = None
+            self.finish_replay()
+
+    def finish_replay(self):
+        if self.board.game_over:
+            self.update_buttons()                       # 踩雷结束时显示所有地雷
+        self.replaying = False
+        final_ms = self.replay_moves[-1][0] if self.replay_moves else 0
+        self.timer_label.config(text=f"录像: {final_ms / 1000:.1f} 秒")
+
+    def stop_replay(self):
+        """停止正在播放的录像"""
+        if self.replay_job is not None:
+            self.master.after_cancel(self.replay_job)
+            self.replay_job = None
+        self.replaying = False
+
+    def update_buttons(self, changed=None):
+        """刷新棋盘显示，changed为本次操作涉及的格子坐标，为None时检查所有格子"""
+        if self.renderer is None:           # 棋盘还没创建，创建时会整体刷新
+            return
+        if changed is None:
+            self.renderer.refresh()
+        else:
+            self.renderer.paint(changed)
+
+    def cell_style(self, r, c):
+        """返回格子当前应显示的样式"""
+        cell = self.board.grid[r][c]
+        if self.hint is not None and self.hint[1:] == (r, c) and not cell.revealed:
+            # 提示：绿色对勾表示可以翻开，橙色感叹号表示是雷，粉色叉表示旗子插错了要拔掉
+            if self.hint[0] == "reveal":
+                return {'text': '✓', 'bg': 'lightgreen', 'fg': 'darkgreen'}
+            if self.hint[0] == "unflag":
+                return {'text': '✗', 'bg': 'pink', 'fg': 'darkred'}
+            return {'text': '!', 'bg': 'orange', 'fg': 'darkred'}
+        if self.start_cell == (r, c) and not cell.revealed and not cell.flagged:
+            # 无猜棋盘的起始格子
+            return {'text': '★', 'bg': 'lightgreen', 'fg': 'darkgreen'}
+        if cell.has_mine and (cell.revealed or self.board.game_over):
+            # 踩雷或游戏结束后显示所有地雷
+            return {'text': '💣', 'bg': 'red', 'fg': 'white'}
+        if cell.revealed:
+            if cell.adjacent_mines > 0:
+                # 显示数字，使用配置的颜色
+                color = NUMBER_COLORS.get(cell.adjacent_mines, 'black')
+                return {'text': str(cell.adjacent_mines), 'bg': 'lightgrey', 'fg': color}
+            # 空白格子
+            return {'text': '', 'bg': 'lightgrey'}
+        if cell.flagged:
+            # 用红色三角形代替旗子
+            return {'text': '▲', 'bg': 'yellow', 'fg': 'red'}
+        if self.probabilities is not None:
+            probabilities, rest = self.probabilities
+            return probability_style(probabilities.get((r, c), rest))
+        # 未翻开的格子
+        return {'text': '', 'bg': 'SystemButtonFace'}
 
     def show_win(self):
         # 计算最终时间
-        final_time = int(time.time() - self.start_time - self.pause_time) if self.game_started else 0
-
-        # 创建获胜对话框
-        dialog = tk.Toplevel(self.master)
-        dialog.title("恭喜获胜！")
-        dialog.geometry("600x400")
-        dialog.resizable(False, False)
-
-        # 设置对话框背景色
-        dialog.configure(bg='lightgreen')     # 浅绿色背景
-
-        # 居中显示
-        dialog.transient(self.master)
-        dialog.grab_set()
-
-        # 计算屏幕中心位置
-        dialog.update_idletasks()           # 更新对话框尺寸
-        x = (dialog.winfo_screenwidth() // 2) - (600 // 2)
-        y = (dialog.winfo_screenheight() // 2) - (400 // 2)
-        dialog.geometry(f"600x400+{x}+{y}")
-
-        # 添加内容
-        tk.Label(dialog, text="🎉 恭喜获胜！🎉\n你成功完成了扫雷！",
-                font=("楷体", 32, "bold"),
-                bg='lightgreen', fg='darkgreen').pack(pady=30)
-        tk.Label(dialog, text=f"用时: {final_time} 秒",
-                font=("楷体", 20, "bold"),
-                bg='lightgreen', fg='darkgreen').pack(pady=10)
-        tk.Label(dialog, text="太棒了！你找到了所有的地雷！",
-                font=("楷体", 24, "bold"),
-                bg='lightgreen', fg='darkgreen').pack(pady=20)
-
-        # 按钮框架
-        button_frame = tk.Frame(dialog, bg='lightgreen')
-        button_frame.pack(pady=40)
-
-        # 创建按钮
-        record_btn = tk.Button(button_frame, text="记录成绩",
-                            font=("楷体", 18, "bold"),
-                            width=10, height=40,
-                            relief=tk.RAISED,               # 凸起的边框效果
-                            bd=3,                           # 边框宽度
-                            bg='lightblue',                 # 背景色
-                            fg='darkblue',                  # 文字颜色
-                            activebackground='skyblue',     # 点击时的背景色
-                            activeforeground='white',       # 点击时的文字颜色
-                            command=lambda: [dialog.destroy(), self.show_name_input(final_time)])
-        record_btn.pack(side=tk.LEFT, padx=30)
-
-        restart_btn = tk.Button(button_frame, text="再来一局",
-                            font=("楷体", 18, "bold"),
-                            width=10, height=40,
-                            relief=tk.RAISED,               # 凸起的边框效果
-                            bd=3,                           # 边框宽度
-                            bg='lightblue',                 # 背景色
-                            fg='darkblue',                  # 文字颜色
-                            activebackground='skyblue',     # 点击时的背景色
-                            activeforeground='white',       # 点击时的文字颜色
-                            command=lambda: [dialog.destroy(), self.restart_game()])
-        restart_btn.pack(side=tk.LEFT, padx=30)
-
-        quit_btn = tk.Button(button_frame, text="退出游戏",
-                            font=("楷体", 18, "bold"),
-                            width=10, height=30,
-                            relief=tk.RAISED,               # 凸起的边框效果
-                            bd=3,                           # 边框宽度
-                            bg='lightcoral',                # 背景色
-                            fg='darkred',                   # 文字颜色
-                            activebackground='salmon',      # 点击时的背景色
-                            activeforeground='white',       # 点击时的文字颜色
-                            command=lambda: [dialog.destroy(), self.master.quit()])
-        quit_btn.pack(side=tk.LEFT, padx=30)
+        self.stop_timer()
+        final_time = self.final_time()
+        self.timer_label.config(text=self.format_time(final_time))
+        self.clear_autosave()
+
+        # 获胜对话框只创建一次，之后隐藏再显示，只更新用时
+        dialog, created = self.pooled_dialog("win", "恭喜获胜！", 600, 400, 'lightgreen')  # 浅绿色背景
+        dialog.final_time = final_time
+        if created:
+            # 添加内容
+            tk.Label(dialog, text="🎉 恭喜获胜！🎉\n你成功完成了扫雷！",
+                    font=("楷体", 32, "bold"),
+                    bg='lightgreen', fg='darkgreen').pack(pady=30)
+            dialog.time_label = tk.Label(dialog, font=("楷体", 20, "bold"),
+                    bg='lightgreen', fg='darkgreen')
+            dialog.time_label.pack(pady=10)
+            tk.Label(dialog, text="太棒了！你找到了所有的地雷！",
+                    font=("楷体", 24, "bold"),
+                    bg='lightgreen', fg='darkgreen').pack(pady=20)
+
+            # 按钮框架
+            button_frame = tk.Frame(dialog, bg='lightgreen')
+            button_frame.pack(pady=40)
+
+            # 创建按钮
+            record_btn = tk.Button(button_frame, text="记录成绩",
+                                font=("楷体", 18, "bold"),
+                                width=10, height=40,
+                                relief=tk.RAISED,               # 凸起的边框效果
+                                bd=3,                           # 边框宽度
+                                bg='lightblue',                 # 背景色
+                                fg='darkblue',                  # 文字颜色
+                                activebackground='skyblue',     # 点击时的背景色
+                                activeforeground='white',       # 点击时的文字颜色
+                                command=lambda: [self.hide_dialog(dialog), self.show_name_input(dialog.final_time)])
+            record_btn.pack(side=tk.LEFT, padx=30)
+
+            restart_btn = tk.Button(button_frame, text="再来一局",
+                                font=("楷体", 18, "bold"),
+                                width=10, height=40,
+                                relief=tk.RAISED,               # 凸起的边框效果
+                                bd=3,                           # 边框宽度
+                                bg='lightblue',                 # 背景色
+                                fg='darkblue',                  # 文字颜色
+                                activebackground='skyblue',     # 点击时的背景色
+                                activeforeground='white',       # 点击时的文字颜色
+                                command=lambda: [self.hide_dialog(dialog), self.restart_game()])
+            restart_btn.pack(side=tk.LEFT, padx=30)
+
+            quit_btn = tk.Button(button_frame, text="退出游戏",
+                                font=("楷体", 18, "bold"),
+                                width=10, height=30,
+                                relief=tk.RAISED,               # 凸起的边框效果
+                                bd=3,                           # 边框宽度
+                                bg='lightcoral',                # 背景色
+                                fg='darkred',                   # 文字颜色
+                                activebackground='salmon',      # 点击时的背景色
+                                activeforeground='white',       # 点击时的文字颜色
+                                command=lambda: [self.hide_dialog(dialog), self.master.quit()])
+            quit_btn.pack(side=tk.LEFT, padx=30)
+
+        dialog.time_label.config(text=f"用时: {final_time} 秒")
+        self.present_dialog(dialog)
 
     def show_game_over(self):
         # 计算最终时间
-        final_time = int(time.time() - self.start_time - self.pause_time) if self.game_started else 0
+        self.stop_timer()
+        final_time = self.final_time()
+        self.timer_label.config(text=self.format_time(final_time))
+        self.clear_autosave()
 
         # 显示所有地雷
-        for r in range(self.board.rows):
-            for c in range(self.board.cols):
-                cell = self.board.grid[r][c]
-                btn = self.buttons[r][c]
-                if btn is not None and cell.has_mine:
-                    btn.config(text='💣', bg='red', fg='white')
-
-        # 创建自定义对话框
-        dialog = tk.Toplevel(self.master)
-        dialog.title("游戏结束")
-        dialog.geometry("600x400")
-        dialog.resizable(False, False)
+        self.update_buttons()
 
-        # 设置对话框背景色
-        dialog.configure(bg='lavender')     # 浅紫色背景
+        # 游戏结束对话框只创建一次，之后隐藏再显示，只更新用时
+        dialog, created = self.pooled_dialog("game_over", "游戏结束", 600, 400, 'lavender')  # 浅紫色背景
+        if created:
+            # 添加内容
+            tk.Label(dialog, text="BOOM!💣\n游戏结束",
+                    font=("楷体", 32, "bold"),
+                    bg='lavender', fg='black').pack(pady=30)
+            dialog.time_label = tk.Label(dialog, font=("楷体", 20, "bold"),
+                    bg='lavender', fg='black')
+            dialog.time_label.pack(pady=10)
+            tk.Label(dialog, text="很遗憾，你踩到雷了！",
+                    font=("楷体", 24, "bold"),
+                    bg='lavender', fg='black').pack(pady=20)
+
+            # 按钮框架
+            button_frame = tk.Frame(dialog, bg='lavender')
+            button_frame.pack(pady=40)
+
+            # 创建更大的按钮，使用更大的字体
+            restart_btn = tk.Button(button_frame, text="重新开始",
+                                font=("楷体", 18, "bold"),
+                                width=10, height=40,
+                                relief=tk.RAISED,               # 凸起的边框效果
+                                bd=3,                           # 边框宽度
+                                bg='lightblue',                 # 背景色
+                                fg='darkblue',                  # 文字颜色
+                                activebackground='skyblue',     # 点击时的背景色
+                                activeforeground='white',       # 点击时的文字颜色
+                                command=lambda: [self.hide_dialog(dialog), self.restart_game()])
+            restart_btn.pack(side=tk.LEFT, padx=30)
+
+            quit_btn = tk.Button(button_frame, text="退出游戏",
+                                font=("楷体", 18, "bold"),
+                                width=10, height=30,
+                                relief=tk.RAISED,               # 凸起的边框效果
+                                bd=3,                           # 边框宽度
+                                bg='lightcoral',                # 背景色
+                                fg='darkred',                   # 文字颜色
+                                activebackground='salmon',      # 点击时的背景色
+                                activeforeground='white',       # 点击时的文字颜色
+                                command=lambda: [self.hide_dialog(dialog), self.master.quit()])
+            quit_btn.pack(side=tk.LEFT, padx=30)
+
+        dialog.time_label.config(text=f"用时: {final_time} 秒")
+        self.present_dialog(dialog)
+
+class InfiniteGame:
+    """无限棋盘窗口：ChunkedBoard加上画布渲染器的无限视口
+
+    格子坐标可以是负数，开局时视口中心是原点；滚轮、滚动条滚动，Ctrl+滚轮缩放。
+    踩雷后游戏结束，没有获胜条件，成绩是翻开的格子数。关闭窗口时删除磁盘上的临时区块存储。
+    """
+
+    def __init__(self, master, density, on_close=None):
+        self.on_close = on_close
+        self.window = tk.Toplevel(master)
+        self.window.title("无限棋盘")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        top = tk.Frame(self.window, bg='lightgray')
+        top.grid(row=0, column=0, sticky='ew', pady=5)
+        self.status_label = tk.Label(top, font=("楷体", 14, "bold"), bg='lightgray')
+        self.status_label.pack(side=tk.LEFT, padx=10)
+        tk.Button(top, text="回到起点", font=("楷体", 11), command=self.center).pack(side=tk.RIGHT, padx=5)
+        tk.Button(top, text="重新开始", font=("楷体", 11),
+                  command=lambda: self.new_game(self.board.density)).pack(side=tk.RIGHT, padx=5)
+        self.renderer = RENDERERS["canvas"](self.window, self.cell_style, self.on_left_click, self.on_right_click)
+        self.board = None
+        self.new_game(density)
+
+    def new_game(self, density):
+        from infinite import ChunkedBoard
+        if self.board is not None:
+            self.board.close()
+        self.board = ChunkedBoard(density)
+        self.renderer.build(None, None)
+        self.center()
+        self.update_status()
+
+    def center(self):
+        # 让原点（第一次点击的位置）回到视口中间
+        x, y = self.board.start or (0, 0)
+        self.renderer.scroll_to(x - self.renderer.view_rows // 2, y - self.renderer.view_cols // 2)
+
+    def update_status(self):
+        self.status_label.config(text=f"已翻开: {self.board.revealed_count}  旗子: {self.board.flag_count}")
 
-        # 居中显示
-        dialog.transient(self.master)
-        dialog.grab_set()
-
-        # 计算屏幕中心位置
-        dialog.update_idletasks()           # 更新对话框尺寸
-        x = (dialog.winfo_screenwidth() // 2) - (600 // 2)
-        y = (dialog.winfo_screenheight() // 2) - (400 // 2)
-        dialog.geometry(f"600x400+{x}+{y}")
-
-        # 添加内容
-        tk.Label(dialog, text="BOOM!💣\n游戏结束",
-                font=("楷体", 32, "bold"),
-                bg='lavender', fg='black').pack(pady=30)
-        tk.Label(dialog, text=f"用时: {final_time} 秒",
-                font=("楷体", 20, "bold"),
-                bg='lavender', fg='black').pack(pady=10)
-        tk.Label(dialog, text="很遗憾，你踩到雷了！",
-                font=("楷体", 24, "bold"),
-                bg='lavender', fg='black').pack(pady=20)
+    def on_left_click(self, x, y):
+        if self.board.outcome() != "playing":
+            return
+        if self.board.mines_placed and self.board.cell(x, y)[1]:
+            changed, _ = self.board.chord(x, y)
+        else:
+            changed = self.board.reveal(x, y)
+        self.renderer.paint(changed)
+        self.update_status()
+        if self.board.outcome() == "lose":
+            self.renderer.refresh()             # 显示视口内所有的雷
+            messagebox.showinfo("无限棋盘", f"踩到雷了！\n共翻开 {self.board.revealed_count} 格", parent=self.window)
 
-        # 按钮框架
-        button_frame = tk.Frame(dialog, bg='lavender')
-        button_frame.pack(pady=40)
-
-        # 创建更大的按钮，使用更大的字体
-        restart_btn = tk.Button(button_frame, text="重新开始",
-                            font=("楷体", 18, "bold"),
-                            width=10, height=40,
-                            relief=tk.RAISED,               # 凸起的边框效果
-                            bd=3,                           # 边框宽度
-                            bg='lightblue',                 # 背景色
-                            fg='darkblue',                  # 文字颜色
-                            activebackground='skyblue',     # 点击时的背景色
-                            activeforeground='white',       # 点击时的文字颜色
-                            command=lambda: [dialog.destroy(), self.restart_game()])
-        restart_btn.pack(side=tk.LEFT, padx=30)
-
-        quit_btn = tk.Button(button_frame, text="退出游戏",
-                            font=("楷体", 18, "bold"),
-                            width=10, height=30,
-                            relief=tk.RAISED,               # 凸起的边框效果
-                            bd=3,                           # 边框宽度
-                            bg='lightcoral',                # 背景色
-                            fg='darkred',                   # 文字颜色
-                            activebackground='salmon',      # 点击时的背景色
-                            activeforeground='white',       # 点击时的文字颜色
-                            command=lambda: [dialog.destroy(), self.master.quit()])
-        quit_btn.pack(side=tk.LEFT, padx=30)
+    def on_right_click(self, x, y):
+        self.renderer.paint(self.board.flag(x, y))
+        self.update_status()
+
+    def cell_style(self, r, c):
+        has_mine, revealed, flagged, adjacent = self.board.cell(r, c)
+        if has_mine and (revealed or self.board.game_over):
+            return {'text': '💣', 'bg': 'red', 'fg': 'white'}
+        if revealed:
+            if adjacent > 0:
+                return {'text': str(adjacent), 'bg': 'lightgrey', 'fg': NUMBER_COLORS.get(adjacent, 'black')}
+            return {'text': '', 'bg': 'lightgrey'}
+        if flagged:
+            return {'text': '▲', 'bg': 'yellow', 'fg': 'red'}
+        return {'text': '', 'bg': 'SystemButtonFace'}
+
+    def close(self):
+        self.board.close()
+        self.window.destroy()
+        if self.on_close is not None:
+            self.on_close()
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()        # 打包成exe后，雷概率的进程池子进程从这里启动
+    instrument.install_from_env(MinesweeperGUI, Board, CompactBoard)
     root = tk.Tk()
     root.title("扫雷🐟版")
     app = MinesweeperGUI(root)
-    root.mainloop()
\ No newline at end of file
+    instrument.run_profiled(root.mainloop)
\ No newline at end of file
@@ -0,0 +1,51 @@
+import random
+
+SAFE_ZONES = ("cell", "3x3")            # 第一次点击的安全区：只有点击的格子，或者连同周围一圈
+
+def safe_cells(rows, cols, x, y, zone="cell"):
+    """安全区内格子的一维编号集合，这些格子不放雷"""
+    if not (0 <= x < rows and 0 <= y < cols):
+        return set()
+    if zone == "cell":
+        return {x * cols + y}
+    if zone == "3x3":
+        return {nr * cols + nc
+                for nr in range(max(x - 1, 0), min(x + 2, rows))
+                for nc in range(max(y - 1, 0), min(y + 2, cols))}
+    raise ValueError(f"未知的安全区: {zone}")
+
+def sample_mines(size, count, excluded=(), rng=random, plane=None):
+    """在size个格子中随机选count个放雷，避开excluded中的格子，返回标好雷的平面
+
+    使用Floyd算法直接在平面上抽样：额外内存只与安全区大小有关，不需要生成全部格子的列表。
+    先在去掉安全区后的 size - len(excluded) 个虚拟编号上抽样，再把落在安全区里的编号
+    一一换到末尾不在安全区的格子上，这样每个允许的格子被选中的概率仍然相同。
+    plane不为None时直接写入这个全为0的bytearray。
+    """
+    excluded = set(excluded)
+    available = size - len(excluded)
+    if not 0 <= count <= available:
+        raise ValueError(f"{size}个格子中去掉{len(excluded)}个安全格子后放不下{count}个雷")
+    if plane is None:
+        plane = bytearray(size)
+    rand = rng.random
+    for j in range(available - count, available):
+        t = int(rand() * (j + 1))       # 0..j之间的随机数，比randrange快很多
+        if plane[t]:
+            t = j
+        plane[t] = 1
+
+    inside = sorted(pos for pos in excluded if pos < available)
+    outside = [pos for pos in range(available, size) if pos not in excluded]
+    for pos, target in zip(inside, outside):
+        if plane[pos]:
+            plane[pos] = 0
+            plane[target] = 1
+    return plane
+
+def mine_positions(plane):
+    """依次产生平面中有雷格子的一维编号"""
+    pos = plane.find(1)
+    while pos != -1:
+        yield pos
+        pos = plane.find(1, pos + 1)
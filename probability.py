@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""雷概率：根据可见的数字和总雷数，精确计算每个未翻开格子是雷的概率
+
+边界（与数字相邻的未知格子）按约束分成互不相关的分量，每个分量穷举出各雷数下的方案数；
+不与任何数字相邻的内部格子只受总雷数约束，剩下的雷在内部的分布方法数是组合数。
+所有分量按雷数卷积，再乘上内部的组合数，就是整个局面的方案数，每个格子的概率是它为雷的方案所占的比例。
+"""
+
+import math
+from collections import OrderedDict
+
+from solver import enumerate_component
+
+CACHE_SIZE = 4096                       # 缓存的分量穷举结果数
+POOL_CELLS = 20                         # 未知格子数超过这个值的分量交给进程池穷举，界面不会卡住
+# 单个分量允许的最大未知格子数。穷举时间与合法方案数成正比，32格的分量在最坏情况下也要十几秒，再大无法接受
+MAX_CELLS = 32
+
+def canonical(cells, constraints):
+    """返回 (缓存键, 排好序的格子列表)
+
+    穷举结果只与格子数和各约束包含哪些格子、需要几个雷有关，与分量在棋盘上的位置无关。
+    格子按坐标排序后用序号表示约束，重复的约束合并，这样同样结构的分量在哪里出现都命中同一个缓存。
+    """
+    cells = sorted(cells)
+    index = {cell: i for i, cell in enumerate(cells)}
+    rules = {(tuple(sorted(index[cell] for cell in unknowns)), remaining) for unknowns, remaining in constraints}
+    return (len(cells), tuple(sorted(rules))), cells
+
+def enumerate_key(key):
+    """按缓存键穷举，返回值与enumerate_component相同；在进程池中运行"""
+    size, rules = key
+    return enumerate_component(list(range(size)), [(set(unknowns), remaining) for unknowns, remaining in rules])
+
+def _comb(n, k):
+    return math.comb(n, k) if 0 <= k <= n else 0
+
+def _convolve(a, b):
+    # 两组 {雷数: 方案数} 合并成一组
+    result = {}
+    for m, x in a.items():
+        for k, y in b.items():
+            result[m + k] = result.get(m + k, 0) + x * y
+    return result
+
+def combine(components, interior, remaining):
+    """把各分量的穷举结果与内部格子合起来计算概率
+
+    components为[(格子列表, 穷举结果), ...]，interior为内部格子数，remaining为还未确定位置的雷数。
+    返回 ({边界格子: 概率}, 内部格子的概率)，局面没有合法方案时返回None。
+    """
+    weights = [{m: total for m, (total, _) in results.items()} for _, results in components]
+    # prefix[i]为前i个分量的卷积，suffix[i]为第i个之后所有分量的卷积，用来得到"除了第i个以外"的卷积
+    prefix = [{0: 1}]
+    for weight in weights:
+        prefix.append(_convolve(prefix[-1], weight))
+    suffix = [{0: 1}] * (len(weights) + 1)
+    for i in range(len(weights) - 1, -1, -1):
+        suffix[i] = _convolve(weights[i], suffix[i + 1])
+
+    everything = prefix[-1]
+    total = sum(x * _comb(interior, remaining - m) for m, x in everything.items())
+    if not total:
+        return None
+    probabilities = {}
+    for i, (cells, results) in enumerate(components):
+        others = _convolve(prefix[i], suffix[i + 1])
+        mine_weights = [0] * len(cells)
+        for m, (_, counts) in results.items():
+            factor = sum(x * _comb(interior, remaining - m - k) for k, x in others.items())
+            if factor:
+                for j, count in enumerate(counts):
+                    mine_weights[j] += count * factor
+        for cell, weight in zip(cells, mine_weights):
+            probabilities[cell] = weight / total
+    interior_probability = 0.0
+    if interior:
+        interior_probability = sum(x * _comb(interior - 1, remaining - m - 1) for m, x in everything.items()) / total
+    return probabilities, interior_probability
+
+class ProbabilityMap:
+    """计算局面的雷概率，按缓存键缓存每个分量的穷举结果
+
+    一次操作通常只改变一两个分量，其余分量的缓存键不变，直接使用缓存，只有变化的分量需要重新穷举。
+    大分量提交给进程池，结果没出来时compute返回None，过一会儿再调用即可。
+    close时直接结束进程池中的进程，正在进行的穷举不会拖住程序退出。
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache = OrderedDict()          # 缓存键 -> 穷举结果，按最近使用排序
+        self.cache_size = cache_size
+        self.pending = {}                   # 缓存键 -> 进程池中的任务（AsyncResult）
+        self.pool = None                    # 第一次遇到大分量时创建，创建失败时为False，在本进程中穷举
+        self.hits = 0
+        self.misses = 0
+
+    def _get_pool(self):
+        if self.pool is None:
+            try:
+                import multiprocessing
+                self.pool = multiprocessing.Pool()      # 与ProcessPoolExecutor不同，可以terminate正在运行的任务
+            except (ImportError, OSError, NotImplementedError):
+                self.pool = False
+        return self.pool
+
+    def _lookup(self, key):
+        # 返回穷举结果；已提交给进程池但还没完成时返回None
+        results = self.cache.get(key)
+        if results is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return results
+        job = self.pending.get(key)
+        if job is not None:
+            if not job.ready():
+                return None
+            del self.pending[key]
+            results = job.get()
+        else:
+            self.misses += 1
+            if key[0] > POOL_CELLS and self._get_pool():
+                self.pending[key] = self.pool.apply_async(enumerate_key, (key,))
+                return None
+            results = enumerate_key(key)
+        self.cache[key] = results
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return results
+
+    def compute(self, board, solver):
+        """返回 ({格子: 概率}, 其余未翻开格子的概率)；有分量还在进程池中穷举时返回None
+
+        solver为这个棋盘的Solver，推理出的安全格子和雷的概率为0和1。
+        分量超过MAX_CELLS个格子或局面没有合法方案时抛出ValueError。
+        """
+        safe, mines = solver.solve()
+        components = []
+        waiting = False
+        frontier = 0
+        for cells, keys in solver.components():
+            if len(cells) > MAX_CELLS:
+                raise ValueError(f"边界分量有{len(cells)}个未知格子，无法精确计算")
+            key, cells = canonical(cells, [solver.constraints[k] for k in keys])
+            results = self._lookup(key)
+            if results is None:
+                waiting = True              # 继续查找其余分量，让它们也尽早提交给进程池
+                continue
+            components.append((cells, results))
+            frontier += len(cells)
+        if waiting:
+            return None
+
+        unrevealed = board.mines + board.safe_cells_left
+        interior = unrevealed - len(safe) - len(mines) - frontier
+        result = combine(components, interior, board.mines - len(mines))
+        if result is None:
+            raise ValueError("局面没有合法的布雷方案")
+        probabilities, interior_probability = result
+        probabilities.update(dict.fromkeys(safe, 0.0))
+        probabilities.update(dict.fromkeys(mines, 1.0))
+        return probabilities, interior_probability
+
+    def close(self):
+        if self.pool:
+            self.pool.terminate()
+        self.pool = None
+        self.pending.clear()
@@ -0,0 +1,251 @@
+import tkinter as tk
+
+def wheel_steps(delta):
+    """把滚轮事件的delta换算成滚动的格数，向上滚为负
+
+    Windows上每格滚轮的delta是120的倍数；macOS上delta只有±1、±2这样的小数值，整除120会得到0或-1，
+    向下滚不动、向上滚却能滚动，所以不足120时按方向滚一格。
+    """
+    if abs(delta) < 120:
+        return 0 if delta == 0 else -1 if delta > 0 else 1
+    return -delta // 120
+
+class ButtonRenderer:
+    """每个格子一个tk.Button的棋盘渲染器（原有的显示方式）"""
+
+    def __init__(self, master, style_of, on_left_click, on_right_click):
+        self.master = master
+        self.style_of = style_of                # 回调：style_of(r, c)返回格子的显示样式
+        self.on_left_click = on_left_click
+        self.on_right_click = on_right_click
+        self.rows = 0
+        self.cols = 0
+        self.buttons = []
+        self.button_styles = []                 # 每个按钮当前的显示样式
+        self.tcl_calls = 0                      # 刷新时累计的btn.config调用次数
+
+    @property
+    def grid_columns(self):
+        # 棋盘在主窗口中占用的列数，顶部计时器框架要横跨这些列
+        return self.cols
+
+    def build(self, rows, cols):
+        """为rows x cols的棋盘准备按钮，尺寸不变时直接复用已有按钮"""
+        if (rows, cols) != (self.rows, self.cols) or not self.buttons:
+            self.destroy()
+            self.rows, self.cols = rows, cols
+            self.buttons = [[None for _ in range(cols)] for _ in range(rows)]
+            self.button_styles = [[None for _ in range(cols)] for _ in range(rows)]
+            for r in range(rows):
+                for c in range(cols):
+                    btn = tk.Button(self.master, width=4, height=2,     # 改成正方形，调大一点
+                                    command=lambda x=r, y=c: self.on_left_click(x, y))
+                    btn.bind('<Button-3>', lambda e, x=r, y=c: self.on_right_click(x, y))
+                    btn.grid(row=r+1, column=c)                         # 从第1行开始，第0行是计时器
+                    self.buttons[r][c] = btn
+        self.refresh()
+
+    def refresh(self):
+        """按当前棋盘状态检查所有格子"""
+        self.paint((r, c) for r in range(self.rows) for c in range(self.cols))
+
+    def paint(self, cells):
+        """刷新指定格子，样式与按钮当前显示相同时不调用btn.config"""
+        for r, c in cells:
+            style = self.style_of(r, c)
+            if self.button_styles[r][c] == style:
+                continue
+            self.buttons[r][c].config(**style)
+            self.button_styles[r][c] = style
+            self.tcl_calls += 1
+
+    def destroy(self):
+        for row in self.buttons:
+            for btn in row:
+                if btn is not None:
+                    btn.destroy()
+        self.buttons = []
+        self.button_styles = []
+
+class CanvasRenderer:
+    """整个棋盘画在一个Canvas上的渲染器
+
+    只为可见区域（视口）里的格子创建矩形和文字图元，滚动、缩放或重新开局时复用这些图元，
+    只改它们对应的棋盘格子和样式，所以图元数量与棋盘大小无关，十万格以上的棋盘也能流畅显示。
+    点击位置按坐标换算成格子，不需要给每个格子绑定事件。
+    build的行数、列数为None时表示无限大的棋盘（见infinite.py）：视口取最大尺寸，可以滚动到任意坐标
+    （包括负数），滚动条只能按格、按页滚动，拖动滑块不起作用。
+    """
+    CELL_SIZE = 32                              # 默认格子边长（像素）
+    MIN_CELL_SIZE = 12                          # 缩放的最小格子边长
+    MAX_CELL_SIZE = 64                          # 缩放的最大格子边长
+    MAX_VIEW_WIDTH = 1200                       # 视口最大宽度（像素）
+    MAX_VIEW_HEIGHT = 720                       # 视口最大高度（像素）
+    COLOR_ALIASES = {'SystemButtonFace': '#d9d9d9'}   # Canvas在非Windows系统上不认识的系统颜色
+
+    def __init__(self, master, style_of, on_left_click, on_right_click):
+        self.master = master
+        self.style_of = style_of
+        self.on_left_click = on_left_click
+        self.on_right_click = on_right_click
+        self.rows = 0
+        self.cols = 0
+        self.cell_size = self.CELL_SIZE
+        self.top_row = 0                        # 视口左上角对应的棋盘行
+        self.left_col = 0                       # 视口左上角对应的棋盘列
+        self.view_rows = 0                      # 视口显示的行数
+        self.view_cols = 0                      # 视口显示的列数
+        self.items = {}                         # (视口行, 视口列) -> (矩形图元, 文字图元)
+        self.item_styles = {}                   # (视口行, 视口列) -> 图元当前的显示样式
+        self.tcl_calls = 0                      # 刷新时累计的图元修改次数
+
+        self.frame = tk.Frame(master)
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0, bg='gray')
+        self.vbar = tk.Scrollbar(self.frame, orient='vertical', command=self.on_vscroll)
+        self.hbar = tk.Scrollbar(self.frame, orient='horizontal', command=self.on_hscroll)
+        self.canvas.grid(row=0, column=0)
+        self.vbar.grid(row=0, column=1, sticky='ns')
+        self.hbar.grid(row=1, column=0, sticky='ew')
+        self.frame.grid(row=1, column=0)
+
+        self.canvas.bind('<Button-1>', lambda e: self.on_canvas_click(e, self.on_left_click))
+        self.canvas.bind('<Button-3>', lambda e: self.on_canvas_click(e, self.on_right_click))
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll_by(wheel_steps(e.delta), 0))
+        self.canvas.bind('<Shift-MouseWheel>', lambda e: self.scroll_by(0, wheel_steps(e.delta)))
+        self.canvas.bind('<Control-MouseWheel>', lambda e: self.zoom(1 if e.delta > 0 else -1))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll_by(-1, 0))     # Linux下的滚轮
+        self.canvas.bind('<Button-5>', lambda e: self.scroll_by(1, 0))
+
+    @property
+    def grid_columns(self):
+        return 1
+
+    @property
+    def unbounded(self):
+        return self.rows is None
+
+    def build(self, rows, cols):
+        """切换到rows x cols的棋盘，已有图元全部复用；都为None时是无限棋盘"""
+        self.rows, self.cols = rows, cols
+        self.top_row = 0
+        self.left_col = 0
+        self.layout()
+
+    def clamp(self, top_row, left_col):
+        # 视口不能滚出有限的棋盘，无限棋盘不限制
+        if self.unbounded:
+            return top_row, left_col
+        return (max(0, min(top_row, self.rows - self.view_rows)),
+                max(0, min(left_col, self.cols - self.view_cols)))
+
+    def layout(self):
+        # 按当前格子大小计算视口尺寸，补齐或删除多余的图元，并重新摆放位置
+        size = self.cell_size
+        self.view_rows = self.MAX_VIEW_HEIGHT // size
+        self.view_cols = self.MAX_VIEW_WIDTH // size
+        if not self.unbounded:
+            self.view_rows = min(self.rows, self.view_rows)
+            self.view_cols = min(self.cols, self.view_cols)
+        self.top_row, self.left_col = self.clamp(self.top_row, self.left_col)
+        self.canvas.config(width=self.view_cols * size, height=self.view_rows * size)
+
+        font = ("楷体", max(6, size // 3), "bold")
+        for slot in list(self.items):
+            if slot[0] >= self.view_rows or slot[1] >= self.view_cols:
+                rect, text = self.items.pop(slot)
+                self.item_styles.pop(slot, None)
+                self.canvas.delete(rect, text)
+        for vr in range(self.view_rows):
+            for vc in range(self.view_cols):
+                x, y = vc * size, vr * size
+                if (vr, vc) in self.items:
+                    rect, text = self.items[(vr, vc)]
+                    self.canvas.coords(rect, x, y, x + size, y + size)
+                    self.canvas.coords(text, x + size / 2, y + size / 2)
+                    self.canvas.itemconfig(text, font=font)
+                else:
+                    rect = self.canvas.create_rectangle(x, y, x + size, y + size, outline='gray50')
+                    text = self.canvas.create_text(x + size / 2, y + size / 2, text='', font=font)
+                    self.items[(vr, vc)] = (rect, text)
+        self.refresh()
+
+    def refresh(self):
+        """重新绘制视口内的所有格子"""
+        for vr in range(self.view_rows):
+            for vc in range(self.view_cols):
+                self.paint_slot(vr, vc)
+        self.update_scrollbars()
+
+    def paint(self, cells):
+        """刷新指定的棋盘格子，不在视口内的格子跳过"""
+        for r, c in cells:
+            vr, vc = r - self.top_row, c - self.left_col
+            if 0 <= vr < self.view_rows and 0 <= vc < self.view_cols:
+                self.paint_slot(vr, vc)
+
+    def paint_slot(self, vr, vc):
+        style = self.style_of(self.top_row + vr, self.left_col + vc)
+        if self.item_styles.get((vr, vc)) == style:
+            return
+        rect, text = self.items[(vr, vc)]
+        bg = self.COLOR_ALIASES.get(style['bg'], style['bg'])
+        self.canvas.itemconfig(rect, fill=bg)
+        self.canvas.itemconfig(text, text=style['text'], fill=style.get('fg', 'black'))
+        self.item_styles[(vr, vc)] = style
+        self.tcl_calls += 2
+
+    def update_scrollbars(self):
+        if self.unbounded:                      # 无限棋盘没有总长度，滑块固定在中间
+            self.vbar.set(0.45, 0.55)
+            self.hbar.set(0.45, 0.55)
+            return
+        if self.rows:
+            self.vbar.set(self.top_row / self.rows, (self.top_row + self.view_rows) / self.rows)
+        if self.cols:
+            self.hbar.set(self.left_col / self.cols, (self.left_col + self.view_cols) / self.cols)
+
+    def scroll_to(self, top_row, left_col):
+        top_row, left_col = self.clamp(top_row, left_col)
+        if (top_row, left_col) != (self.top_row, self.left_col):
+            self.top_row, self.left_col = top_row, left_col
+            self.refresh()
+
+    def scroll_by(self, rows, cols):
+        self.scroll_to(self.top_row + rows, self.left_col + cols)
+
+    def scroll_target(self, args, position, view, total):
+        # 把滚动条回调的参数（moveto 比例 / scroll 数量 units|pages）换算成目标位置
+        if args[0] == 'moveto':
+            return position if total is None else int(float(args[1]) * total)
+        amount = int(args[1])
+        return position + (amount * view if args[2] == 'pages' else amount)
+
+    def on_vscroll(self, *args):
+        self.scroll_to(self.scroll_target(args, self.top_row, self.view_rows, self.rows), self.left_col)
+
+    def on_hscroll(self, *args):
+        self.scroll_to(self.top_row, self.scroll_target(args, self.left_col, self.view_cols, self.cols))
+
+    def zoom(self, step):
+        """step为正放大，为负缩小，每次改变4像素"""
+        size = max(self.MIN_CELL_SIZE, min(self.MAX_CELL_SIZE, self.cell_size + 4 * step))
+        if size != self.cell_size:
+            self.cell_size = size
+            self.layout()
+
+    def on_canvas_click(self, event, callback):
+        # 点击坐标换算成棋盘格子
+        r = self.top_row + int(event.y // self.cell_size)
+        c = self.left_col + int(event.x // self.cell_size)
+        if self.unbounded or (0 <= r < self.rows and 0 <= c < self.cols):
+            callback(r, c)
+
+    def destroy(self):
+        self.frame.destroy()
+        self.items = {}
+        self.item_styles = {}
+
+RENDERERS = {
+    "button": ButtonRenderer,
+    "canvas": CanvasRenderer,
+}
@@ -0,0 +1,194 @@
+import zlib
+
+from board import Board, parse_board_id
+
+MAGIC = b"MSRP"                         # 录像文件标识
+VERSION = 2                             # 版本2：有局号的棋盘只保存局号，不再保存雷的位置
+ACTIONS = ("reveal", "flag", "chord")   # 动作编号即在此元组中的下标，"chord"为一键展开
+TIME_UNIT_MS = 10                       # 录像中时间的精度（毫秒）
+
+def write_varint(out, value):
+    # 无符号变长整数：每字节7位，最高位表示后面还有字节
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def zigzag(value):
+    # 有符号数映射为无符号数：0,-1,1,-2... -> 0,1,2,3...
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+def move_offsets(moves):
+    """把棋盘的操作记录 (时间, 动作, x, y) 换算成 (相对第一步的毫秒数, 动作, x, y)"""
+    start = moves[0][0] if moves else 0
+    return [(int(round((t - start) * 1000)), action, x, y) for t, action, x, y in moves]
+
+def write_moves(out, moves, cols):
+    """把 (毫秒数, 动作, x, y) 序列写成变长整数：步数、各步的时间间隔、各步的动作和格子"""
+    write_varint(out, len(moves))
+    previous_time = 0
+    for ms, _, _, _ in moves:
+        ticks = int(round(ms / TIME_UNIT_MS))
+        write_varint(out, max(ticks - previous_time, 0))
+        previous_time = max(ticks, previous_time)
+    previous_pos = 0
+    for _, action, x, y in moves:
+        pos = x * cols + y
+        write_varint(out, zigzag(pos - previous_pos) * len(ACTIONS) + ACTIONS.index(action))
+        previous_pos = pos
+
+def read_moves(data, pos, cols):
+    """write_moves的逆操作，返回 (操作列表, 新位置)；数据不完整时抛出IndexError"""
+    count, pos = read_varint(data, pos)
+    times = []
+    ticks = 0
+    for _ in range(count):
+        delta, pos = read_varint(data, pos)
+        ticks += delta
+        times.append(ticks * TIME_UNIT_MS)
+    moves = []
+    cell = 0
+    for ms in times:
+        code, pos = read_varint(data, pos)
+        cell += unzigzag(code // len(ACTIONS))
+        x, y = divmod(cell, cols)
+        moves.append((ms, ACTIONS[code % len(ACTIONS)], x, y))
+    return moves, pos
+
+class Replay:
+    """一局游戏的录像：棋盘尺寸、局号或雷的位置，以及每一步操作
+
+    moves中每一项为 (相对第一步的毫秒数, 动作, x, y)。有局号的棋盘（种子生成的）只保存局号，
+    回放时按局号重新放雷，mine_positions为None；没有局号的棋盘（例如载入的固定布局）保存雷的位置。
+    编码格式：文件标识 + 版本号，之后是zlib压缩的变长整数序列；局号存为长度加ASCII字节，
+    长度为0时后面是雷的位置。雷的位置和每步的格子都按与上一个的差值存储，时间存与上一步的间隔
+    （精度10毫秒）。所有步的时间间隔和格子分成两段连续存放，相似的数据放在一起压缩效果更好。
+    """
+
+    def __init__(self, rows, cols, mines, mine_positions, moves, board_id=None):
+        self.rows = rows
+        self.cols = cols
+        self.mines = mines
+        self.board_id = board_id
+        self.mine_positions = None if mine_positions is None else sorted(mine_positions)
+        self.moves = moves
+
+    @classmethod
+    def from_board(cls, board):
+        """从一局棋盘的操作记录生成录像"""
+        moves = move_offsets(board.moves)
+        if board.board_id:
+            return cls(board.rows, board.cols, board.mines, None, moves, board.board_id)
+        positions = [r * board.cols + c
+                     for r in range(board.rows) for c in range(board.cols)
+                     if board.grid[r][c].has_mine]
+        return cls(board.rows, board.cols, board.mines, positions, moves)
+
+    def encode(self):
+        out = bytearray()
+        for value in (self.rows, self.cols, self.mines):
+            write_varint(out, value)
+        board_id = (self.board_id or "").encode("ascii")
+        write_varint(out, len(board_id))
+        out += board_id
+        if not board_id:
+            write_varint(out, len(self.mine_positions))
+            previous = 0
+            for pos in self.mine_positions:
+                write_varint(out, pos - previous)
+                previous = pos
+        write_moves(out, self.moves, self.cols)
+        return MAGIC + bytes([VERSION]) + zlib.compress(bytes(out), 9)
+
+    @classmethod
+    def decode(cls, data):
+        """解析录像数据；文件损坏或被截断时抛出ValueError，界面统一显示读取失败"""
+        if data[:4] != MAGIC:
+            raise ValueError("不是扫雷录像文件")
+        if len(data) < 5:
+            raise ValueError("录像文件不完整")
+        if data[4] not in (1, VERSION):
+            raise ValueError(f"不支持的录像版本: {data[4]}")
+        try:
+            replay = cls._decode_body(zlib.decompress(data[5:]), data[4])
+        except (zlib.error, IndexError, ZeroDivisionError, UnicodeDecodeError) as e:
+            raise ValueError(f"录像文件已损坏: {e}") from None
+        size = replay.rows * replay.cols
+        if replay.board_id:
+            if parse_board_id(replay.board_id)[:3] != (replay.rows, replay.cols, replay.mines):
+                raise ValueError("录像文件已损坏: 局号与棋盘尺寸不符")
+        elif (replay.mines != len(replay.mine_positions)
+                or max(replay.mine_positions, default=-1) >= size):
+            raise ValueError("录像文件已损坏: 雷的位置超出棋盘")
+        if replay.mines >= size or any(not 0 <= x < replay.rows for _, _, x, _ in replay.moves):
+            raise ValueError("录像文件已损坏: 操作的位置超出棋盘")
+        return replay
+
+    @classmethod
+    def _decode_body(cls, data, version):
+        # 解析解压后的变长整数序列，数据不完整时read_varint抛出IndexError
+        pos = 0
+        rows, pos = read_varint(data, pos)
+        cols, pos = read_varint(data, pos)
+        mines, pos = read_varint(data, pos)
+        board_id = None
+        if version >= 2:
+            length, pos = read_varint(data, pos)
+            if pos + length > len(data):
+                raise IndexError("局号不完整")
+            board_id = data[pos:pos + length].decode("ascii") or None
+            pos += length
+        if board_id:
+            moves, pos = read_moves(data, pos, cols)
+            return cls(rows, cols, mines, None, moves, board_id)
+        count, pos = read_varint(data, pos)
+        mine_positions = []
+        previous = 0
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            previous += delta
+            mine_positions.append(previous)
+        moves, pos = read_moves(data, pos, cols)
+        return cls(rows, cols, mines, mine_positions, moves)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.decode(f.read())
+
+    def new_board(self, board_class=Board):
+        """创建放好雷、还没有任何操作的棋盘，用于回放；board_class也可以是接受同样参数的函数"""
+        if self.board_id:
+            rows, cols, mines, seed, x, y, safe_zone = parse_board_id(self.board_id)
+            board = board_class(rows, cols, mines, safe_zone=safe_zone, seed=seed)
+            board.place_mines_for(x, y)
+            return board
+        board = board_class(self.rows, self.cols, self.mines)
+        board.place_mines_at(self.mine_positions)
+        return board
+
+def apply_move(board, action, x, y):
+    """在棋盘上执行一步录像中的操作，返回变化的格子"""
+    if action == "flag":
+        return board.flag(x, y)
+    if action == "chord":
+        return board.chord(x, y)[0]
+    return board.reveal(x, y)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""无界面批量模拟：用自动玩家在board.Board上连续对局，统计胜率和模拟速度
+
+用法示例：
+    python simulate.py --games 1000 --seed 0 --workers 4
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board, CompactBoard
+from replay import apply_move
+from solver import SolverPlayer
+
+# 与菜单中的三个预设难度一致
+DIFFICULTIES = {
+    "9x9_10": (9, 9, 10),
+    "16x16_40": (16, 16, 40),
+    "16x30_99": (16, 30, 99),
+}
+
+BOARD_CLASSES = {
+    "cells": Board,
+    "compact": CompactBoard,
+}
+
+class RandomPlayer:
+    """随机玩家：第一步点中间，之后每步随机翻开一个未翻开的格子"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def observe(self, changed):
+        """每步操作后收到发生变化的格子坐标，随机玩家不需要"""
+
+    def next_move(self, board):
+        """返回下一步操作 (动作, x, y)，动作为"reveal"、"flag"或"chord"；返回None表示放弃"""
+        if not board.mines_placed:
+            return ("reveal", board.rows // 2, board.cols // 2)
+        candidates = [(r, c) for r in range(board.rows) for c in range(board.cols)
+                      if not board.grid[r][c].revealed and not board.grid[r][c].flagged]
+        if not candidates:
+            return None
+        r, c = self.rng.choice(candidates)
+        return ("reveal", r, c)
+
+# 可以通过名字选择的自动玩家，自定义玩家需要是模块顶层的类才能传给子进程
+PLAYERS = {
+    "random": RandomPlayer,
+    "solver": SolverPlayer,
+}
+
+def game_seed(seed, index):
+    """由总种子和对局序号得到单局种子，保证结果与进程数、分块方式无关"""
+    return seed * 1000003 + index
+
+def play_game(rows, cols, mines, seed, player=RandomPlayer, board_class=Board):
+    """用给定种子下完一局，返回 (是否获胜, 操作步数, 安全格子翻开比例)"""
+    if isinstance(player, str):
+        player = PLAYERS[player]
+    board = board_class(rows, cols, mines, seed=seed)      # 棋盘用自己的随机数生成器放雷
+    bot = player(random.Random(seed))
+    safe_cells = rows * cols - mines
+    moves = 0
+    while not board.game_over and not board.is_win():
+        move = bot.next_move(board)
+        if move is None:
+            break
+        changed = apply_move(board, *move)
+        bot.observe(changed)
+        moves += 1
+    won = board.is_win() and not board.game_over
+    cleared = (safe_cells - board.safe_cells_left) / safe_cells if safe_cells else 1.0
+    return won, moves, cleared
+
+def play_batch(rows, cols, mines, seed, start, count, player, board_class):
+    # 子进程中执行的一批对局
+    return [play_game(rows, cols, mines, game_seed(seed, index), player, board_class)
+            for index in range(start, start + count)]
+
+def simulate(rows, cols, mines, games, seed=0, player=RandomPlayer, workers=None,
+             board_class=Board, batch_size=50):
+    """模拟games局，返回每局结果列表和耗时；workers为1时不启动进程池"""
+    batches = [(start, min(batch_size, games - start)) for start in range(0, games, batch_size)]
+    start_time = time.perf_counter()
+    results = []
+    if workers == 1:
+        for start, count in batches:
+            results.extend(play_batch(rows, cols, mines, seed, start, count, player, board_class))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_batch, rows, cols, mines, seed, start, count, player, board_class)
+                       for start, count in batches]
+            for future in futures:                  # 按提交顺序收集，结果与进程调度无关
+                results.extend(future.result())
+    return results, time.perf_counter() - start_time
+
+def summarize(results, elapsed):
+    """汇总模拟结果：速度、胜率及95%置信区间、翻开比例分布"""
+    games = len(results)
+    wins = sum(1 for won, _, _ in results if won)
+    win_rate = wins / games if games else 0.0
+    margin = 1.96 * math.sqrt(win_rate * (1 - win_rate) / games) if games else 0.0
+    histogram = [0] * 10                            # 安全格子翻开比例，按10%分段
+    for _, _, cleared in results:
+        histogram[min(int(cleared * 10), 9)] += 1
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": win_rate,
+        "win_rate_margin": margin,
+        "games_per_second": games / elapsed if elapsed > 0 else float("inf"),
+        "average_moves": sum(moves for _, moves, _ in results) / games if games else 0.0,
+        "cleared_histogram": histogram,
+    }
+
+def print_summary(difficulty, summary):
+    print(f"== {difficulty} ==")
+    print(f"  对局数: {summary['games']}  获胜: {summary['wins']}")
+    print(f"  胜率: {summary['win_rate']:.2%} ± {summary['win_rate_margin']:.2%}")
+    print(f"  速度: {summary['games_per_second']:.1f} 局/秒  平均步数: {summary['average_moves']:.1f}")
+    print("  安全格子翻开比例分布:")
+    total = max(summary["games"], 1)
+    for i, count in enumerate(summary["cleared_histogram"]):
+        bar = "█" * round(count / total * 40)
+        print(f"    {i * 10:>3}%-{i * 10 + 10:>3}%: {count:>6} {bar}")
+
+def main():
+    parser = argparse.ArgumentParser(description="扫雷无界面批量模拟")
+    parser.add_argument("--games", type=int, default=1000, help="每个难度的对局数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子，相同种子结果相同")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="进程数，1表示不使用进程池")
+    parser.add_argument("--player", choices=sorted(PLAYERS), default="random", help="自动玩家")
+    parser.add_argument("--board", choices=sorted(BOARD_CLASSES), default="cells", help="棋盘存储方式")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES) + ["all"], default="all")
+    args = parser.parse_args()
+
+    names = list(DIFFICULTIES) if args.difficulty == "all" else [args.difficulty]
+    for name in names:
+        rows, cols, mines = DIFFICULTIES[name]
+        results, elapsed = simulate(rows, cols, mines, args.games, args.seed, args.player,
+                                    args.workers, BOARD_CLASSES[args.board])
+        print_summary(name, summarize(results, elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from board import Board, parse_board_id
+from replay import move_offsets, read_moves, write_moves
+
+MAGIC = b"MSSV"                         # 存档文件标识
+VERSION = 3                             # 版本2在难度标识后增加了局号，版本3在平面之后增加了操作记录
+HEADER = struct.Struct("<IIIBd")        # 行数、列数、雷数、是否已放雷、已用时间（秒）
+AUTOSAVE_FILE = "autosave.mss"          # 自动存档文件
+
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+def pack_bits(plane):
+    """把每格一个字节的0/1平面压成位集，第i格对应第i位"""
+    if not plane:
+        return b""
+    digits = bytes(plane).translate(_TO_DIGITS)[::-1]          # 借助二进制字符串整体转换
+    return int(digits, 2).to_bytes((len(plane) + 7) // 8, "little")
+
+def unpack_bits(data, size):
+    """pack_bits的逆操作，返回长度为size的bytearray"""
+    if not size:
+        return bytearray()
+    digits = format(int.from_bytes(data, "little"), "b").zfill(size)
+    return bytearray(digits[::-1].encode("ascii").translate(_FROM_DIGITS))
+
+def encode_game(board, elapsed, difficulty, planes=None, moves=None):
+    """把整局游戏编码为存档数据
+
+    格式：文件标识 + 版本号 + 头部（尺寸、雷数、是否已放雷、已用时间）+ 难度标识 + 局号，
+    之后是zlib压缩的三个位集平面：雷、已翻开、已插旗，以及与录像相同格式的操作记录，
+    继续游戏后保存的录像仍然从第一步开始。周围雷数等可以重新计算的数据不保存。
+    planes、moves不为None时使用事先取出的平面和操作记录副本，方便在后台线程中编码。
+    """
+    mine, revealed, flagged = planes or board.planes()
+    name = difficulty.encode("utf-8")
+    board_id = (board.board_id or "").encode("ascii")
+    move_log = bytearray()
+    write_moves(move_log, move_offsets(board.moves if moves is None else moves), board.cols)
+    body = zlib.compress(pack_bits(mine) + pack_bits(revealed) + pack_bits(flagged) + move_log, 6)
+    return (MAGIC + bytes([VERSION]) + HEADER.pack(board.rows, board.cols, board.mines,
+                                                         board.mines_placed, elapsed)
+            + bytes([len(name)]) + name + bytes([len(board_id)]) + board_id + body)
+
+def decode_game(data, board_class=Board):
+    """解析存档数据，返回(棋盘, 已用时间, 难度标识)；文件损坏或被截断时抛出ValueError"""
+    if data[:4] != MAGIC:
+        raise ValueError("不是扫雷存档文件")
+    if len(data) < 5:
+        raise ValueError("存档文件不完整")
+    version = data[4]
+    if version not in (1, 2, VERSION):
+        raise ValueError(f"不支持的存档版本: {version}")
+    pos = 5
+    try:
+        rows, cols, mines, mines_placed, elapsed = HEADER.unpack_from(data, pos)
+        pos += HEADER.size
+        length = data[pos]
+        difficulty = data[pos + 1:pos + 1 + length].decode("utf-8")
+        pos += 1 + length
+        board_id = ""
+        if version >= 2:
+            length = data[pos]
+            board_id = data[pos + 1:pos + 1 + length].decode("ascii")
+            pos += 1 + length
+        body = zlib.decompress(data[pos:])
+    except (struct.error, IndexError, zlib.error) as e:
+        raise ValueError(f"存档文件已损坏: {e}") from None
+
+    size = rows * cols
+    plane_bytes = (size + 7) // 8
+    if len(body) < 3 * plane_bytes or not 0 <= mines < size:
+        raise ValueError("存档文件已损坏: 平面数据与棋盘尺寸不符")
+    moves = []
+    if version >= 3:
+        try:
+            moves, end = read_moves(body, 3 * plane_bytes, cols)
+        except (IndexError, ZeroDivisionError):
+            end = -1
+        if end != len(body) or any(not 0 <= x < rows for _, _, x, _ in moves):
+            raise ValueError("存档文件已损坏: 操作记录不完整")
+    mine, revealed, flagged = (unpack_bits(body[i * plane_bytes:(i + 1) * plane_bytes], size)
+                               for i in range(3))
+    board = board_class(rows, cols, mines)
+    if board_id:                        # 恢复种子和第一次点击的位置，局号保持不变
+        _, _, _, board.seed, board.first_click_x, board.first_click_y, board.safe_zone = parse_board_id(board_id)
+    board.load_planes(mine, revealed, flagged, bool(mines_placed))
+    # 操作记录的时间换回单调时钟，最后一步记为现在，存档期间的间隔不计入录像
+    base = time.monotonic() - (moves[-1][0] / 1000 if moves else 0)
+    board.moves = [(base + ms / 1000, action, x, y) for ms, action, x, y in moves]
+    board.moves_complete = version >= 3 or not mines_placed
+    return board, elapsed, difficulty
+
+def save_game(path, board, elapsed, difficulty, planes=None, moves=None):
+    """写入存档，先写临时文件再替换，写到一半出错不会破坏旧存档
+
+    临时文件在存档所在目录中用唯一的名字创建，同时进行的两次保存不会互相覆盖或删掉对方的临时文件。
+    """
+    data = encode_game(board, elapsed, difficulty, planes, moves)
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                     dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def load_game(path, board_class=Board):
+    with open(path, 'rb') as f:
+        return decode_game(f.read(), board_class)
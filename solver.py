@@ -0,0 +1,278 @@
+import random
+
+NEIGHBOR_OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+MAX_COMPONENT_CELLS = 24                # 穷举时单个边界分量允许的最大未知格子数
+
+def enumerate_component(cells, constraints):
+    """穷举一个边界分量的所有合法布雷方案
+
+    cells为分量中的未知格子列表，constraints为[(未知格子集合, 剩余雷数), ...]。
+    返回 {方案中的雷数: (方案数, 每个格子为雷的方案数列表)}。
+    """
+    index = {cell: i for i, cell in enumerate(cells)}
+    need = []                           # 每个约束还需要的雷数
+    left = []                           # 每个约束还未赋值的格子数
+    cell_constraints = [[] for _ in cells]
+    for j, (unknowns, remaining) in enumerate(constraints):
+        need.append(remaining)
+        left.append(len(unknowns))
+        for cell in unknowns:
+            cell_constraints[index[cell]].append(j)
+
+    results = {}
+    assignment = [0] * len(cells)
+
+    def search(i, mines):
+        if i == len(cells):
+            total, counts = results.get(mines, (0, [0] * len(cells)))
+            for k, value in enumerate(assignment):
+                counts[k] += value
+            results[mines] = (total + 1, counts)
+            return
+        for value in (0, 1):
+            if any(need[j] < value or need[j] - value > left[j] - 1 for j in cell_constraints[i]):
+                continue
+            for j in cell_constraints[i]:
+                need[j] -= value
+                left[j] -= 1
+            assignment[i] = value
+            search(i + 1, mines + value)
+            for j in cell_constraints[i]:
+                need[j] += value
+                left[j] += 1
+        assignment[i] = 0
+
+    search(0, 0)
+    return results
+
+class Solver:
+    """根据棋盘上可见的信息（已翻开的数字）推理出必定安全的格子和必定是雷的格子
+
+    不信任玩家插的旗子，只使用自己推出的雷。约束和边界是增量维护的：
+    每次操作后把reveal/flag返回的变化格子传给update，只更新受影响的约束，不重新扫描棋盘。
+    推理顺序：单格规则、子集规则，都无结论时再对变化过的边界分量做穷举。
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.constraints = {}               # 数字格子 -> [未知邻居集合, 剩余雷数]
+        self.cell_constraints = {}          # 未知格子 -> 引用它的数字格子集合
+        self.known_mines = set()            # 推理出的雷
+        self.known_safe = set()             # 推理出的安全格子（还未翻开）
+        self.dirty = set()                  # 需要重新检查单格/子集规则的约束
+        self.unenumerated = set()           # 上次穷举之后变化过的约束
+        self.update((r, c) for r in range(board.rows) for c in range(board.cols)
+                    if board.grid[r][c].revealed)
+
+    def neighbors(self, r, c):
+        for dr, dc in NEIGHBOR_OFFSETS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.board.rows and 0 <= nc < self.board.cols:
+                yield nr, nc
+
+    def update(self, changed):
+        """处理一次操作后发生变化的格子；只有新翻开的格子会影响推理，插旗被忽略"""
+        grid = self.board.grid
+        for r, c in changed:
+            cell = grid[r][c]
+            if not cell.revealed:
+                continue
+            self.known_safe.discard((r, c))
+            self._remove_unknown((r, c), 0)
+            if cell.has_mine or cell.adjacent_mines == 0:
+                continue
+            unknowns = set()
+            remaining = cell.adjacent_mines
+            for nr, nc in self.neighbors(r, c):
+                if (nr, nc) in self.known_mines:
+                    remaining -= 1
+                elif not grid[nr][nc].revealed and (nr, nc) not in self.known_safe:
+                    unknowns.add((nr, nc))
+            if unknowns:
+                self.constraints[(r, c)] = [unknowns, remaining]
+                for neighbor in unknowns:
+                    self.cell_constraints.setdefault(neighbor, set()).add((r, c))
+                self.dirty.add((r, c))
+                self.unenumerated.add((r, c))
+
+    def _remove_unknown(self, cell, mine):
+        # 格子不再未知：从所有引用它的约束中移除，是雷时剩余雷数减一
+        for key in self.cell_constraints.pop(cell, ()):
+            constraint = self.constraints.get(key)
+            if constraint is None:
+                continue
+            constraint[0].discard(cell)
+            constraint[1] -= mine
+            if constraint[0]:
+                self.dirty.add(key)
+                self.unenumerated.add(key)
+            else:
+                del self.constraints[key]
+
+    def _mark_mine(self, cell):
+        if cell not in self.known_mines:
+            self.known_mines.add(cell)
+            self._remove_unknown(cell, 1)
+
+    def _mark_safe(self, cell):
+        if cell not in self.known_safe:
+            self.known_safe.add(cell)
+            self._remove_unknown(cell, 0)
+
+    def _apply_simple_rules(self):
+        # 处理所有待检查的约束，返回是否得到了新结论
+        progress = False
+        while self.dirty:
+            key = self.dirty.pop()
+            constraint = self.constraints.get(key)
+            if constraint is None:
+                continue
+            unknowns, remaining = constraint
+            if remaining == 0:                      # 雷已经找齐，其余都安全
+                for cell in list(unknowns):
+                    self._mark_safe(cell)
+                progress = True
+                continue
+            if remaining == len(unknowns):          # 未知格子数等于剩余雷数，全是雷
+                for cell in list(unknowns):
+                    self._mark_mine(cell)
+                progress = True
+                continue
+
+            # 子集规则：A的未知格子是B的子集时，B多出的格子里恰好有 B剩余 - A剩余 个雷
+            others = set()
+            for cell in unknowns:
+                others.update(self.cell_constraints.get(cell, ()))
+            others.discard(key)
+            for other in others:
+                if key not in self.constraints:
+                    break
+                other_constraint = self.constraints.get(other)
+                if other_constraint is None:
+                    continue
+                small, large = constraint, other_constraint
+                if not small[0] <= large[0]:
+                    small, large = large, small
+                    if not small[0] <= large[0]:
+                        continue
+                extra = large[0] - small[0]
+                extra_mines = large[1] - small[1]
+                if not extra:
+                    continue
+                if extra_mines == 0:
+                    for cell in extra:
+                        self._mark_safe(cell)
+                    progress = True
+                elif extra_mines == len(extra):
+                    for cell in extra:
+                        self._mark_mine(cell)
+                    progress = True
+        return progress
+
+    def components(self, keys=None):
+        """按共享的未知格子把约束分成互不相关的分量，返回[(未知格子列表, 约束键列表), ...]
+
+        keys不为None时只返回包含这些约束的分量。
+        """
+        seen = set()
+        result = []
+        for start in (self.constraints if keys is None else keys):
+            if start in seen or start not in self.constraints:
+                continue
+            seen.add(start)
+            queue = [start]
+            cells = []
+            cell_seen = set()
+            component_keys = []
+            while queue:
+                key = queue.pop()
+                component_keys.append(key)
+                for cell in self.constraints[key][0]:
+                    if cell in cell_seen:
+                        continue
+                    cell_seen.add(cell)
+                    cells.append(cell)
+                    for other in self.cell_constraints.get(cell, ()):
+                        if other not in seen:
+                            seen.add(other)
+                            queue.append(other)
+            result.append((cells, component_keys))
+        return result
+
+    def _enumerate_components(self):
+        # 对上次穷举后变化过的分量做穷举，找出在所有方案中都一样的格子
+        progress = False
+        for cells, keys in self.components(list(self.unenumerated)):
+            if len(cells) > MAX_COMPONENT_CELLS:
+                continue
+            results = enumerate_component(cells, [self.constraints[key] for key in keys])
+            solutions = sum(total for total, _ in results.values())
+            if not solutions:
+                continue
+            mine_counts = [0] * len(cells)
+            for _, counts in results.values():
+                for i, count in enumerate(counts):
+                    mine_counts[i] += count
+            for cell, count in zip(cells, mine_counts):
+                if count == 0:
+                    self._mark_safe(cell)
+                    progress = True
+                elif count == solutions:
+                    self._mark_mine(cell)
+                    progress = True
+        self.unenumerated.clear()
+        return progress
+
+    def solve(self):
+        """推理直到没有新结论，返回(安全格子集合, 雷集合)"""
+        while True:
+            if self._apply_simple_rules():
+                continue
+            if self.unenumerated and self._enumerate_components():
+                continue
+            break
+        return self.known_safe, self.known_mines
+
+    def hint(self):
+        """返回一步确定的操作 (动作, x, y)；没有则返回None
+
+        优先翻开未插旗的安全格子，其次拔掉插在安全格子上的旗子（"unflag"），最后标记未插旗的雷。
+        推理不看旗子，插错旗的安全格子也在safe中，但插着旗不能翻开，不能直接提示翻开。
+        """
+        safe, mines = self.solve()
+        grid = self.board.grid
+        flagged_safe = sorted(cell for cell in safe if grid[cell[0]][cell[1]].flagged)
+        unflagged_safe = safe.difference(flagged_safe)
+        if unflagged_safe:
+            return ("reveal",) + min(unflagged_safe)
+        if flagged_safe:
+            return ("unflag",) + flagged_safe[0]
+        for r, c in sorted(mines):
+            if not grid[r][c].flagged:
+                return ("flag", r, c)
+        return None
+
+class SolverPlayer:
+    """推理玩家：能确定安全的格子就翻开，推不出时随机猜一个不是已知雷的格子"""
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.solver = None
+
+    def observe(self, changed):
+        if self.solver is not None:
+            self.solver.update(changed)
+
+    def next_move(self, board):
+        if not board.mines_placed:
+            return ("reveal", board.rows // 2, board.cols // 2)
+        if self.solver is None or self.solver.board is not board:
+            self.solver = Solver(board)
+        safe, mines = self.solver.solve()
+        if safe:
+            return ("reveal",) + min(safe)
+        candidates = [(r, c) for r in range(board.rows) for c in range(board.cols)
+                      if not board.grid[r][c].revealed and (r, c) not in mines]
+        if not candidates:
+            return None
+        return ("reveal",) + self.rng.choice(candidates)
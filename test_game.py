@@ -2,11 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import tkinter as tk
+import instrument
+from board import Board, CompactBoard
 from minesweeper import MinesweeperGUI
 
 if __name__ == "__main__":
+    instrument.install_from_env(MinesweeperGUI, Board, CompactBoard)
     root = tk.Tk()
     root.title("扫雷🐟版")
     app = MinesweeperGUI(root)
     print("游戏已启动！")
-    root.mainloop()
+    instrument.run_profiled(root.mainloop)
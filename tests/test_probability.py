@@ -0,0 +1,49 @@
+"""雷概率与穷举所有布雷方案的结果对比"""
+
+import itertools
+import math
+import random
+
+import pytest
+
+from board import Board, CompactBoard
+from probability import ProbabilityMap
+from solver import Solver
+
+MAX_LAYOUTS = 20000                     # 穷举的布雷方案数上限，超过的局面跳过
+
+def brute_force(board):
+    """穷举未翻开格子中所有与数字相符的布雷方案，返回 {未翻开格子: 是雷的概率}"""
+    grid = board.grid
+    cells = [(r, c) for r in range(board.rows) for c in range(board.cols)]
+    unknown = [(r, c) for r, c in cells if not grid[r][c].revealed]
+    numbers = [(r, c, grid[r][c].adjacent_mines) for r, c in cells if grid[r][c].revealed]
+    counts = dict.fromkeys(unknown, 0)
+    total = 0
+    for layout in itertools.combinations(unknown, board.mines):
+        layout = set(layout)
+        if all(sum((r + dr, c + dc) in layout for dr in (-1, 0, 1) for dc in (-1, 0, 1)) == n
+               for r, c, n in numbers):
+            total += 1
+            for cell in layout:
+                counts[cell] += 1
+    return {cell: count / total for cell, count in counts.items()}
+
+@pytest.mark.parametrize("board_class", [Board, CompactBoard])
+def test_matches_brute_force(board_class):
+    rng = random.Random(24)
+    checked = 0
+    for seed in range(150):
+        rows, cols = rng.randint(3, 6), rng.randint(3, 6)
+        mines = rng.randint(1, min(8, rows * cols // 3))
+        board = board_class(rows, cols, mines, seed=seed)
+        board.reveal(rng.randrange(rows), rng.randrange(cols))
+        if board.outcome() != "playing":
+            continue
+        if math.comb(board.mines + board.safe_cells_left, mines) > MAX_LAYOUTS:
+            continue
+        probabilities, interior = ProbabilityMap().compute(board, Solver(board))
+        for cell, expected in brute_force(board).items():
+            assert probabilities.get(cell, interior) == pytest.approx(expected, abs=1e-9), (seed, cell)
+        checked += 1
+    assert checked > 30
@@ -0,0 +1,85 @@
+"""录像编码的往返测试"""
+
+import random
+import zlib
+
+import pytest
+
+from board import Board, CompactBoard
+from replay import MAGIC, TIME_UNIT_MS, Replay, apply_move, write_varint
+
+BOARD_CLASSES = [Board, CompactBoard]
+
+def played_board(board_class, seed, moves=30):
+    """在16x30的棋盘上随机翻开、插旗、一键展开，直到结束或走完moves步"""
+    rng = random.Random(seed)
+    board = board_class(16, 30, 60, seed=seed)
+    board.reveal(8, 15)
+    for _ in range(moves):
+        if board.outcome() != "playing":
+            break
+        x, y = rng.randrange(16), rng.randrange(30)
+        apply_move(board, rng.choice(("reveal", "flag", "flag", "chord")), x, y)
+    return board
+
+def replay_planes(replay, board_class):
+    board = replay.new_board(board_class)
+    for _, action, x, y in replay.moves:
+        apply_move(board, action, x, y)
+    return board
+
+@pytest.mark.parametrize("board_class", BOARD_CLASSES)
+@pytest.mark.parametrize("seed", range(5))
+def test_replay_round_trip(board_class, seed):
+    board = played_board(board_class, seed)
+    replay = Replay.from_board(board)
+    decoded = Replay.decode(replay.encode())
+
+    assert (decoded.rows, decoded.cols, decoded.mines) == (board.rows, board.cols, board.mines)
+    assert decoded.board_id == board.board_id
+    assert decoded.mine_positions is None           # 有局号时不保存雷的位置
+    assert [move[1:] for move in decoded.moves] == [move[1:] for move in replay.moves]
+    for (ms, *_), (decoded_ms, *_) in zip(replay.moves, decoded.moves):
+        assert abs(decoded_ms - ms) <= TIME_UNIT_MS
+
+    # 按录像重放得到与原棋盘相同的局面
+    replayed = replay_planes(decoded, board_class)
+    assert replayed.planes() == board.planes()
+    assert replayed.outcome() == board.outcome()
+
+def test_replay_without_board_id():
+    # 没有局号的棋盘（固定布局）保存雷的位置
+    board = Board(16, 30, 60)
+    board.place_mines_at(random.Random(3).sample(range(16 * 30), 60))
+    for x, y in [(0, 0), (15, 29), (8, 15), (3, 20)]:
+        board.reveal(x, y)
+        board.flag(x, y + 1 if y < 29 else y - 1)
+    decoded = Replay.decode(Replay.from_board(board).encode())
+
+    assert decoded.board_id is None
+    assert len(decoded.mine_positions) == 60
+    assert replay_planes(decoded, CompactBoard).planes() == board.planes()
+
+def test_version_1_still_loads():
+    out = bytearray()
+    for value in (3, 3, 1, 1, 4, 1, 0, 0):          # 3x3、1颗雷在中间，一步：0毫秒翻开(0, 0)
+        write_varint(out, value)
+    replay = Replay.decode(MAGIC + bytes([1]) + zlib.compress(bytes(out)))
+    assert replay.mine_positions == [4]
+    assert replay_planes(replay, Board).outcome() == "playing"
+
+@pytest.mark.parametrize("data", [
+    b"MSRP",
+    b"MSRP\x02not zlib",
+    MAGIC + bytes([2]) + zlib.compress(bytes([9, 9, 10, 5]) + b"9x"),
+    MAGIC + bytes([2]) + zlib.compress(bytes([9, 9, 10, 14]) + b"9x9_11-1-0.0-1" + bytes([0])),
+])
+def test_corrupt_replay_raises_value_error(data):
+    with pytest.raises(ValueError):
+        Replay.decode(data)
+
+def test_truncated_replay_raises_value_error():
+    data = Replay.from_board(played_board(Board, seed=1)).encode()
+    body = zlib.decompress(data[5:])
+    with pytest.raises(ValueError):
+        Replay.decode(data[:5] + zlib.compress(body[:len(body) // 2]))
@@ -0,0 +1,69 @@
+"""存档编码的往返测试"""
+
+import random
+
+import pytest
+
+from board import Board, CompactBoard
+from replay import Replay, apply_move
+from snapshot import decode_game, encode_game
+
+BOARD_CLASSES = [Board, CompactBoard]
+
+def played_board(board_class, seed, moves=20):
+    """在16x30的棋盘上随机翻开、插旗、一键展开，直到结束或走完moves步"""
+    rng = random.Random(seed)
+    board = board_class(16, 30, 60, seed=seed)
+    board.reveal(8, 15)
+    for _ in range(moves):
+        if board.outcome() != "playing":
+            break
+        x, y = rng.randrange(16), rng.randrange(30)
+        apply_move(board, rng.choice(("reveal", "flag", "flag", "chord")), x, y)
+    return board
+
+@pytest.mark.parametrize("save_class", BOARD_CLASSES)
+@pytest.mark.parametrize("load_class", BOARD_CLASSES)
+def test_snapshot_round_trip(save_class, load_class):
+    board = played_board(save_class, seed=7)
+    restored, elapsed, difficulty = decode_game(encode_game(board, 12.5, "16x30_60"), load_class)
+
+    assert (elapsed, difficulty) == (12.5, "16x30_60")
+    assert restored.planes() == board.planes()
+    assert restored.board_id == board.board_id
+    assert restored.mines_placed == board.mines_placed
+    assert restored.safe_cells_left == board.safe_cells_left
+    assert restored.flag_count == board.flag_count
+    assert restored.outcome() == board.outcome()
+    assert [move[1:] for move in restored.moves] == [move[1:] for move in board.moves]
+    for r in range(board.rows):
+        for c in range(board.cols):
+            assert restored.grid[r][c].adjacent_mines == board.grid[r][c].adjacent_mines
+
+def test_snapshot_before_first_click():
+    board = CompactBoard(9, 9, 10)
+    restored, _, _ = decode_game(encode_game(board, 0.0, "9x9_10"))
+    assert not restored.mines_placed
+    assert restored.board_id is None
+    assert restored.planes() == board.planes()
+
+def test_replay_after_resume():
+    # 继续存档后再走几步，保存的录像从第一步开始重放，得到相同的局面
+    board = played_board(Board, seed=11, moves=5)
+    restored, _, _ = decode_game(encode_game(board, 3.0, "16x30_60"), CompactBoard)
+    assert restored.moves_complete
+    for x, y in [(0, 0), (15, 29), (4, 4)]:
+        if restored.outcome() == "playing":
+            restored.reveal(x, y)
+
+    replay = Replay.decode(Replay.from_board(restored).encode())
+    replayed = replay.new_board(Board)
+    for _, action, x, y in replay.moves:
+        apply_move(replayed, action, x, y)
+    assert replayed.planes() == restored.planes()
+
+def test_corrupt_snapshot_raises_value_error():
+    data = encode_game(played_board(Board, seed=2), 1.0, "16x30_60")
+    for broken in (data[:8], data[:-10], data[:30] + b"\0" * 10 + data[40:], b"MSSV"):
+        with pytest.raises(ValueError):
+            decode_game(broken)